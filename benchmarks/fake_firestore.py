@@ -0,0 +1,172 @@
+# benchmarks/fake_firestore.py
+
+"""In-memory stand-in for the subset of the Firestore client the service uses"""
+
+from google.api_core.exceptions import AlreadyExists, NotFound
+from google.cloud import firestore
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+import asyncio
+import copy
+
+class FakeStore:
+    """Documents keyed by full path, with optional simulated RPC latency"""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.update_times: Dict[str, datetime] = {}
+        self.reads = 0
+        self.commits = 0
+        self.writes = 0
+
+    async def rpc(self) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def apply(self, kind: str, path: str, data: Dict[str, Any], merge: bool = False) -> None:
+        now = datetime.now(timezone.utc)
+        current = self.documents.get(path, {})
+        values = {}
+        for key, value in data.items():
+            if value is firestore.SERVER_TIMESTAMP:
+                values[key] = now
+            elif isinstance(value, firestore.Increment):
+                values[key] = current.get(key, 0) + value.value
+            else:
+                values[key] = copy.deepcopy(value)
+
+        if kind == "create" and path in self.documents:
+            raise AlreadyExists(f"Document already exists: {path}")
+        if kind == "update" and path not in self.documents:
+            raise NotFound(f"No document to update: {path}")
+
+        if kind == "set" and not merge:
+            self.documents[path] = values
+        else:
+            self.documents.setdefault(path, {}).update(values)
+        self.update_times[path] = now
+        self.writes += 1
+
+class FakeSnapshot:
+    def __init__(self, reference: "FakeDocument", data: Optional[Dict[str, Any]], update_time):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+        self.update_time = update_time
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return copy.deepcopy(self._data)
+
+class FakeDocument:
+    def __init__(self, store: FakeStore, path: str):
+        self.store = store
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    def collection(self, name: str) -> "FakeCollection":
+        return FakeCollection(self.store, f"{self.path}/{name}")
+
+    async def get(self) -> FakeSnapshot:
+        await self.store.rpc()
+        self.store.reads += 1
+        return FakeSnapshot(self, self.store.documents.get(self.path), self.store.update_times.get(self.path))
+
+    async def create(self, data: Dict[str, Any]) -> None:
+        await self._commit("create", data)
+
+    async def set(self, data: Dict[str, Any], merge: bool = False) -> None:
+        await self._commit("set", data, merge)
+
+    async def update(self, data: Dict[str, Any]) -> None:
+        await self._commit("update", data)
+
+    async def delete(self) -> None:
+        await self.store.rpc()
+        self.store.commits += 1
+        self.store.documents.pop(self.path, None)
+        self.store.update_times.pop(self.path, None)
+
+    async def _commit(self, kind: str, data: Dict[str, Any], merge: bool = False) -> None:
+        await self.store.rpc()
+        self.store.commits += 1
+        self.store.apply(kind, self.path, data, merge)
+
+class FakeCollection:
+    _auto_id = 0
+
+    def __init__(self, store: FakeStore, path: str):
+        self.store = store
+        self.path = path
+
+    def document(self, document_id: Optional[str] = None) -> FakeDocument:
+        if document_id is None:
+            FakeCollection._auto_id += 1
+            document_id = f"auto{FakeCollection._auto_id:012d}"
+        return FakeDocument(self.store, f"{self.path}/{document_id}")
+
+    def select(self, field_paths) -> "FakeCollection":
+        return self
+
+    async def stream(self):
+        await self.store.rpc()
+        prefix = f"{self.path}/"
+        for path in list(self.store.documents):
+            # Direct children only, not documents of subcollections
+            if path.startswith(prefix) and "/" not in path[len(prefix):]:
+                self.store.reads += 1
+                yield FakeSnapshot(FakeDocument(self.store, path), self.store.documents.get(path), self.store.update_times.get(path))
+
+class FakeBatch:
+    def __init__(self, store: FakeStore):
+        self.store = store
+        self.ops = []
+
+    def set(self, ref: FakeDocument, data: Dict[str, Any], merge: bool = False) -> None:
+        self.ops.append(("set", ref.path, data, merge))
+
+    def update(self, ref: FakeDocument, data: Dict[str, Any]) -> None:
+        self.ops.append(("update", ref.path, data, False))
+
+    def create(self, ref: FakeDocument, data: Dict[str, Any]) -> None:
+        self.ops.append(("create", ref.path, data, False))
+
+    async def commit(self) -> None:
+        await self.store.rpc()
+        self.store.commits += 1
+        # Validate first so a failing batch applies nothing, like Firestore
+        for kind, path, _, _ in self.ops:
+            if kind == "create" and path in self.store.documents:
+                raise AlreadyExists(f"Document already exists: {path}")
+            if kind == "update" and path not in self.store.documents:
+                raise NotFound(f"No document to update: {path}")
+        for kind, path, data, merge in self.ops:
+            self.store.apply(kind, path, data, merge)
+
+class FakeAsyncClient:
+    """Drop-in for firestore.AsyncClient backed by a shared FakeStore"""
+
+    store = FakeStore()
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def collection(self, name: str) -> FakeCollection:
+        return FakeCollection(self.store, name)
+
+    def batch(self) -> FakeBatch:
+        return FakeBatch(self.store)
+
+    async def get_all(self, references):
+        await self.store.rpc()
+        for reference in references:
+            self.store.reads += 1
+            yield FakeSnapshot(
+                reference,
+                self.store.documents.get(reference.path),
+                self.store.update_times.get(reference.path)
+            )
@@ -0,0 +1,142 @@
+# benchmarks/fake_twilio.py
+
+"""Local Twilio Messages and Content API stand-in with configurable latency and failures"""
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+import uuid
+import uvicorn
+
+class FakeTwilio:
+    """Serve Messages.json from a background thread with its own event loop
+
+    ``contents`` maps content SIDs to the variable names of their templates,
+    served from the Content API so the service's startup check passes.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 10.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        port: Optional[int] = None,
+        contents: Optional[Dict[str, List[str]]] = None
+    ):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.port = port or _free_port()
+        self.contents = contents or {}
+
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        # Message "name" variable -> perf_counter() when Twilio accepted it
+        self.received: Dict[str, float] = {}
+
+        self.app = Starlette(routes=[
+            Route("/2010-04-01/Accounts/{account_sid}/Messages.json", self.create_message, methods=["POST"]),
+            Route("/v1/Content/{sid}", self.fetch_content, methods=["GET"])
+        ])
+        self.server = uvicorn.Server(uvicorn.Config(
+            self.app,
+            host="127.0.0.1",
+            port=self.port,
+            log_level="warning",
+            access_log=False
+        ))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.server.run, daemon=True)
+        self._thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def reset(self) -> None:
+        self.requests = self.throttled = self.errors = 0
+        self.received = {}
+
+    async def create_message(self, request: Request) -> JSONResponse:
+        # Parsed by hand so the benchmark does not need python-multipart
+        form = {key: values[-1] for key, values in parse_qs((await request.body()).decode()).items()}
+        self.requests += 1
+
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        roll = random.random()
+        if roll < self.throttle_rate:
+            self.throttled += 1
+            return JSONResponse({
+                "code": 20429,
+                "message": "Too Many Requests",
+                "status": 429
+            }, status_code=429)
+        if roll < self.throttle_rate + self.error_rate:
+            self.errors += 1
+            return JSONResponse({
+                "code": 20500,
+                "message": "Internal Server Error",
+                "status": 500
+            }, status_code=500)
+
+        variables = json.loads(form.get("ContentVariables") or "{}")
+        self.received[str(variables.get("name"))] = time.perf_counter()
+
+        return JSONResponse({
+            "sid": f"SM{uuid.uuid4().hex}",
+            "account_sid": request.path_params["account_sid"],
+            "from": form.get("From"),
+            "to": form.get("To"),
+            "status": "queued"
+        }, status_code=201)
+
+    async def fetch_content(self, request: Request) -> JSONResponse:
+        sid = request.path_params["sid"]
+        if sid not in self.contents:
+            return JSONResponse({
+                "code": 20404,
+                "message": f"The requested resource /Content/{sid} was not found",
+                "status": 404
+            }, status_code=404)
+
+        variables = self.contents[sid]
+        body = "Olá " + " ".join(f"{{{{{name}}}}}" for name in variables)
+        return JSONResponse({
+            "sid": sid,
+            "account_sid": "ACbenchmark",
+            "friendly_name": sid,
+            "language": "pt_BR",
+            "variables": {name: name for name in variables},
+            "types": {"twilio/text": {"body": body}},
+            "url": str(request.url),
+            "links": {}
+        })
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
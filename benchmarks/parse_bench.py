@@ -0,0 +1,97 @@
+# benchmarks/parse_bench.py
+
+"""Micro-benchmark of per-request parse and render cost on the ingestion endpoints
+
+Compares the previous handling (json.loads into dicts, then model or dict
+validation, then stdlib JSON responses) with the raw-bytes path the routes
+use now (model_validate_json for single targets, one orjson parse and a
+single TypeAdapter pass for batches, direct form parsing of Twilio
+callbacks, orjson responses).
+
+Usage:
+    python -m benchmarks.parse_bench --iterations 20000
+"""
+
+from typing import Any, Callable, Dict, List
+from urllib.parse import urlencode
+import argparse
+import json
+import os
+import timeit
+
+# Settings are built on import; keep the module importable without a .env
+os.environ.setdefault("PROJECT_ID", "benchmark")
+os.environ.setdefault("TWILIO_ACCOUNT_SID", "ACbenchmark")
+os.environ.setdefault("TWILIO_AUTH_TOKEN", "benchmark")
+
+from pydantic import TypeAdapter
+from src.models.campaign import CampaignTarget, CampaignTargetList
+from src.utils.serialization import loads, parse_callback, orjson
+
+def make_target(index: int) -> Dict[str, Any]:
+    return {
+        "id": f"target-{index}",
+        "user_id": "bench-user",
+        "campaign_type": "birthday",
+        "customer_id": f"customer-{index}",
+        "name": f"Cliente {index}",
+        "phone": "5511999990000",
+        "data": {"coupon": "BENCH10", "loyalty_points": index}
+    }
+
+def cases(batch_size: int) -> Dict[str, Dict[str, Callable[[], Any]]]:
+    target_body = json.dumps(make_target(0)).encode()
+    batch_body = json.dumps([make_target(i) for i in range(batch_size)]).encode()
+    callback = {"MessageSid": "SM" + "0" * 32, "MessageStatus": "delivered", "AccountSid": "ACbenchmark"}
+    form_body = urlencode(callback).encode()
+    json_callback = json.dumps(callback).encode()
+    dicts = TypeAdapter(List[Dict[str, Any]])
+    response = {"status": "processing", "target_id": "target-0"}
+
+    def render_fast():
+        return orjson.dumps(response) if orjson is not None else json.dumps(response).encode()
+
+    return {
+        "process-target": {
+            "before": lambda: CampaignTarget.model_validate(json.loads(target_body)),
+            "after": lambda: CampaignTarget.model_validate_json(target_body),
+        },
+        "process-targets": {
+            "before": lambda: [CampaignTarget.model_validate(item) for item in dicts.validate_python(json.loads(batch_body))],
+            "after": lambda: CampaignTargetList.validate_python(loads(batch_body)),
+        },
+        "webhook": {
+            # Twilio callbacks are form-encoded; the old route only read JSON
+            "before": lambda: json.loads(json_callback).get("MessageSid"),
+            "after": lambda: parse_callback(form_body, "application/x-www-form-urlencoded").get("MessageSid"),
+        },
+        "webhook-json": {
+            "before": lambda: json.loads(json_callback),
+            "after": lambda: loads(json_callback),
+        },
+        "response": {
+            "before": lambda: json.dumps(response, ensure_ascii=False, separators=(",", ":")).encode(),
+            "after": render_fast,
+        },
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=100, help="Targets per /process-targets body")
+    args = parser.parse_args()
+
+    print(f"{'case':<18}{'before us':>12}{'after us':>12}{'speedup':>10}")
+    for name, variants in cases(args.batch_size).items():
+        iterations = max(1, args.iterations // args.batch_size) if name == "process-targets" else args.iterations
+        timings = {
+            variant: min(timeit.repeat(call, number=iterations, repeat=3)) / iterations * 1e6
+            for variant, call in variants.items()
+        }
+        print(
+            f"{name:<18}{timings['before']:>12.2f}{timings['after']:>12.2f}"
+            f"{timings['before'] / timings['after']:>9.2f}x"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+# benchmarks/run.py
+
+"""Offline end-to-end benchmark for the WhatsApp service
+
+Runs the real FastAPI app in-process against a local Twilio stand-in and an
+in-memory Firestore (or the emulator when FIRESTORE_EMULATOR_HOST is set),
+then reports throughput, latency percentiles and event-loop lag per
+scenario and concurrency level.
+
+Usage:
+    python -m benchmarks.run --messages 500 --concurrency 1,10,50,100
+    python -m benchmarks.run --twilio-latency-ms 200 --error-rate 0.02 --throttle-rate 0.05
+    python -m benchmarks.run --baseline benchmarks/results/previous.json
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+from benchmarks.fake_twilio import FakeTwilio
+from twilio.request_validator import RequestValidator
+
+BENCH_USER = "bench-user"
+BENCH_CAMPAIGN = "birthday"
+# Content SID and template variables per campaign type, served by FakeTwilio
+BENCH_VARIABLES = {
+    "birthday": ["name", "coupon"],
+    "welcome": ["name"],
+    "reactivation": ["name", "days_inactive"],
+    "loyalty": ["name", "points"]
+}
+BENCH_TEMPLATES = {
+    campaign_type: "HX" + format(index, "032x")
+    for index, campaign_type in enumerate(BENCH_VARIABLES, start=1)
+}
+BENCH_TEMPLATE = BENCH_TEMPLATES[BENCH_CAMPAIGN]
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=500, help="Messages per scenario and concurrency level")
+    parser.add_argument("--concurrency", default="1,10,50,100", help="Comma-separated client concurrency levels")
+    parser.add_argument("--batch-size", type=int, default=100, help="Targets per /process-targets request")
+    parser.add_argument("--scenarios", default="process-target,process-targets,webhook")
+    parser.add_argument("--twilio-latency-ms", type=float, default=50.0)
+    parser.add_argument("--twilio-jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of sends answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of sends answered with 429")
+    parser.add_argument("--firestore-latency-ms", type=float, default=5.0, help="Simulated RPC latency of the in-memory fake")
+    parser.add_argument("--sender-rate", type=float, default=100000.0, help="Per-sender send rate limit (msgs/s)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds to wait for sends to drain")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", help="Earlier result file to compare against")
+    return parser.parse_args()
+
+def configure_environment(args: argparse.Namespace, twilio: FakeTwilio, workdir: str) -> None:
+    """Point the service at the local stand-ins before it is imported"""
+    os.environ.update({
+        "PROJECT_ID": "benchmark",
+        "TWILIO_ACCOUNT_SID": "ACbenchmark",
+        "TWILIO_AUTH_TOKEN": "benchmark",
+        "TWILIO_FROM_NUMBER": "+15550000000",
+        "TWILIO_API_BASE_URL": twilio.base_url,
+        "QUEUE_DB_PATH": os.path.join(workdir, "queue.db"),
+        "CAMPAIGN_SETTINGS_WATCH": "false",
+        "SUPPRESSION_WATCH": "false",
+        "SEND_WINDOW_ENABLED": "false",
+        "SENDER_RATE_PER_SECOND": str(args.sender_rate),
+        "SENDER_BURST": str(args.sender_rate),
+        "ACCOUNT_RATE_PER_SECOND": str(args.sender_rate),
+        "ACCOUNT_BURST": str(args.sender_rate),
+        "MAX_BATCH_SIZE": str(max(args.batch_size, 100)),
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+        "MESSAGE_CONTENT_SIDS": json.dumps(BENCH_TEMPLATES),
+    })
+
+    if not os.environ.get("FIRESTORE_EMULATOR_HOST"):
+        from google.cloud import firestore
+        from benchmarks.fake_firestore import FakeAsyncClient, FakeStore
+
+        FakeAsyncClient.store = FakeStore(args.firestore_latency_ms)
+        firestore.AsyncClient = FakeAsyncClient
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max of a list of seconds, in milliseconds"""
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def pick(fraction: float) -> float:
+        index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+        return round(ordered[index] * 1000, 3)
+
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": pick(1.0)}
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes a short periodic sleeper"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def __enter__(self) -> "LoopLagMonitor":
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._task.cancel()
+
+def make_target(target_id: str) -> Dict[str, Any]:
+    # The name doubles as the key the fake Twilio server records receipts by
+    return {
+        "id": target_id,
+        "user_id": BENCH_USER,
+        "campaign_type": BENCH_CAMPAIGN,
+        "customer_id": f"customer-{target_id}",
+        "name": target_id,
+        "phone": "11999990000",
+        "data": {"coupon": "BENCH10"}
+    }
+
+async def seed_campaign() -> None:
+    from google.cloud import firestore
+
+    await (
+        firestore.AsyncClient().collection("users")
+        .document(BENCH_USER)
+        .collection("campaigns")
+        .document(BENCH_CAMPAIGN)
+        .set({"template_name": BENCH_TEMPLATE, "enabled": True})
+    )
+
+async def drive(
+    client,
+    requests: List[Tuple[str, Dict[str, Any], List[str]]],
+    concurrency: int,
+    sent_at: Optional[Dict[str, float]] = None
+) -> Tuple[List[float], Dict[str, int]]:
+    """Issue requests from ``concurrency`` clients, returning latencies and status counts
+
+    Each request carries the target ids it submits; their start time is
+    recorded in ``sent_at`` for completion latency.
+    """
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    pending = iter(requests)
+
+    async def client_loop() -> None:
+        for path, kwargs, ids in pending:
+            start = time.perf_counter()
+            if sent_at is not None:
+                for target_id in ids:
+                    sent_at[target_id] = start
+            response = await client.post(path, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            key = str(response.status_code)
+            statuses[key] = statuses.get(key, 0) + 1
+
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    return latencies, statuses
+
+async def wait_for_sends(twilio: FakeTwilio, expected: int, timeout: float) -> bool:
+    deadline = time.perf_counter() + timeout
+    while twilio.requests < expected:
+        if time.perf_counter() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+async def run_send_scenario(
+    name: str,
+    client,
+    twilio: FakeTwilio,
+    args: argparse.Namespace,
+    concurrency: int,
+    run_id: str
+) -> Dict[str, Any]:
+    twilio.reset()
+    ids = [f"{run_id}-{name}-{concurrency}-{i}" for i in range(args.messages)]
+
+    if name == "process-targets":
+        batches = [ids[start:start + args.batch_size] for start in range(0, len(ids), args.batch_size)]
+        requests = [
+            ("/process-targets", {"json": [make_target(i) for i in batch]}, batch)
+            for batch in batches
+        ]
+    else:
+        requests = [("/process-target", {"json": make_target(i)}, [i]) for i in ids]
+
+    sent_at: Dict[str, float] = {}
+    with LoopLagMonitor() as lag:
+        start = time.perf_counter()
+        latencies, statuses = await drive(client, requests, concurrency, sent_at)
+        ingest_done = time.perf_counter()
+        drained = await wait_for_sends(twilio, len(ids), args.timeout)
+        end = max(twilio.received.values(), default=time.perf_counter())
+
+    # Time from submitting a target to Twilio accepting its message
+    delivered = [twilio.received[i] - sent_at[i] for i in ids if i in twilio.received]
+    duration = end - start
+
+    return {
+        "scenario": name,
+        "concurrency": concurrency,
+        "messages": len(ids),
+        "requests": len(requests),
+        "drained": drained,
+        "http_statuses": statuses,
+        "ingest_seconds": round(ingest_done - start, 3),
+        "duration_seconds": round(duration, 3),
+        "requests_per_second": round(len(requests) / (ingest_done - start), 1),
+        "messages_per_second": round(len(delivered) / duration, 1) if duration else 0.0,
+        "http_latency_ms": percentiles(latencies),
+        "completion_latency_ms": percentiles(delivered),
+        "loop_lag_ms": percentiles(lag.samples),
+        "twilio": {
+            "requests": twilio.requests,
+            "accepted": len(twilio.received),
+            "throttled": twilio.throttled,
+            "errors": twilio.errors
+        }
+    }
+
+async def run_webhook_scenario(client, args: argparse.Namespace, concurrency: int) -> Dict[str, Any]:
+    statuses = ("queued", "sent", "delivered", "read")
+    sids = [f"SM{uuid.uuid4().hex}" for _ in range(max(1, args.messages // len(statuses)))]
+    # Signed like Twilio does, so the benchmark pays for signature checks
+    validator = RequestValidator("benchmark")
+    url = str(client.base_url.join("/webhook"))
+    requests = []
+    for status in statuses:
+        for sid in sids:
+            form = {"MessageSid": sid, "MessageStatus": status}
+            headers = {"X-Twilio-Signature": validator.compute_signature(url, form)}
+            requests.append(("/webhook", {"data": form, "headers": headers}, []))
+
+    with LoopLagMonitor() as lag:
+        start = time.perf_counter()
+        latencies, http_statuses = await drive(client, requests, concurrency)
+        duration = time.perf_counter() - start
+
+    return {
+        "scenario": "webhook",
+        "concurrency": concurrency,
+        "requests": len(requests),
+        "http_statuses": http_statuses,
+        "duration_seconds": round(duration, 3),
+        "requests_per_second": round(len(requests) / duration, 1) if duration else 0.0,
+        "http_latency_ms": percentiles(latencies),
+        "loop_lag_ms": percentiles(lag.samples)
+    }
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    """Print throughput and p99 changes against an earlier run"""
+    baseline = {
+        (entry["scenario"], entry["concurrency"]): entry
+        for entry in json.loads(Path(baseline_path).read_text())["results"]
+    }
+    print(f"\nCompared with {baseline_path}:")
+    for entry in results:
+        previous = baseline.get((entry["scenario"], entry["concurrency"]))
+        if previous is None:
+            continue
+
+        rate_key = "messages_per_second" if "messages_per_second" in entry else "requests_per_second"
+        old_rate, new_rate = previous.get(rate_key, 0.0), entry[rate_key]
+        change = f" ({(new_rate / old_rate - 1) * 100:+.1f}%)" if old_rate else ""
+        print(
+            f"  {entry['scenario']:<16} c={entry['concurrency']:<4} "
+            f"{rate_key}: {old_rate} -> {new_rate}{change} | "
+            f"http p99 ms: {previous['http_latency_ms']['p99']} -> {entry['http_latency_ms']['p99']}"
+        )
+
+async def run(args: argparse.Namespace, twilio: FakeTwilio) -> List[Dict[str, Any]]:
+    import httpx
+    from src.main import app
+
+    await seed_campaign()
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    levels = [int(level) for level in args.concurrency.split(",")]
+    run_id = uuid.uuid4().hex[:8]
+    results = []
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for name in scenarios:
+                for concurrency in levels:
+                    if name == "webhook":
+                        entry = await run_webhook_scenario(client, args, concurrency)
+                    else:
+                        entry = await run_send_scenario(name, client, twilio, args, concurrency, run_id)
+                    results.append(entry)
+                    print(
+                        f"{entry['scenario']:<16} c={concurrency:<4} "
+                        f"msgs/s={entry.get('messages_per_second', '-'):<8} "
+                        f"req/s={entry['requests_per_second']:<8} "
+                        f"http p50/p99={entry['http_latency_ms']['p50']}/{entry['http_latency_ms']['p99']}ms "
+                        f"loop lag p99={entry['loop_lag_ms']['p99']}ms"
+                    )
+    return results
+
+def main() -> None:
+    args = parse_args()
+    twilio = FakeTwilio(
+        latency_ms=args.twilio_latency_ms,
+        jitter_ms=args.twilio_jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        contents={BENCH_TEMPLATES[campaign_type]: names for campaign_type, names in BENCH_VARIABLES.items()}
+    )
+    twilio.start()
+
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            configure_environment(args, twilio, workdir)
+            results = asyncio.run(run(args, twilio))
+    finally:
+        twilio.stop()
+
+    from src import __version__
+
+    started = datetime.now(timezone.utc)
+    report = {
+        "meta": {
+            "timestamp": started.isoformat(),
+            "version": __version__,
+            "git_revision": git_revision(),
+            "python": sys.version.split()[0],
+            "firestore": "emulator" if os.environ.get("FIRESTORE_EMULATOR_HOST") else "in-memory",
+            "parameters": vars(args)
+        },
+        "results": results
+    }
+
+    output = Path(args.output or f"benchmarks/results/{started.strftime('%Y%m%dT%H%M%SZ')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,19 @@
 # src/__init__.py
 
+import time
+
+# Reference point for the startup-time breakdown logged on boot
+BOOT_STARTED = time.perf_counter()
+
 from src.config import settings
 from src.utils.logging import setup_logging
 
 # Set up logging on package import
-setup_logging(settings.LOG_LEVEL)
+setup_logging(
+    settings.LOG_LEVEL,
+    fast_json=settings.LOG_FAST_JSON,
+    async_emit=settings.LOG_ASYNC,
+    sample_rates=settings.LOG_SAMPLE_RATES
+)
 
 __version__ = "1.0.0"
\ No newline at end of file
@@ -10,6 +10,26 @@ class MessageStatus(str, Enum):
     READ = "read"
     FAILED = "failed"
 
+# Progress order of message statuses, following MessageStatus with Twilio's
+# extra statuses ranked alongside them
+MESSAGE_STATUS_RANK = {
+    "pending": 0,
+    "scheduled": 0,
+    "accepted": 1,
+    "queued": 1,
+    "sending": 2,
+    "sent": 3,
+    "delivered": 4,
+    "read": 5,
+}
+
+# Milestones a message passes on its way to read, counted even when the
+# callback reporting them was coalesced into a later one
+DELIVERY_MILESTONES = ("sent", "delivered", "read")
+
+# Statuses after which a message never changes again
+TERMINAL_FAILURE_STATUSES = {"failed", "undelivered", "canceled"}
+
 class CampaignType(str, Enum):
     BIRTHDAY = "birthday"
     WELCOME = "welcome"
@@ -24,6 +44,22 @@ TEMPLATE_PARAMS = {
     "loyalty": ["name", "points"]
 }
 
+# Target data fields that feed template parameters other than the name
+TEMPLATE_PARAM_SOURCES = {
+    "coupon": "coupon",
+    "days_inactive": "days_since_last_purchase",
+    "points": "loyalty_points",
+}
+
+# Dispatch order of a tenant's due targets, lowest first; time-sensitive
+# campaigns go ahead of bulk ones
+CAMPAIGN_PRIORITY = {
+    "birthday": 0,
+    "welcome": 1,
+    "loyalty": 2,
+    "reactivation": 3,
+}
+
 # Error messages
 ERROR_MESSAGES = {
     "invalid_phone": "Invalid phone number format",
@@ -31,6 +67,7 @@ ERROR_MESSAGES = {
     "invalid_campaign": "Invalid campaign type",
     "message_too_long": "Message content exceeds maximum length",
     "missing_params": "Missing required template parameters",
+    "invalid_content_sid": "Template must be a Twilio content SID (HX followed by 32 hex digits)",
 }
 
 # Queue settings
@@ -40,6 +77,39 @@ QUEUE_CONFIG = {
     "max_batch_size": 100,
 }
 
+# Twilio error codes by retry class; other 21xxx codes are request errors
+# and are treated as permanent, anything else as transient
+TWILIO_ERROR_CODES = {
+    "rate_limited": {20429, 63018, 63038},
+    "permanent": {63003, 63016, 63024, 63032},
+}
+
+# Twilio errors that mean a number cannot receive WhatsApp messages, with
+# the suppression reason recorded for it
+SUPPRESSION_ERROR_CODES = {
+    21610: "opted_out",  # Recipient unsubscribed
+    63003: "undeliverable",  # Invalid destination number
+    63024: "undeliverable",  # Invalid message recipient
+}
+
+# Inbound replies that opt a number out of, or back into, campaigns
+OPT_OUT_KEYWORDS = {"STOP", "PARAR", "SAIR", "CANCELAR", "DESCADASTRAR", "UNSUBSCRIBE"}
+OPT_IN_KEYWORDS = {"START", "VOLTAR", "UNSTOP"}
+
+# Error code of sends refused locally while the Twilio circuit is open
+CIRCUIT_OPEN_ERROR = "circuit_open"
+
+# Status of sends that failed after the request may have reached Twilio;
+# they are neither retried nor released and are left for reconciliation
+SEND_UNKNOWN_STATUS = "unknown"
+
+# Base retry delay per error class, doubled on each attempt
+RETRY_BACKOFF_SECONDS = {
+    "rate_limited": 30,
+    "transient": QUEUE_CONFIG["backoff_seconds"],
+    "unavailable": 30,
+}
+
 # Brazil timezone
 BRAZIL_TIMEZONE = "America/Sao_Paulo"
 
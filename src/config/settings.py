@@ -2,32 +2,133 @@
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
+import time
 
 class Settings(BaseSettings):
     # Project settings
     PROJECT_ID: str
     ENVIRONMENT: str = "development"
     LOG_LEVEL: str = "INFO"
+    LOG_FAST_JSON: bool = False
+    LOG_ASYNC: bool = False
+    LOG_SAMPLE_RATES: dict = {}  # e.g. {"webhook_received": 0.01}
+
+    # Tracing settings
+    TRACING_EXPORTER: str = "none"  # "console", "otlp" or "none"
+    TRACING_SAMPLE_RATIO: float = 1.0
+    TRACING_SERVICE_NAME: str = "vmhub-whatsapp"
+    TRACING_OTLP_ENDPOINT: Optional[str] = None  # Defaults to OTEL_EXPORTER_OTLP_ENDPOINT
 
     # Twilio settings
     TWILIO_ACCOUNT_SID: str
     TWILIO_AUTH_TOKEN: str
+    TWILIO_FROM_NUMBER: Optional[str] = None
+    TWILIO_VERIFY_SERVICE_SID: Optional[str] = None
+
+    # Twilio HTTP transport settings
+    TWILIO_API_BASE_URL: Optional[str] = None  # e.g. a local stand-in for benchmarks
+    TWILIO_HTTP_POOL_SIZE: int = 200
+    TWILIO_HTTP_KEEPALIVE_SECONDS: float = 30.0
+    TWILIO_HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    TWILIO_HTTP_TIMEOUT_SECONDS: float = 15.0
+
+    # Send rate limits (messages per second)
+    SENDER_RATE_PER_SECOND: float = 80.0
+    SENDER_BURST: float = 80.0
+    SENDER_RATE_OVERRIDES: dict = {}
+    ACCOUNT_RATE_PER_SECOND: float = 100.0
+    ACCOUNT_BURST: float = 100.0
+
+    # Send resilience settings
+    SEND_CONCURRENCY_INITIAL: int = 50
+    SEND_CONCURRENCY_MIN: int = 5
+    SEND_CONCURRENCY_MAX: int = 200
+    SEND_LATENCY_TARGET_MS: float = 1000.0  # Concurrency only grows while sends are faster than this
+    CIRCUIT_FAILURE_RATIO: float = 0.5
+    CIRCUIT_MIN_CALLS: int = 20
+    CIRCUIT_WINDOW: int = 100
+    CIRCUIT_RESET_SECONDS: float = 30.0
+    CIRCUIT_HALF_OPEN_PROBES: int = 5
 
     # Service settings
     MAX_RETRIES: int = 3
     RETRY_DELAY_SECONDS: int = 300  # 5 minutes
     MAX_BATCH_SIZE: int = 100
+    BATCH_RESULTS_TTL_DAYS: int = 7  # /process-targets results stay readable this long
+
+    # Work queue settings
+    # SQLite needs a local filesystem for WAL, so not a network mount. On
+    # Cloud Run /tmp is in-memory: queued jobs count against the instance's
+    # memory and are lost when it shuts down, so keep the instance alive
+    # (min instances, CPU always allocated) until the queue drains
+    QUEUE_DB_PATH: str = "/tmp/vmhub_whatsapp_queue.db"
+    QUEUE_WORKERS: int = 50
+    QUEUE_LEASE_SECONDS: float = 120.0
+    QUEUE_POLL_INTERVAL_SECONDS: float = 1.0
+    QUEUE_WORKER_ENABLED: bool = True  # Disable when a separate dispatcher drains the queue
+    DISPATCHER_PROCESSES: int = 0  # 0 uses one process per CPU
+    TENANT_DEFAULT_WEIGHT: float = 1.0
+    TENANT_WEIGHTS: dict = {}  # user_id -> share of each claim relative to the default
+    SEND_WINDOW_ENABLED: bool = True
+    SEND_WINDOW_MINUTES: int = 60  # Sends are spread evenly across this window after send_time
+
+    # Bulk import settings
+    IMPORT_CHUNK_SIZE: int = 500
+
+    # Campaign run settings
+    CAMPAIGN_RUN_PAGE_SIZE: int = 500
+    CAMPAIGN_RUN_MAX_QUEUED: int = 10_000  # Paging pauses while the tenant has this many queued jobs
+    CAMPAIGN_RUN_POLL_SECONDS: float = 5.0
+    CAMPAIGN_RUN_LEASE_SECONDS: float = 300.0  # A running checkpoint updated this recently belongs to a live run
+
+    # Idempotency settings
+    IDEMPOTENCY_CACHE_SIZE: int = 100_000
+    IDEMPOTENCY_TTL_DAYS: int = 30
+
+    # Firestore settings
+    FIRESTORE_BATCH_MAX_OPS: int = 500
+    FIRESTORE_BATCH_FLUSH_MS: int = 50
+
+    # Campaign delivery statistics
+    CAMPAIGN_STATS_SHARDS: int = 10
+    CAMPAIGN_STATS_CACHE_SIZE: int = 100_000  # Recently sent messages whose campaign and day are kept
+    CAMPAIGN_STATS_MAX_DAYS: int = 92
+
+    # Campaign settings cache
+    CAMPAIGN_SETTINGS_CACHE_SIZE: int = 256
+    CAMPAIGN_SETTINGS_CACHE_TTL_SECONDS: float = 300.0
+    CAMPAIGN_SETTINGS_WATCH: bool = True
+    CAMPAIGN_SETTINGS_MAX_WATCHES: int = 32  # Snapshot listeners, one thread each
+
+    # Suppression list
+    SUPPRESSION_WATCH: bool = True  # Follow changes made by other processes with a snapshot listener
+    SUPPRESSION_REFRESH_SECONDS: float = 60.0  # Re-read interval when not watching
+
+    # Business phone verification
+    VERIFICATION_CACHE_SIZE: int = 10_000
+    VERIFICATION_CACHE_TTL_SECONDS: float = 600.0
+    VERIFICATION_RESEND_SECONDS: float = 60.0  # Repeated starts within this reuse the pending code
+    VERIFICATION_MAX_ATTEMPTS: int = 5  # Per number and action within the window
+    VERIFICATION_ATTEMPT_WINDOW_SECONDS: float = 600.0
+
+    # Startup settings
+    STARTUP_PREWARM: bool = True
+    STARTUP_PREWARM_TIMEOUT_SECONDS: float = 5.0
 
     # WhatsApp settings
-    MESSAGE_TEMPLATES: dict = {
-        "birthday": "birthday_template",
-        "welcome": "welcome_template",
-        "reactivation": "reactivation_template",
-        "loyalty": "loyalty_template"
-    }
+    # Twilio content template SID (HX...) per campaign type, e.g.
+    # {"birthday": "HX..."}; a SID is one approved template in one language
+    MESSAGE_CONTENT_SIDS: dict = {}
 
     # Webhook settings
-    WEBHOOK_SECRET: Optional[str] = None
+    WEBHOOK_VALIDATE_SIGNATURE: bool = True  # Check X-Twilio-Signature against TWILIO_AUTH_TOKEN
+    WEBHOOK_PUBLIC_URL: Optional[str] = None  # URL configured in Twilio, if it differs from the one seen here
+    WEBHOOK_FLUSH_INTERVAL_MS: int = 250
+    WEBHOOK_FLUSH_MAX_ENTRIES: int = 500
+    STATUS_CACHE_SIZE: int = 100_000  # Last known status of recent messages
+    STATUS_FLUSH_MAX_ATTEMPTS: int = 5  # Failed writes of an update before it is dropped
+    STATUS_FLUSH_BACKOFF_SECONDS: float = 1.0  # Doubled on each failed write
+    STATUS_FLUSH_MAX_BACKOFF_SECONDS: float = 60.0
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -39,5 +140,7 @@ class Settings(BaseSettings):
     def is_production(self) -> bool:
         return self.ENVIRONMENT.lower() == "production"
 
-# Create global settings instance
-settings = Settings()
\ No newline at end of file
+# Create global settings instance, timed for the startup log
+_load_started = time.perf_counter()
+settings = Settings()
+SETTINGS_LOAD_SECONDS = time.perf_counter() - _load_started
\ No newline at end of file
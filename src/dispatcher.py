@@ -0,0 +1,152 @@
+# src/dispatcher.py
+
+"""Standalone dispatcher that drains the work queue outside the web process
+
+Runs one worker process per shard. Each process claims only the jobs of
+tenants whose ``user_id`` hashes to its shard, so a tenant's targets are
+always sent by the same process, and builds its own MessageProcessor
+pipeline. Run the web tier with QUEUE_WORKER_ENABLED=false so it only
+validates and enqueues; both must share QUEUE_DB_PATH.
+
+Usage:
+    python -m src.dispatcher --processes 4
+"""
+
+from src.config import settings
+from src.utils.logging import get_logger
+from src.utils.tracing import setup_tracing, shutdown_tracing
+from typing import Dict, List
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import time
+
+logger = get_logger(__name__)
+
+# Seconds a worker gets to finish in-flight jobs before it is killed
+SHUTDOWN_GRACE_SECONDS = 30.0
+
+def shard_environment(processes: int) -> Dict[str, str]:
+    """Split account-wide limits so all processes together stay within them"""
+    def share(value: float) -> str:
+        return str(value / processes)
+
+    return {
+        "SENDER_RATE_PER_SECOND": share(settings.SENDER_RATE_PER_SECOND),
+        "SENDER_BURST": share(settings.SENDER_BURST),
+        "SENDER_RATE_OVERRIDES": json.dumps({
+            number: rate / processes
+            for number, rate in settings.SENDER_RATE_OVERRIDES.items()
+        }),
+        "ACCOUNT_RATE_PER_SECOND": share(settings.ACCOUNT_RATE_PER_SECOND),
+        "ACCOUNT_BURST": share(settings.ACCOUNT_BURST),
+        "SEND_CONCURRENCY_INITIAL": str(max(1, settings.SEND_CONCURRENCY_INITIAL // processes)),
+        "SEND_CONCURRENCY_MAX": str(max(1, settings.SEND_CONCURRENCY_MAX // processes)),
+        "SEND_CONCURRENCY_MIN": str(max(1, settings.SEND_CONCURRENCY_MIN // processes)),
+    }
+
+async def serve_shard(index: int, count: int) -> None:
+    """Drain one shard of the work queue until SIGTERM or SIGINT"""
+    from src.services.container import ServiceContainer
+
+    setup_tracing(
+        settings.TRACING_EXPORTER,
+        sample_ratio=settings.TRACING_SAMPLE_RATIO,
+        service_name=f"{settings.TRACING_SERVICE_NAME}-dispatcher",
+        otlp_endpoint=settings.TRACING_OTLP_ENDPOINT
+    )
+    services = ServiceContainer(shard=(index, count))
+    await services.processor.templates.load(services.twilio)
+    if settings.STARTUP_PREWARM:
+        await services.prewarm()
+    services.start()
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopping.set)
+
+    logger.info("dispatcher_shard_started", shard=index, shards=count, pid=os.getpid())
+    try:
+        await stopping.wait()
+    finally:
+        await services.close()
+        shutdown_tracing()
+        logger.info("dispatcher_shard_stopped", shard=index, shards=count)
+
+def run_shard(index: int, count: int) -> None:
+    asyncio.run(serve_shard(index, count))
+
+class Dispatcher:
+    """Start one process per shard and restart any that exit unexpectedly"""
+
+    def __init__(self, processes: int):
+        self.processes = processes
+        self.logger = logger
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: List[multiprocessing.Process] = []
+        self._stopping = False
+
+    def run(self) -> None:
+        # Spawned workers build their settings from this environment
+        os.environ.update(shard_environment(self.processes))
+        self._workers = [self._spawn(index) for index in range(self.processes)]
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        self.logger.info("dispatcher_started", processes=self.processes)
+
+        while not self._stopping:
+            for index, worker in enumerate(self._workers):
+                if not worker.is_alive() and not self._stopping:
+                    self.logger.error(
+                        "dispatcher_shard_exited",
+                        shard=index,
+                        exitcode=worker.exitcode
+                    )
+                    self._workers[index] = self._spawn(index)
+            time.sleep(1.0)
+
+        self._shutdown()
+
+    def _spawn(self, index: int) -> multiprocessing.Process:
+        worker = self._context.Process(
+            target=run_shard,
+            args=(index, self.processes),
+            name=f"dispatcher-{index}"
+        )
+        worker.start()
+        return worker
+
+    def _stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _shutdown(self) -> None:
+        for worker in self._workers:
+            if worker.is_alive():
+                worker.terminate()
+
+        deadline = time.monotonic() + SHUTDOWN_GRACE_SECONDS
+        for worker in self._workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+            if worker.is_alive():
+                worker.kill()
+                worker.join()
+        self.logger.info("dispatcher_stopped", processes=self.processes)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=settings.DISPATCHER_PROCESSES or os.cpu_count() or 1,
+        help="Worker processes, one per shard"
+    )
+    args = parser.parse_args()
+    Dispatcher(max(1, args.processes)).run()
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,84 @@
 # src/main.py
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from src.config import settings
-from src.services import MessageProcessor, TwilioClient
-from src.models.campaign import CampaignTarget
+from src.config.settings import SETTINGS_LOAD_SECONDS
+from src import BOOT_STARTED
+from src.services import ServiceContainer
+from src.models.campaign import CampaignTarget, CampaignTargetList
+from src.config.constants import CampaignType
 from src.models.business import BusinessPhone, PhoneVerification
+from src.utils.helpers import get_brazil_time
 from src.utils.logging import setup_logging, get_logger, RequestContextMiddleware
-from typing import Dict
+from src.utils.metrics import MetricsMiddleware, REGISTRY, IN_FLIGHT, QUEUE_DEPTH, QUEUE_OLDEST_AGE
+from src.utils.serialization import FORM_CONTENT_TYPE, FastJSONResponse, loads, parse_callback
+from src.utils.tracing import TracingMiddleware, setup_tracing, shutdown_tracing, span
+from pydantic import ValidationError
+from twilio.request_validator import RequestValidator
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+from typing import Dict, List, Any, Optional, Tuple, Union
 import structlog
 import json
+import time
 
 # Set up logging
-setup_logging(settings.LOG_LEVEL)
+setup_logging(
+    settings.LOG_LEVEL,
+    fast_json=settings.LOG_FAST_JSON,
+    async_emit=settings.LOG_ASYNC,
+    sample_rates=settings.LOG_SAMPLE_RATES
+)
 logger = get_logger(__name__)
 
+setup_tracing(
+    settings.TRACING_EXPORTER,
+    sample_ratio=settings.TRACING_SAMPLE_RATIO,
+    service_name=settings.TRACING_SERVICE_NAME,
+    otlp_endpoint=settings.TRACING_OTLP_ENDPOINT
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build shared clients, pre-warm connections and start the queue worker"""
+    started = time.perf_counter()
+    services = ServiceContainer()
+    await services.processor.templates.load(services.twilio)
+    prewarm = await services.prewarm() if settings.STARTUP_PREWARM else {}
+    if settings.QUEUE_WORKER_ENABLED:
+        services.start()
+    app.state.services = services
+
+    logger.info(
+        "startup_complete",
+        import_ms=round((IMPORT_SECONDS - SETTINGS_LOAD_SECONDS) * 1000, 1),
+        settings_ms=round(SETTINGS_LOAD_SECONDS * 1000, 1),
+        client_init_ms=round(services.init_seconds * 1000, 1),
+        prewarm_ms=prewarm,
+        lifespan_ms=round((time.perf_counter() - started) * 1000, 1),
+        total_ms=round((time.perf_counter() - BOOT_STARTED) * 1000, 1)
+    )
+    try:
+        yield
+    finally:
+        await services.close()
+        shutdown_tracing()
+
 app = FastAPI(
     title="VMHub WhatsApp Service",
     description="WhatsApp messaging service for VMHub campaigns",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Add middleware
 app.add_middleware(RequestContextMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -31,21 +87,100 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-processor = MessageProcessor()
-twilio = TwilioClient()
+# Content types accepted by /import-targets
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+def json_body(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """OpenAPI request body for routes that validate the raw body themselves"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": schema}}
+        }
+    }
+
+# Twilio signs each callback with the account's auth token
+webhook_validator = RequestValidator(settings.TWILIO_AUTH_TOKEN)
+
+def webhook_url(request: Request) -> str:
+    """URL Twilio requested, which its signature covers"""
+    if settings.WEBHOOK_PUBLIC_URL:
+        query = request.url.query
+        return settings.WEBHOOK_PUBLIC_URL + (f"?{query}" if query else "")
+    # Behind Cloud Run's proxy the app sees http while Twilio called https
+    proto = request.headers.get("x-forwarded-proto")
+    return str(request.url.replace(scheme=proto) if proto else request.url)
+
+def valid_signature(request: Request, params: Union[Dict[str, Any], str]) -> bool:
+    """Check X-Twilio-Signature over the URL and form fields, or the JSON body"""
+    signature = request.headers.get("x-twilio-signature")
+    if not signature:
+        return False
+    return webhook_validator.validate(webhook_url(request), params, signature)
+
+def get_services(request: Request) -> ServiceContainer:
+    """Shared services built by the lifespan handler"""
+    return request.app.state.services
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "whatsapp"}
 
-@app.post("/process-target")
+@app.get("/stats")
+async def stats(services: ServiceContainer = Depends(get_services)):
+    """Internal counters for monitoring"""
+    return {
+        "campaign_settings_cache": services.processor.settings_cache.stats(),
+        "send_scheduler": services.processor.twilio.scheduler.stats(),
+        "send_limiter": services.twilio.limiter.stats(),
+        "send_circuit": services.twilio.breaker.stats(),
+        "idempotency": services.processor.idempotency.stats(),
+        "status_updates": services.processor.status_updates.stats(),
+        "campaign_stats": services.processor.campaign_stats.stats(),
+        "suppression": services.processor.suppression.stats(),
+        "send_window": services.send_window.stats(),
+        "verifications": services.verifications.stats(),
+        "batch_results": services.batch_results.stats(),
+        "work_queue": {
+            **await services.work_queue.stats(),
+            "in_flight": services.worker.in_flight
+        },
+        "fair_queue": services.worker.fairness.stats(
+            await services.work_queue.tenant_counts(services.worker.fairness.tenants)
+        )
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(services: ServiceContainer = Depends(get_services)):
+    """Prometheus metrics"""
+    queue_stats = await services.work_queue.stats()
+    QUEUE_DEPTH.set(queue_stats["depth"], "total")
+    QUEUE_DEPTH.set(queue_stats["ready"], "ready")
+    QUEUE_DEPTH.set(queue_stats["dead_letters"], "dead_letter")
+    QUEUE_OLDEST_AGE.set(queue_stats["oldest_age_seconds"])
+    IN_FLIGHT.set(services.worker.in_flight, "queue_worker")
+    return PlainTextResponse(
+        REGISTRY.render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+@app.post("/process-target", openapi_extra=json_body(CampaignTarget.model_json_schema()))
 async def process_target(
-    target: CampaignTarget,
-    background_tasks: BackgroundTasks
+    request: Request,
+    services: ServiceContainer = Depends(get_services)
 ):
     """Process a campaign target"""
+    # Validated straight from the raw bytes, without a dict in between
+    try:
+        target = CampaignTarget.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+
     try:
         logger.info(
             "processing_target",
@@ -53,8 +188,15 @@ async def process_target(
             campaign_type=target.campaign_type,
             target_id=target.id
         )
+
+        # Reject recently sent targets without touching the queue
+        if services.processor.idempotency.seen(target):
+            return {
+                "status": "duplicate",
+                "target_id": target.id
+            }
         
-        background_tasks.add_task(processor.process_target, target)
+        await services.send_window.enqueue([target])
         
         return {
             "status": "processing",
@@ -68,12 +210,221 @@ async def process_target(
         )
         raise HTTPException(status_code=500, detail=str(e))
 
+def validate_targets(body: bytes) -> Tuple[List[CampaignTarget], List[Dict[str, Any]]]:
+    """Validate a JSON array of targets, reporting invalid items by index"""
+    try:
+        items = loads(body)
+    except ValueError as e:
+        raise RequestValidationError([{"type": "json_invalid", "loc": ("body",), "msg": str(e)}])
+    if not isinstance(items, list):
+        raise RequestValidationError([{"type": "list_type", "loc": ("body",), "msg": "Input should be a valid list"}])
+    # Refuse oversized batches before validating any target
+    if len(items) > settings.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds maximum size of {settings.MAX_BATCH_SIZE}"
+        )
+
+    # Fast path: the whole array is valid and validated in one pass
+    try:
+        return CampaignTargetList.validate_python(items), []
+    except ValidationError:
+        pass
+
+    valid: List[CampaignTarget] = []
+    rejected = []
+    for index, item in enumerate(items):
+        try:
+            valid.append(CampaignTarget.model_validate(item))
+        except ValidationError as e:
+            rejected.append({
+                "index": index,
+                "target_id": item.get("id") if isinstance(item, dict) else None,
+                "errors": [
+                    f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+                    for error in e.errors()
+                ]
+            })
+    return valid, rejected
+
+@app.post(
+    "/process-targets",
+    openapi_extra=json_body({"type": "array", "items": CampaignTarget.model_json_schema()})
+)
+async def process_targets(
+    request: Request,
+    services: ServiceContainer = Depends(get_services)
+):
+    """Queue a batch of campaign targets, returning a batch id to read its results from"""
+    valid, rejected = validate_targets(await request.body())
+
+    try:
+        accepted: List[CampaignTarget] = []
+        duplicates = []
+        for target in valid:
+            if services.processor.idempotency.seen(target):
+                duplicates.append(target.id)
+            else:
+                accepted.append(target)
+
+        logger.info(
+            "processing_targets",
+            accepted=len(accepted),
+            rejected=len(rejected),
+            duplicates=len(duplicates)
+        )
+
+        response = {
+            "status": "processing",
+            "accepted": [target.id for target in accepted],
+            "rejected": rejected,
+            "duplicates": duplicates
+        }
+
+        if not accepted:
+            response["status"] = "rejected"
+        else:
+            # Recorded first so the id never points at targets that were not queued
+            response["batch_id"] = await services.batch_results.record(accepted, rejected, duplicates)
+            await services.send_window.enqueue(accepted)
+
+        return response
+    except Exception as e:
+        logger.error(
+            "targets_processing_error",
+            error=str(e)
+        )
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/process-targets/{batch_id}")
+async def process_targets_results(
+    batch_id: str,
+    services: ServiceContainer = Depends(get_services)
+):
+    """Send outcome of each target in a batch, with counts per status"""
+    try:
+        results = await services.batch_results.get(batch_id)
+    except Exception as e:
+        logger.error(
+            "batch_results_error",
+            error=str(e),
+            batch_id=batch_id
+        )
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if results is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return results
+
+@app.post("/import-targets")
+async def import_targets(
+    request: Request,
+    format: Optional[str] = None,
+    user_id: Optional[str] = None,
+    campaign_type: Optional[CampaignType] = None,
+    services: ServiceContainer = Depends(get_services)
+):
+    """Stream a CSV or NDJSON export of targets into the work queue"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    fmt = format or IMPORT_FORMATS.get(content_type)
+    if fmt not in ("csv", "ndjson"):
+        raise HTTPException(
+            status_code=415,
+            detail="Upload must be CSV or NDJSON"
+        )
+
+    # Query parameters fill in columns the export does not carry
+    defaults = {}
+    if user_id:
+        defaults["user_id"] = user_id
+    if campaign_type:
+        defaults["campaign_type"] = campaign_type
+
+    try:
+        summary = await services.importer.run(request.stream(), fmt, defaults)
+        return {"status": "imported", **summary}
+    except Exception as e:
+        logger.error(
+            "target_import_error",
+            error=str(e)
+        )
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/campaigns/{user_id}/{campaign_type}/run", status_code=202)
+async def run_campaign(
+    user_id: str,
+    campaign_type: CampaignType,
+    restart: bool = False,
+    services: ServiceContainer = Depends(get_services)
+):
+    """Queue a campaign's unprocessed targets from Firestore, resuming an interrupted run"""
+    campaign_settings = await services.processor.settings_cache.get(user_id, campaign_type)
+    if campaign_settings is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    if not campaign_settings.enabled:
+        raise HTTPException(status_code=409, detail="Campaign is disabled")
+
+    try:
+        return await services.campaign_runs.start(user_id, campaign_type, restart=restart)
+    except Exception as e:
+        logger.error(
+            "campaign_run_start_error",
+            error=str(e),
+            user_id=user_id,
+            campaign_type=campaign_type
+        )
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/campaigns/{user_id}/{campaign_type}/run")
+async def campaign_run_status(
+    user_id: str,
+    campaign_type: CampaignType,
+    services: ServiceContainer = Depends(get_services)
+):
+    """Progress of a campaign's latest run"""
+    checkpoint = await services.campaign_runs.status(user_id, campaign_type)
+    if not checkpoint:
+        raise HTTPException(status_code=404, detail="Campaign has not been run")
+    return checkpoint
+
+@app.get("/campaigns/{user_id}/{campaign_type}/stats")
+async def campaign_stats(
+    user_id: str,
+    campaign_type: CampaignType,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    services: ServiceContainer = Depends(get_services)
+):
+    """Delivery counts and rates per day, defaulting to the last 7 days"""
+    end = end or get_brazil_time().date()
+    start = start or end - timedelta(days=6)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days >= settings.CAMPAIGN_STATS_MAX_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range exceeds {settings.CAMPAIGN_STATS_MAX_DAYS} days"
+        )
+
+    try:
+        return await services.processor.campaign_stats.get(user_id, campaign_type, start, end)
+    except Exception as e:
+        logger.error(
+            "campaign_stats_error",
+            error=str(e),
+            user_id=user_id,
+            campaign_type=campaign_type
+        )
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/verify-number")
-async def verify_number(phone: BusinessPhone):
+async def verify_number(
+    phone: BusinessPhone,
+    services: ServiceContainer = Depends(get_services)
+):
     """Start phone number verification process"""
     try:
-        result = await twilio.verify_number(phone.phone_number)
-        return result
+        result = await services.verifications.start(phone.user_id, phone.phone_number)
     except Exception as e:
         logger.error(
             "verification_error",
@@ -82,15 +433,26 @@ async def verify_number(phone: BusinessPhone):
         )
         raise HTTPException(status_code=500, detail=str(e))
 
+    if result["status"] == "rate_limited":
+        raise HTTPException(
+            status_code=429,
+            detail="Too many verification attempts for this number",
+            headers={"Retry-After": str(int(result["retry_after"]) + 1)}
+        )
+    return result
+
 @app.post("/check-verification")
-async def check_verification(verification: PhoneVerification):
+async def check_verification(
+    verification: PhoneVerification,
+    services: ServiceContainer = Depends(get_services)
+):
     """Check verification code"""
     try:
-        result = await twilio.check_verification(
+        result = await services.verifications.check(
+            verification.user_id,
             verification.phone_number,
             verification.code
         )
-        return {"verified": result}
     except Exception as e:
         logger.error(
             "verification_check_error",
@@ -98,34 +460,73 @@ async def check_verification(verification: PhoneVerification):
         )
         raise HTTPException(status_code=500, detail=str(e))
 
+    if result.get("status") == "rate_limited":
+        raise HTTPException(
+            status_code=429,
+            detail="Too many verification attempts for this number",
+            headers={"Retry-After": str(int(result["retry_after"]) + 1)}
+        )
+    return {"verified": result["verified"]}
+
 @app.post("/webhook")
-async def webhook_handler(request: Request):
+async def webhook_handler(
+    request: Request,
+    services: ServiceContainer = Depends(get_services)
+):
     """Handle Twilio webhook"""
     try:
-        body = await request.json()
+        # Twilio posts form-encoded callbacks; JSON is accepted too
+        raw = await request.body()
+        content_type = request.headers.get("content-type", "")
+        try:
+            body = parse_callback(raw, content_type)
+        except ValueError as e:
+            logger.warning("webhook_invalid_body", error=str(e))
+            raise HTTPException(status_code=400, detail="Webhook body must be a form or JSON object")
         logger.info("webhook_received", payload=body)
-        
-        # Validate webhook signature if configured
-        if settings.WEBHOOK_SECRET:
-            # Add signature validation here
-            pass
-            
+
+        # Unsigned callbacks could re-subscribe or block any number
+        if settings.WEBHOOK_VALIDATE_SIGNATURE:
+            signed = body if content_type.split(";", 1)[0].strip() == FORM_CONTENT_TYPE else raw.decode("utf-8")
+            if not valid_signature(request, signed):
+                logger.warning("webhook_signature_invalid", message_sid=body.get("MessageSid"))
+                raise HTTPException(status_code=403, detail="Invalid Twilio signature")
+
         # Process status update
         message_sid = body.get("MessageSid")
         status = body.get("MessageStatus")
-        
-        if message_sid and status:
-            # Update message status
-            await processor._update_message_history(
-                message_sid,
-                {"status": status}
-            )
-            
+
+        with span(
+            "webhook",
+            message_sid=message_sid,
+            message_status=status,
+            error_code=body.get("ErrorCode") or None
+        ):
+            if message_sid and status:
+                # Coalesced with other callbacks into a batched write
+                services.processor.status_updates.record(message_sid, status)
+
+            suppression = services.processor.suppression
+            error_code = str(body.get("ErrorCode") or "")
+            if error_code.isdigit() and body.get("To"):
+                # Delivery failures that mean the number is not reachable
+                op = suppression.for_error(body["To"], int(error_code))
+                if op is not None:
+                    await services.processor.writer.commit([op])
+            elif not status and body.get("From") and "Body" in body:
+                # Inbound replies carry STOP/START keywords
+                await suppression.record_inbound(body["From"], body["Body"])
+
         return {"status": "processed"}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("webhook_error", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
+# Measured once the routes above are defined
+IMPORT_SECONDS = time.perf_counter() - BOOT_STARTED
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
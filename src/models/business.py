@@ -1,6 +1,6 @@
 # src/models/business.py
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional
 from datetime import datetime
 from src.utils.helpers import format_phone_number
@@ -14,7 +14,8 @@ class BusinessPhone(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
-    @validator('phone_number')
+    @field_validator('phone_number')
+    @classmethod
     def validate_phone(cls, v):
         try:
             return format_phone_number(v)
@@ -23,4 +24,13 @@ class BusinessPhone(BaseModel):
 
 class PhoneVerification(BaseModel):
     user_id: str
-    code: str
\ No newline at end of file
+    phone_number: str
+    code: str
+
+    @field_validator('phone_number')
+    @classmethod
+    def validate_phone(cls, v):
+        try:
+            return format_phone_number(v)
+        except ValueError as e:
+            raise ValueError(f"Invalid phone number: {e}")
\ No newline at end of file
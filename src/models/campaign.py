@@ -1,7 +1,7 @@
 # src/models/campaign.py
 
-from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from src.config.constants import CampaignType
 
@@ -16,6 +16,11 @@ class CampaignTarget(BaseModel):
     processed: bool = False
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+    @property
+    def key(self) -> str:
+        """Unique key of this target within its campaign"""
+        return f"{self.user_id}:{CampaignType(self.campaign_type).value}:{self.id}"
+
 class CampaignSettings(BaseModel):
     user_id: str
     campaign_type: CampaignType
@@ -23,4 +28,7 @@ class CampaignSettings(BaseModel):
     template_name: Optional[str] = None
     custom_message: Optional[str] = None
     send_time: str = "09:00"  # Default send time
-    settings: Dict[str, Any] = Field(default_factory=dict)
\ No newline at end of file
+    settings: Dict[str, Any] = Field(default_factory=dict)
+
+# Compiled once; validates a JSON array of targets straight from bytes
+CampaignTargetList = TypeAdapter(List[CampaignTarget])
@@ -1,6 +1,6 @@
 # src/models/message.py
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Dict, Optional, Any
 from datetime import datetime
 from src.config.constants import MessageStatus, CampaignType
@@ -12,11 +12,14 @@ class MessageTemplate(BaseModel):
     language_code: str = "pt_BR"
 
 class Message(BaseModel):
+    model_config = ConfigDict(use_enum_values=True)
+
     id: Optional[str] = None
     user_id: str
     campaign_type: CampaignType
     target_id: str
     phone_number: str
+    from_number: Optional[str] = None
     template_name: str
     parameters: Dict[str, Any]
     status: MessageStatus = MessageStatus.PENDING
@@ -29,9 +32,6 @@ class Message(BaseModel):
     delivered_at: Optional[datetime] = None
     read_at: Optional[datetime] = None
 
-    class Config:
-        use_enum_values = True
-
 class MessageStatus(BaseModel):
     message_id: str
     status: MessageStatus
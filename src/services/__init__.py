@@ -2,5 +2,23 @@
 
 from .twilio_client import TwilioClient
 from .message_processor import MessageProcessor
+from .work_queue import WorkQueue, QueueWorker
+from .send_window import SendWindowScheduler
+from .target_import import TargetImporter
+from .verification_store import VerificationStore
+from .campaign_run import CampaignRunner
+from .batch_results import BatchResults
+from .container import ServiceContainer
 
-__all__ = ["TwilioClient", "MessageProcessor"]
\ No newline at end of file
+__all__ = [
+    "TwilioClient",
+    "MessageProcessor",
+    "WorkQueue",
+    "QueueWorker",
+    "SendWindowScheduler",
+    "TargetImporter",
+    "VerificationStore",
+    "CampaignRunner",
+    "BatchResults",
+    "ServiceContainer"
+]
\ No newline at end of file
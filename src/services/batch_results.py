@@ -0,0 +1,116 @@
+# src/services/batch_results.py
+
+from src.models.campaign import CampaignTarget
+from src.config.constants import CampaignType
+from src.config import settings
+from src.utils.logging import get_logger
+from google.cloud import firestore
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+import uuid
+
+logger = get_logger(__name__)
+
+# Target status before the worker has processed it
+PENDING_STATUS = "pending"
+
+class BatchResults:
+    """Send outcomes of /process-targets batches
+
+    Each batch is recorded in target_batches/{batch_id} with the targets it
+    queued. Results are read back from the target documents the processor
+    marks with each send's status, so reporting adds no writes to the send
+    path; targets not processed yet, or waiting for their send window, are
+    reported as pending.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.logger = logger
+
+        self.recorded = 0
+        self.lookups = 0
+
+    async def record(
+        self,
+        accepted: List[CampaignTarget],
+        rejected: List[Dict[str, Any]],
+        duplicates: List[str]
+    ) -> str:
+        """Store a batch before its targets are queued, returning its id"""
+        batch_id = uuid.uuid4().hex
+        await self.db.collection("target_batches").document(batch_id).set({
+            "targets": [
+                {
+                    "user_id": target.user_id,
+                    "campaign_type": CampaignType(target.campaign_type).value,
+                    "target_id": target.id
+                }
+                for target in accepted
+            ],
+            "rejected": len(rejected),
+            "duplicates": duplicates,
+            "created_at": firestore.SERVER_TIMESTAMP,
+            "expires_at": datetime.now(timezone.utc) + timedelta(days=settings.BATCH_RESULTS_TTL_DAYS)
+        })
+        self.recorded += 1
+        return batch_id
+
+    async def get(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Per-target send outcomes and status counts of a batch, or None if unknown"""
+        doc = await self.db.collection("target_batches").document(batch_id).get()
+        if not doc.exists:
+            return None
+        self.lookups += 1
+
+        batch = doc.to_dict()
+        refs = [
+            self._target(entry["user_id"], entry["campaign_type"], entry["target_id"])
+            for entry in batch["targets"]
+        ]
+        outcomes = {}
+        async for target in self.db.get_all(refs):
+            data = target.to_dict() if target.exists else None
+            if data and data.get("processed"):
+                outcomes[target.reference.path] = data
+
+        results = []
+        counts: Dict[str, int] = {}
+        for entry, ref in zip(batch["targets"], refs):
+            outcome = outcomes.get(ref.path, {})
+            status = outcome.get("status", PENDING_STATUS)
+            counts[status] = counts.get(status, 0) + 1
+            results.append({
+                "target_id": entry["target_id"],
+                "status": status,
+                "message_id": outcome.get("message_id"),
+                "error_code": outcome.get("error_code")
+            })
+
+        return {
+            "batch_id": batch_id,
+            "complete": PENDING_STATUS not in counts,
+            "total": len(results),
+            "counts": counts,
+            "rejected": batch.get("rejected", 0),
+            "duplicates": batch.get("duplicates", []),
+            "results": results
+        }
+
+    def stats(self) -> Dict[str, int]:
+        """Batch counters for monitoring"""
+        return {
+            "recorded": self.recorded,
+            "lookups": self.lookups
+        }
+
+    def _target(self, user_id: str, campaign_type: str, target_id: str):
+        # The documents MessageProcessor marks processed with each send's status
+        return (
+            self.db.collection("users")
+            .document(user_id)
+            .collection("campaigns")
+            .document(campaign_type)
+            .collection("targets")
+            .document(target_id)
+        )
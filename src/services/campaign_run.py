@@ -0,0 +1,218 @@
+# src/services/campaign_run.py
+
+from src.models.campaign import CampaignTarget
+from src.services.send_window import SendWindowScheduler
+from src.services.work_queue import WorkQueue
+from src.config.constants import ERROR_MESSAGES, CampaignType
+from src.config import settings
+from src.utils.helpers import normalize_phone_numbers
+from src.utils.logging import get_logger
+from google.cloud import firestore
+from pydantic import ValidationError
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import time
+
+logger = get_logger(__name__)
+
+RunKey = Tuple[str, str]
+
+class CampaignRunner:
+    """Queue a campaign's unprocessed targets straight from Firestore
+
+    Targets are paged in document-id order with query cursors and handed to
+    the send window scheduler a page at a time. Paging pauses while the
+    tenant has CAMPAIGN_RUN_MAX_QUEUED jobs in the work queue, due or held
+    for a later send window, so a run started after hours does not copy the
+    whole campaign into the queue. The cursor is checkpointed on
+    campaign_runs/{user_id}:{campaign_type} after every page so an
+    interrupted run resumes after the last queued page. Re-queuing a
+    page is harmless: the queue and the idempotency guard both drop repeats.
+    A live run refreshes its checkpoint at least every third of
+    CAMPAIGN_RUN_LEASE_SECONDS, so a running checkpoint updated within the
+    lease belongs to a run on some instance and is not started again.
+    """
+
+    def __init__(
+        self,
+        db,
+        scheduler: SendWindowScheduler,
+        queue: WorkQueue,
+        page_size: Optional[int] = None,
+        max_queued: Optional[int] = None
+    ):
+        self.db = db
+        self.scheduler = scheduler
+        self.queue = queue
+        self.page_size = page_size or settings.CAMPAIGN_RUN_PAGE_SIZE
+        self.max_queued = max_queued or settings.CAMPAIGN_RUN_MAX_QUEUED
+        self.poll_interval = settings.CAMPAIGN_RUN_POLL_SECONDS
+        self.lease = timedelta(seconds=settings.CAMPAIGN_RUN_LEASE_SECONDS)
+        self.logger = logger
+        self._runs: Dict[RunKey, asyncio.Task] = {}
+        # Monotonic time of each run's last checkpoint write
+        self._checkpointed: Dict[RunKey, float] = {}
+
+    async def start(self, user_id: str, campaign_type: str, restart: bool = False) -> Dict[str, Any]:
+        """Start or resume a run in the background, returning its checkpoint"""
+        key = (user_id, CampaignType(campaign_type).value)
+        task = self._runs.get(key)
+        if task is not None and not task.done():
+            return {**await self.status(*key), "status": "running"}
+
+        checkpoint = await self.status(*key)
+        if self._owned_elsewhere(checkpoint):
+            self.logger.info("campaign_run_owned_elsewhere", user_id=user_id, campaign_type=key[1])
+            return checkpoint
+
+        if restart or checkpoint.get("status") in (None, "completed"):
+            checkpoint = {"cursor": None, "pages": 0, "queued": 0, "rejected": 0}
+
+        checkpoint = {
+            **checkpoint,
+            "user_id": user_id,
+            "campaign_type": key[1],
+            "status": "running",
+            "error": None
+        }
+        await self._checkpoint(key, checkpoint)
+
+        self._runs[key] = asyncio.create_task(self._run(key, checkpoint))
+        return checkpoint
+
+    async def status(self, user_id: str, campaign_type: str) -> Dict[str, Any]:
+        """Last checkpoint of a campaign's run, empty if it never ran"""
+        doc = await self._document((user_id, CampaignType(campaign_type).value)).get()
+        return doc.to_dict() if doc.exists else {}
+
+    async def stop(self) -> None:
+        """Cancel running runs; their checkpoints let them resume later"""
+        tasks = [task for task in self._runs.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def iter_pending(
+        self,
+        user_id: str,
+        campaign_type: str,
+        cursor: Optional[str] = None
+    ) -> AsyncIterator[List[Any]]:
+        """Yield pages of unprocessed target snapshots after ``cursor``"""
+        query = (
+            self.db.collection("users")
+            .document(user_id)
+            .collection("campaigns")
+            .document(campaign_type)
+            .collection("targets")
+            .where(filter=firestore.FieldFilter("processed", "==", False))
+            .order_by("__name__")
+            .limit(self.page_size)
+        )
+
+        while True:
+            page_query = query.start_after({"__name__": cursor}) if cursor else query
+            page = [doc async for doc in page_query.stream()]
+            if not page:
+                return
+            yield page
+            if len(page) < self.page_size:
+                return
+            cursor = page[-1].id
+
+    async def _run(self, key: RunKey, checkpoint: Dict[str, Any]) -> None:
+        user_id, campaign_type = key
+        self.logger.info("campaign_run_started", user_id=user_id, campaign_type=campaign_type, cursor=checkpoint["cursor"])
+        try:
+            async for page in self.iter_pending(user_id, campaign_type, checkpoint["cursor"]):
+                await self._wait_for_capacity(key, checkpoint)
+
+                targets, rejected = self._targets(key, page)
+                queued = await self.scheduler.enqueue(targets) if targets else 0
+
+                checkpoint["cursor"] = page[-1].id
+                checkpoint["pages"] += 1
+                checkpoint["queued"] += queued
+                checkpoint["rejected"] += rejected
+                await self._checkpoint(key, checkpoint)
+
+            checkpoint["status"] = "completed"
+            await self._checkpoint(key, checkpoint)
+            self.logger.info(
+                "campaign_run_completed",
+                user_id=user_id,
+                campaign_type=campaign_type,
+                pages=checkpoint["pages"],
+                queued=checkpoint["queued"],
+                rejected=checkpoint["rejected"]
+            )
+        except asyncio.CancelledError:
+            # Left as running so the next start resumes from the cursor
+            self.logger.info("campaign_run_interrupted", user_id=user_id, campaign_type=campaign_type, cursor=checkpoint["cursor"])
+            raise
+        except Exception as e:
+            self.logger.error("campaign_run_error", error=str(e), user_id=user_id, campaign_type=campaign_type)
+            checkpoint["status"] = "failed"
+            checkpoint["error"] = str(e)
+            try:
+                await self._checkpoint(key, checkpoint)
+            except Exception as e:
+                # The run stays marked running until its lease runs out
+                self.logger.error(
+                    "campaign_run_checkpoint_error",
+                    error=str(e),
+                    user_id=user_id,
+                    campaign_type=campaign_type
+                )
+        finally:
+            self._checkpointed.pop(key, None)
+
+    def _owned_elsewhere(self, checkpoint: Dict[str, Any]) -> bool:
+        # Runs in this process are tracked in _runs; a fresh running
+        # checkpoint without a local task is another instance's run
+        updated_at = checkpoint.get("updated_at")
+        if checkpoint.get("status") != "running" or not isinstance(updated_at, datetime):
+            return False
+        return datetime.now(timezone.utc) - updated_at < self.lease
+
+    async def _wait_for_capacity(self, key: RunKey, checkpoint: Dict[str, Any]) -> None:
+        user_id = key[0]
+        while await self.queue.tenant_depth(user_id, self.max_queued) >= self.max_queued:
+            # Keep the lease while paused so other instances leave the run alone
+            if time.monotonic() - self._checkpointed.get(key, 0.0) >= self.lease.total_seconds() / 3:
+                await self._checkpoint(key, checkpoint)
+            await asyncio.sleep(self.poll_interval)
+
+    def _targets(self, key: RunKey, page: List[Any]) -> Tuple[List[CampaignTarget], int]:
+        user_id, campaign_type = key
+        rows = [doc.to_dict() for doc in page]
+        phones = normalize_phone_numbers(str(row.get("phone", "")) for row in rows)
+
+        targets: List[CampaignTarget] = []
+        rejected = 0
+        for doc, row, phone in zip(page, rows, phones):
+            try:
+                if phone is None:
+                    raise ValueError(ERROR_MESSAGES["invalid_phone"])
+                targets.append(CampaignTarget.model_validate({
+                    **row,
+                    "id": doc.id,
+                    "user_id": user_id,
+                    "campaign_type": campaign_type,
+                    "phone": phone
+                }))
+            except (ValidationError, ValueError) as e:
+                rejected += 1
+                self.logger.warning("campaign_target_rejected", target_id=doc.id, user_id=user_id, error=str(e))
+        return targets, rejected
+
+    def _document(self, key: RunKey):
+        return self.db.collection("campaign_runs").document(f"{key[0]}:{key[1]}")
+
+    async def _checkpoint(self, key: RunKey, checkpoint: Dict[str, Any]) -> None:
+        await self._document(key).set({
+            **checkpoint,
+            "updated_at": firestore.SERVER_TIMESTAMP
+        }, merge=True)
+        self._checkpointed[key] = time.monotonic()
@@ -0,0 +1,187 @@
+# src/services/campaign_stats.py
+
+from src.services.firestore_writer import WriteOp
+from src.models.message import Message
+from src.config.constants import DELIVERY_MILESTONES, MESSAGE_STATUS_RANK, CampaignType
+from src.config import settings
+from src.utils.helpers import get_brazil_time
+from src.utils.logging import get_logger
+from google.cloud import firestore
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import random
+
+logger = get_logger(__name__)
+
+# Counter of every send attempt, the denominator of the delivery rates
+ATTEMPTED = "attempted"
+
+# sid -> [user_id, campaign_type, day, last counted status]
+MessageContext = List[Optional[str]]
+
+def status_path(previous: Optional[str], status: str) -> List[str]:
+    """Statuses to count when a message moves from ``previous`` to ``status``
+
+    Callbacks are coalesced to the latest status per message, so a message
+    first reported as read also passed sent and delivered; the milestones
+    ranked between the two statuses are counted along with it.
+    """
+    if status not in MESSAGE_STATUS_RANK:
+        return [status]
+    floor = MESSAGE_STATUS_RANK.get(previous, -1)
+    ceiling = MESSAGE_STATUS_RANK[status]
+    skipped = [
+        milestone for milestone in DELIVERY_MILESTONES
+        if floor < MESSAGE_STATUS_RANK[milestone] < ceiling
+    ]
+    return skipped + [status]
+
+class CampaignStats:
+    """Sharded per-day delivery counters for each campaign
+
+    Each (user_id, campaign_type, day) has CAMPAIGN_STATS_SHARDS counter
+    documents under campaign_stats/{user_id}:{campaign_type}:{day}/shards,
+    holding one field per status. Writes add ``Increment`` transforms to a
+    random shard inside the same batch as the history write, and reads sum
+    the shards, so a stats query costs days x shards reads regardless of
+    how much history exists.
+
+    Each status is counted once per message, when it is first reported or
+    when a later status shows the message passed it. The campaign and day
+    of recently sent messages are kept in a bounded LRU, and callbacks for
+    older ones look them up from message_history.
+    """
+
+    def __init__(self, db, shards: Optional[int] = None, max_size: Optional[int] = None):
+        self.db = db
+        self.shards = shards or settings.CAMPAIGN_STATS_SHARDS
+        self.max_size = max_size or settings.CAMPAIGN_STATS_CACHE_SIZE
+        self.logger = logger
+        self._messages: "OrderedDict[str, MessageContext]" = OrderedDict()
+
+        self.history_lookups = 0
+        self.unknown = 0
+
+    @staticmethod
+    def today() -> str:
+        """Campaign day of a send, in America/Sao_Paulo"""
+        return get_brazil_time().date().isoformat()
+
+    def send_ops(self, message: Message, result: Dict[str, Any], day: str) -> List[WriteOp]:
+        """Counter increments for a send result"""
+        status = result.get("status", "failed")
+        campaign_type = CampaignType(message.campaign_type).value
+        if result.get("message_id"):
+            self._remember(result["message_id"], [message.user_id, campaign_type, day, status])
+        return [self._increment(message.user_id, campaign_type, day, {ATTEMPTED: 1, status: 1})]
+
+    async def transition_ops(self, updates: Dict[str, str]) -> List[WriteOp]:
+        """Counter increments for status callbacks not counted yet"""
+        missing = [sid for sid in updates if sid not in self._messages]
+        if missing:
+            await self._load(missing)
+
+        counts: Dict[Tuple[str, str, str], Dict[str, int]] = {}
+        for sid, status in updates.items():
+            context = self._messages.get(sid)
+            if context is None or context[3] == status:
+                continue
+            group = counts.setdefault((context[0], context[1], context[2]), {})
+            for passed in status_path(context[3], status):
+                group[passed] = group.get(passed, 0) + 1
+
+        return [
+            self._increment(user_id, campaign_type, day, statuses)
+            for (user_id, campaign_type, day), statuses in counts.items()
+        ]
+
+    def committed(self, updates: Dict[str, str]) -> None:
+        """Mark callback statuses as counted once their increments are written"""
+        for sid, status in updates.items():
+            context = self._messages.get(sid)
+            if context is not None:
+                context[3] = status
+
+    async def get(self, user_id: str, campaign_type: str, start: date, end: date) -> Dict[str, Any]:
+        """Per-day counts, totals and rates for the days from ``start`` to ``end``"""
+        campaign_type = CampaignType(campaign_type).value
+        days = [(start + timedelta(days=offset)).isoformat() for offset in range((end - start).days + 1)]
+        refs = [
+            (self._shard(user_id, campaign_type, day, shard), day)
+            for day in days
+            for shard in range(self.shards)
+        ]
+        day_of = {ref.path: day for ref, day in refs}
+
+        per_day: Dict[str, Dict[str, int]] = {day: {} for day in days}
+        async for doc in self.db.get_all([ref for ref, _ in refs]):
+            if not doc.exists:
+                continue
+            counts = per_day[day_of[doc.reference.path]]
+            for status, value in doc.to_dict().items():
+                counts[status] = counts.get(status, 0) + value
+
+        totals: Dict[str, int] = {}
+        for counts in per_day.values():
+            for status, value in counts.items():
+                totals[status] = totals.get(status, 0) + value
+
+        attempted = totals.get(ATTEMPTED, 0)
+        return {
+            "user_id": user_id,
+            "campaign_type": campaign_type,
+            "days": per_day,
+            "totals": totals,
+            "rates": {
+                f"{status}_rate": round(totals.get(status, 0) / attempted, 4) if attempted else 0.0
+                for status in ("delivered", "read", "failed")
+            }
+        }
+
+    def stats(self) -> Dict[str, int]:
+        """Context cache counters for monitoring"""
+        return {
+            "size": len(self._messages),
+            "history_lookups": self.history_lookups,
+            "unknown": self.unknown
+        }
+
+    def _shard(self, user_id: str, campaign_type: str, day: str, shard: int):
+        return (
+            self.db.collection("campaign_stats")
+            .document(f"{user_id}:{campaign_type}:{day}")
+            .collection("shards")
+            .document(str(shard))
+        )
+
+    def _increment(self, user_id: str, campaign_type: str, day: str, counts: Dict[str, int]) -> WriteOp:
+        ref = self._shard(user_id, campaign_type, day, random.randrange(self.shards))
+        return WriteOp(ref, {
+            status: firestore.Increment(value) for status, value in counts.items()
+        }, merge=True)
+
+    def _remember(self, sid: str, context: MessageContext) -> None:
+        self._messages[sid] = context
+        self._messages.move_to_end(sid)
+        while len(self._messages) > self.max_size:
+            self._messages.popitem(last=False)
+
+    async def _load(self, sids: List[str]) -> None:
+        self.history_lookups += len(sids)
+        history = self.db.collection("message_history")
+        found = set()
+        async for doc in self.db.get_all([history.document(sid) for sid in sids]):
+            if not doc.exists:
+                continue
+            data = doc.to_dict()
+            if not data.get("day"):
+                continue
+            found.add(doc.id)
+            self._remember(doc.id, [
+                data.get("user_id"),
+                data.get("campaign_type"),
+                data["day"],
+                data.get("status")
+            ])
+        self.unknown += len(sids) - len(found)
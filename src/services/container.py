@@ -0,0 +1,77 @@
+# src/services/container.py
+
+from src.services.twilio_client import TwilioClient
+from src.services.message_processor import MessageProcessor
+from src.services.work_queue import WorkQueue, QueueWorker
+from src.services.send_window import SendWindowScheduler
+from src.services.target_import import TargetImporter
+from src.services.verification_store import VerificationStore
+from src.services.campaign_run import CampaignRunner
+from src.services.batch_results import BatchResults
+from src.utils.logging import get_logger
+from src.config import settings
+from google.cloud import firestore
+from typing import Awaitable, Dict, Optional, Tuple
+import asyncio
+import time
+
+logger = get_logger(__name__)
+
+class ServiceContainer:
+    """Process-wide service singletons shared by routes, workers and the processor
+
+    Built inside the app lifespan so importing the app stays cheap; clients
+    open their connections on first use unless pre-warmed. Dispatcher
+    processes pass ``shard`` to drain only their tenants' jobs.
+    """
+
+    def __init__(self, shard: Optional[Tuple[int, int]] = None):
+        started = time.perf_counter()
+        self.db = firestore.AsyncClient()
+        self.twilio = TwilioClient()
+        self.work_queue = WorkQueue(shard=shard)
+        self.processor = MessageProcessor(twilio=self.twilio, db=self.db)
+        self.send_window = SendWindowScheduler(self.work_queue, self.processor.settings_cache)
+        self.worker = QueueWorker(self.work_queue, self.processor, send_window=self.send_window)
+        self.importer = TargetImporter(self.send_window)
+        self.verifications = VerificationStore(self.db, self.twilio)
+        self.campaign_runs = CampaignRunner(self.db, self.send_window, self.work_queue)
+        self.batch_results = BatchResults(self.db)
+        self.init_seconds = time.perf_counter() - started
+        self.logger = logger
+
+    async def prewarm(self, timeout: Optional[float] = None) -> Dict[str, float]:
+        """Open Firestore and Twilio connections in parallel, returning milliseconds per client
+
+        Failures are logged and left for the first request to retry.
+        """
+        timeout = timeout or settings.STARTUP_PREWARM_TIMEOUT_SECONDS
+
+        async def timed(name: str, operation: Awaitable) -> Tuple[str, float]:
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(operation, timeout)
+            except Exception as e:
+                self.logger.warning("prewarm_failed", client=name, error=str(e))
+            return name, round((time.perf_counter() - started) * 1000, 1)
+
+        results = await asyncio.gather(
+            # Reading a missing document sets up the gRPC channel and auth
+            timed("firestore", self.db.collection("_warmup").document("ping").get()),
+            timed("twilio", self.twilio.http_client.warm()),
+            timed("work_queue", self.work_queue.stats()),
+            timed("suppressions", self.processor.suppression.load())
+        )
+        return dict(results)
+
+    def start(self) -> None:
+        """Start draining the work queue"""
+        self.worker.start()
+
+    async def close(self) -> None:
+        """Finish in-flight jobs, flush pending writes and close connections"""
+        await self.campaign_runs.stop()
+        await self.worker.stop()
+        await self.processor.close()
+        await self.twilio.close()
+        self.work_queue.close()
@@ -0,0 +1,109 @@
+# src/services/fair_queue.py
+
+from src.config import settings
+from src.utils.metrics import TENANT_QUEUE_WAIT, TENANTS_WAITING
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import time
+
+class FairScheduler:
+    """Deficit round robin over tenants for claiming queued jobs
+
+    Every claim round visits tenants with ready jobs in turn, crediting each
+    with its weight (TENANT_WEIGHTS, default TENANT_DEFAULT_WEIGHT) times the
+    quantum and handing out one job per credit. A tenant's unused credit
+    carries over while it has a backlog and is dropped once it runs dry, so
+    a tenant with 50k due targets gets its weighted share of each batch
+    instead of the whole batch. Rotation continues across claims, so small
+    tenants are not always served after the same large one.
+    """
+
+    def __init__(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        default_weight: Optional[float] = None,
+        quantum: int = 1
+    ):
+        self.weights = settings.TENANT_WEIGHTS if weights is None else weights
+        self.default_weight = default_weight or settings.TENANT_DEFAULT_WEIGHT
+        self.quantum = quantum
+        self._deficits: "OrderedDict[str, float]" = OrderedDict()
+        # user_id -> (ready jobs, oldest due time) from the last claim
+        self._backlog: Dict[str, Tuple[int, float]] = {}
+        # Jobs claimed per tenant since its backlog last ran dry
+        self._claimed: Dict[str, int] = {}
+
+    def plan(self, ready: Dict[str, Tuple[int, float]], capacity: int) -> Dict[str, int]:
+        """Split ``capacity`` claims across tenants with ready jobs"""
+        self._observe(ready)
+
+        # Idle tenants lose their credit, new ones join the end of the rotation
+        for user_id in list(self._deficits):
+            if user_id not in ready:
+                del self._deficits[user_id]
+        for user_id in ready:
+            self._deficits.setdefault(user_id, 0.0)
+
+        remaining = {user_id: count for user_id, (count, _) in ready.items()}
+        plan: Dict[str, int] = {}
+        budget = min(capacity, sum(remaining.values()))
+
+        while budget > 0:
+            for user_id in list(self._deficits):
+                if budget == 0:
+                    break
+                if not remaining.get(user_id):
+                    continue
+                deficit = self._deficits[user_id] + self.weight(user_id) * self.quantum
+                take = min(int(deficit), remaining[user_id], budget)
+                self._deficits[user_id] = deficit - take
+                remaining[user_id] -= take
+                budget -= take
+                if take:
+                    plan[user_id] = plan.get(user_id, 0) + take
+                # Served tenants move to the back of the rotation
+                self._deficits.move_to_end(user_id)
+
+        for user_id, count in plan.items():
+            self._claimed[user_id] = self._claimed.get(user_id, 0) + count
+        return plan
+
+    def weight(self, user_id: str) -> float:
+        # A zero weight would starve the tenant and stall the round
+        return max(self.weights.get(user_id, self.default_weight), 0.01)
+
+    @property
+    def tenants(self) -> List[str]:
+        """Tenants that had ready jobs at the last claim"""
+        return list(self._backlog)
+
+    def stats(self, depths: Optional[Dict[str, Tuple[int, int]]] = None) -> Dict[str, Any]:
+        """Per-tenant backlog as of the last claim
+
+        The ready counts planning works with stop at a batch, so ``depths``
+        gives each tenant's uncapped (ready, queued) job counts to report.
+        """
+        now = time.time()
+        depths = depths or {}
+        return {
+            "tenants": {
+                user_id: {
+                    "ready": depths.get(user_id, (0, 0))[0],
+                    "queued": depths.get(user_id, (0, 0))[1],
+                    "oldest_wait_seconds": round(max(0.0, now - oldest), 3),
+                    "weight": self.weight(user_id),
+                    "claimed": self._claimed.get(user_id, 0)
+                }
+                for user_id, (_, oldest) in self._backlog.items()
+            }
+        }
+
+    def _observe(self, ready: Dict[str, Tuple[int, float]]) -> None:
+        now = time.time()
+        for user_id in self._backlog:
+            if user_id not in ready:
+                self._claimed.pop(user_id, None)
+        oldest = min((due for _, due in ready.values()), default=now)
+        TENANTS_WAITING.set(len(ready))
+        TENANT_QUEUE_WAIT.set(round(max(0.0, now - oldest), 3))
+        self._backlog = dict(ready)
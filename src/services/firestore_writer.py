@@ -0,0 +1,122 @@
+# src/services/firestore_writer.py
+
+from src.config import settings
+from src.utils.logging import get_logger
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+import asyncio
+
+logger = get_logger(__name__)
+
+# Firestore rejects batches with more than 500 writes
+MAX_BATCH_OPS = 500
+
+@dataclass
+class WriteOp:
+    """A single document write to be applied to a Firestore batch"""
+    ref: Any
+    data: Dict[str, Any]
+    kind: str = "set"
+    merge: bool = False
+
+    def apply(self, batch) -> None:
+        if self.kind == "update":
+            batch.update(self.ref, self.data)
+        elif self.kind == "create":
+            batch.create(self.ref, self.data)
+        else:
+            batch.set(self.ref, self.data, merge=self.merge)
+
+class BatchWriter:
+    """Group writes from concurrent callers into shared batch commits
+
+    Writes submitted together in one ``commit`` call always land in the same
+    batch, so they are applied atomically.
+    """
+
+    def __init__(
+        self,
+        db,
+        max_ops: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None
+    ):
+        self.db = db
+        self.max_ops = min(max_ops or settings.FIRESTORE_BATCH_MAX_OPS, MAX_BATCH_OPS)
+        self.flush_interval = (flush_interval_ms or settings.FIRESTORE_BATCH_FLUSH_MS) / 1000
+        self.logger = logger
+        self._pending: List[Tuple[List[WriteOp], asyncio.Future]] = []
+        self._pending_ops = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._commits: Set[asyncio.Task] = set()
+
+    async def commit(self, ops: List[WriteOp]) -> None:
+        """Queue writes for the next batch and wait until they are committed"""
+        if not ops:
+            return
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        if self._pending_ops + len(ops) > self.max_ops:
+            self._flush()
+
+        self._pending.append((ops, future))
+        self._pending_ops += len(ops)
+
+        if self._pending_ops >= self.max_ops:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_interval, self._flush)
+
+        await future
+
+    async def flush(self) -> None:
+        """Commit pending writes and wait for in-flight batches"""
+        self._flush()
+        if self._commits:
+            await asyncio.gather(*self._commits, return_exceptions=True)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
+
+        groups = self._pending
+        self._pending = []
+        self._pending_ops = 0
+
+        task = asyncio.create_task(self._commit(groups))
+        self._commits.add(task)
+        task.add_done_callback(self._commits.discard)
+
+    async def _commit(self, groups: List[Tuple[List[WriteOp], asyncio.Future]]) -> None:
+        batch = self.db.batch()
+        for ops, _ in groups:
+            for op in ops:
+                op.apply(batch)
+
+        try:
+            await batch.commit()
+        except Exception as e:
+            if len(groups) > 1:
+                # Retry groups individually so one bad write does not fail the others
+                for group in groups:
+                    await self._commit([group])
+                return
+
+            self.logger.error(
+                "firestore_batch_error",
+                error=str(e),
+                operations=len(groups[0][0])
+            )
+            for _, future in groups:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for _, future in groups:
+            if not future.done():
+                future.set_result(None)
@@ -0,0 +1,79 @@
+# src/services/http_client.py
+
+from twilio.http import AsyncHttpClient
+from twilio.http.response import Response
+from src.config import settings
+from src.utils.logging import get_logger
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+import httpx
+
+logger = get_logger(__name__)
+
+TWILIO_API_URL = "https://api.twilio.com/"
+
+class PooledTwilioHttpClient(AsyncHttpClient):
+    """Async Twilio HTTP client backed by a keep-alive connection pool"""
+
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None
+    ):
+        super().__init__(
+            logger,
+            is_async=True,
+            timeout=timeout or settings.TWILIO_HTTP_TIMEOUT_SECONDS
+        )
+        pool_size = pool_size or settings.TWILIO_HTTP_POOL_SIZE
+        self.base_url = urlsplit(settings.TWILIO_API_BASE_URL) if settings.TWILIO_API_BASE_URL else None
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=settings.TWILIO_HTTP_KEEPALIVE_SECONDS
+            ),
+            timeout=httpx.Timeout(
+                self.timeout,
+                connect=connect_timeout or settings.TWILIO_HTTP_CONNECT_TIMEOUT_SECONDS,
+                pool=self.timeout
+            )
+        )
+
+    async def request(
+        self,
+        method: str,
+        uri: str,
+        params: Optional[Dict[str, object]] = None,
+        data: Optional[Dict[str, object]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        auth: Optional[Tuple[str, str]] = None,
+        timeout: Optional[float] = None,
+        allow_redirects: bool = False
+    ) -> Response:
+        """Send a request through the shared connection pool"""
+        if self.base_url is not None:
+            # Redirect to a local stand-in, keeping the Twilio API path
+            uri = urlunsplit(self.base_url[:2] + urlsplit(uri)[2:])
+
+        response = await self.client.request(
+            method,
+            uri,
+            params=params,
+            data=data,
+            headers=headers,
+            auth=auth,
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+            follow_redirects=allow_redirects
+        )
+        return Response(response.status_code, response.text, response.headers)
+
+    async def warm(self) -> None:
+        """Open a pooled connection (DNS, TCP and TLS) before the first send"""
+        host = urlunsplit(self.base_url[:2] + ("/", "", "")) if self.base_url is not None else TWILIO_API_URL
+        await self.client.head(host)
+
+    async def close(self):
+        """Close pooled connections"""
+        await self.client.aclose()
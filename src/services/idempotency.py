@@ -0,0 +1,83 @@
+# src/services/idempotency.py
+
+from src.models.campaign import CampaignTarget
+from src.config import settings
+from src.utils.logging import get_logger
+from google.api_core.exceptions import AlreadyExists
+from google.cloud import firestore
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+logger = get_logger(__name__)
+
+class IdempotencyGuard:
+    """Claim each campaign target once so redeliveries do not send twice
+
+    Recently claimed keys are kept in a bounded in-memory LRU so repeats are
+    rejected without a round-trip. The source of truth is a claim document
+    created with create-if-absent semantics in Firestore.
+    """
+
+    def __init__(self, db, max_size: Optional[int] = None):
+        self.db = db
+        self.max_size = max_size or settings.IDEMPOTENCY_CACHE_SIZE
+        self.logger = logger
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+
+        self.claims = 0
+        self.duplicates = 0
+        self.releases = 0
+
+    def seen(self, target: CampaignTarget) -> bool:
+        """Check the in-memory set for a target claimed recently"""
+        return target.key in self._recent
+
+    async def claim(self, target: CampaignTarget) -> bool:
+        """Claim a target, returning False if it was already claimed"""
+        key = target.key
+        if key in self._recent:
+            self._recent.move_to_end(key)
+            self.duplicates += 1
+            return False
+
+        # Remember before awaiting so concurrent claims in this process lose
+        self._remember(key)
+        try:
+            await self.db.collection("target_claims").document(key).create({
+                "user_id": target.user_id,
+                "campaign_type": target.campaign_type,
+                "target_id": target.id,
+                "claimed_at": firestore.SERVER_TIMESTAMP,
+                "expires_at": datetime.now(timezone.utc) + timedelta(days=settings.IDEMPOTENCY_TTL_DAYS)
+            })
+        except AlreadyExists:
+            self.duplicates += 1
+            return False
+        except Exception:
+            self._recent.pop(key, None)
+            raise
+
+        self.claims += 1
+        return True
+
+    async def release(self, target: CampaignTarget) -> None:
+        """Drop a claim so a retry of the same target can send"""
+        key = target.key
+        self._recent.pop(key, None)
+        self.releases += 1
+        await self.db.collection("target_claims").document(key).delete()
+
+    def stats(self) -> Dict[str, int]:
+        """Claim counters for monitoring"""
+        return {
+            "size": len(self._recent),
+            "claims": self.claims,
+            "duplicates": self.duplicates,
+            "releases": self.releases
+        }
+
+    def _remember(self, key: str) -> None:
+        self._recent[key] = None
+        if len(self._recent) > self.max_size:
+            self._recent.popitem(last=False)
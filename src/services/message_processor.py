@@ -2,77 +2,229 @@
 
 from src.models.message import Message, MessageStatus
 from src.models.campaign import CampaignTarget
-from src.services.twilio_client import TwilioClient
+from src.services.twilio_client import TwilioClient, circuit_open_result, classify_error
+from src.services.firestore_writer import BatchWriter, WriteOp
+from src.services.settings_cache import CampaignSettingsCache
+from src.services.idempotency import IdempotencyGuard
+from src.services.status_aggregator import StatusAggregator
+from src.services.campaign_stats import CampaignStats
+from src.services.suppression import SuppressionIndex
+from src.services.template_registry import TemplateRegistry
 from src.utils.logging import get_logger
+from src.utils.metrics import IN_FLIGHT, MESSAGES
+from src.utils.tracing import mark_error, set_attributes, span, stage
+from src.config.constants import CIRCUIT_OPEN_ERROR, CampaignType
 from src.config import settings
 from google.cloud import firestore
-from typing import Optional, Dict
-import asyncio
+from typing import Any, Dict, List, Optional
 
 logger = get_logger(__name__)
 
 class MessageProcessor:
-    def __init__(self):
-        self.twilio = TwilioClient()
-        self.db = firestore.Client()
+    def __init__(
+        self,
+        twilio: Optional[TwilioClient] = None,
+        db: Optional[firestore.AsyncClient] = None
+    ):
+        # Clients passed in are shared and closed by their owner
+        self._owns_twilio = twilio is None
+        self.twilio = twilio or TwilioClient()
+        self.db = db or firestore.AsyncClient()
+        self.writer = BatchWriter(self.db)
+        self.settings_cache = CampaignSettingsCache(self.db)
+        self.idempotency = IdempotencyGuard(self.db)
+        self.suppression = SuppressionIndex(self.db)
+        self.campaign_stats = CampaignStats(self.db)
+        self.status_updates = StatusAggregator(self.db, self.writer, self.campaign_stats)
+        self.templates = TemplateRegistry()
         self.logger = logger
 
-    async def process_target(self, target: CampaignTarget) -> Optional[Dict]:
-        """Process a campaign target and send message"""
+    async def close(self):
+        """Commit pending writes and release clients"""
+        self.settings_cache.close()
+        self.suppression.close()
+        await self.status_updates.flush()
+        await self.writer.flush()
+        if self._owns_twilio:
+            await self.twilio.close()
+
+    def render(self, targets: List[CampaignTarget]) -> List[Dict[str, Any]]:
+        """Template parameters for a batch of targets, in order"""
+        return self.templates.render_batch(targets)
+
+    async def process_target(
+        self,
+        target: CampaignTarget,
+        attempt_count: int = 1,
+        parameters: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict]:
+        """Process a campaign target and send message
+
+        ``parameters`` are the target's rendered template parameters when
+        the caller rendered its batch up front.
+        """
+        IN_FLIGHT.inc("process_target")
+        try:
+            with span(
+                "process_target",
+                user_id=target.user_id,
+                campaign_type=CampaignType(target.campaign_type).value,
+                target_id=target.id,
+                attempt=attempt_count
+            ):
+                result = await self._process_target(target, attempt_count, parameters)
+                set_attributes(
+                    status=result["status"] if result else "error",
+                    message_id=result.get("message_id") if result else None,
+                    error_code=str(result["error_code"]) if result and result.get("error_code") else None
+                )
+        finally:
+            IN_FLIGHT.dec("process_target")
+
+        MESSAGES.inc(result["status"] if result else "error")
+        return result
+
+    async def _process_target(
+        self,
+        target: CampaignTarget,
+        attempt_count: int,
+        parameters: Optional[Dict[str, Any]]
+    ) -> Optional[Dict]:
+        claimed = False
+        result = None
         try:
+            # Skip numbers that opted out or are not on WhatsApp
+            await self.suppression.load()
+            if self.suppression.contains(target.phone):
+                return await self._suppressed(target)
+
             # Get campaign settings
-            settings_ref = (
-                self.db.collection("users")
-                .document(target.user_id)
-                .collection("campaigns")
-                .document(target.campaign_type)
-            )
-            settings_doc = settings_ref.get()
+            with stage("settings_read"):
+                campaign_settings = await self.settings_cache.get(
+                    target.user_id,
+                    target.campaign_type
+                )
             
-            if not settings_doc.exists:
+            if campaign_settings is None:
                 self.logger.error(
                     "campaign_settings_not_found",
                     user_id=target.user_id,
                     campaign_type=target.campaign_type
                 )
                 return None
-
-            campaign_settings = settings_doc.to_dict()
             
-            # Create message
-            message = Message(
-                user_id=target.user_id,
-                campaign_type=target.campaign_type,
-                target_id=target.id,
-                phone_number=target.phone,
-                template_name=campaign_settings["template_name"],
-                parameters=self._prepare_parameters(target)
-            )
+            with stage("prepare_message"):
+                if parameters is None:
+                    parameters = self.templates.get(target.campaign_type).parameters(target)
+
+                # Create message
+                message = Message(
+                    user_id=target.user_id,
+                    campaign_type=target.campaign_type,
+                    target_id=target.id,
+                    phone_number=target.phone,
+                    template_name=self.templates.content_sid(
+                        target.campaign_type,
+                        campaign_settings.template_name
+                    ),
+                    parameters=parameters,
+                    attempt_count=attempt_count
+                )
+
+            # Skip the claim round trip while Twilio is known to be down
+            if not self.twilio.breaker.ready():
+                return circuit_open_result()
 
-            # Send message
+            # Claim the target so redeliveries do not send it twice
+            with stage("claim"):
+                claimed = await self.idempotency.claim(target)
+            if not claimed:
+                self.logger.info(
+                    "duplicate_target_skipped",
+                    target_id=target.id,
+                    user_id=target.user_id
+                )
+                return {
+                    "message_id": None,
+                    "status": "duplicate",
+                    "error_code": None,
+                    "error_message": None
+                }
+
+            # Send message; sends that may have reached Twilio come back
+            # with the unknown status instead of raising
             result = await self.twilio.send_message(message)
+
+            # Let the queue retry sends that may still succeed
+            if result["status"] == "failed" and classify_error(result["error_code"]) != "permanent":
+                claimed = False
+                await self._release_claim(target)
+
+            # Nothing was sent, so history and target status stay untouched
+            if result["error_code"] == CIRCUIT_OPEN_ERROR:
+                return result
             
-            # Update message history
-            await self._update_message_history(message, result)
-            
-            # Update target status
-            await self._update_target_status(target, result)
+            # Later callbacks are checked against the status sent with
+            if result["message_id"]:
+                self.status_updates.seed(result["message_id"], result["status"])
+
+            # Record message history, target status and counters in one batch
+            day = self.campaign_stats.today()
+            suppression = self.suppression.for_error(target.phone, result["error_code"])
+            with stage("firestore_commit"):
+                await self.writer.commit([
+                    self._message_history_write(message, result, day),
+                    self._target_status_write(target, result),
+                    *self.campaign_stats.send_ops(message, result, day),
+                    *([suppression] if suppression else [])
+                ])
             
             return result
 
         except Exception as e:
+            mark_error(str(e))
             self.logger.error(
                 "target_processing_error",
                 error=str(e),
                 target_id=target.id,
                 user_id=target.user_id
             )
+            # Without a result the request never left for Twilio, so the
+            # claim must not block a retry
+            if claimed and result is None:
+                await self._release_claim(target)
             return None
 
-    async def _update_message_history(self, message: Message, result: Dict):
-        """Update message history in Firestore"""
-        history_ref = self.db.collection("message_history").document()
-        history_ref.set({
+    async def _suppressed(self, target: CampaignTarget) -> Dict:
+        """Mark a suppressed target processed without sending or recording history"""
+        result = {
+            "message_id": None,
+            "status": "suppressed",
+            "error_code": None,
+            "error_message": None
+        }
+        # Keeps campaign runs from picking the target up again
+        await self.writer.commit([self._target_status_write(target, result)])
+        return result
+
+    async def _release_claim(self, target: CampaignTarget):
+        """Release an idempotency claim, logging failures"""
+        try:
+            await self.idempotency.release(target)
+        except Exception as e:
+            self.logger.error(
+                "claim_release_error",
+                error=str(e),
+                target_id=target.id
+            )
+
+    def _message_history_write(self, message: Message, result: Dict, day: str) -> WriteOp:
+        """Build the message history write for a send result"""
+        # Key history by message SID so status callbacks can update it directly
+        history = self.db.collection("message_history")
+        message_id = result.get("message_id")
+        history_ref = history.document(message_id) if message_id else history.document()
+        return WriteOp(history_ref, {
             "message_id": result.get("message_id"),
             "user_id": message.user_id,
             "campaign_type": message.campaign_type,
@@ -80,38 +232,27 @@ class MessageProcessor:
             "phone": message.phone_number,
             "status": result.get("status", "failed"),
             "error": result.get("error_message"),
+            "day": day,
             "created_at": firestore.SERVER_TIMESTAMP
-        })
+        }, merge=True)
 
-    async def _update_target_status(self, target: CampaignTarget, result: Dict):
-        """Update target status after processing"""
+    def _target_status_write(self, target: CampaignTarget, result: Dict) -> WriteOp:
+        """Build the target status write after processing"""
         target_ref = (
             self.db.collection("users")
             .document(target.user_id)
             .collection("campaigns")
-            .document(target.campaign_type)
+            .document(CampaignType(target.campaign_type).value)
             .collection("targets")
             .document(target.id)
         )
-        
-        target_ref.update({
+
+        # Merge instead of update so a missing target document cannot fail
+        # the whole shared batch
+        return WriteOp(target_ref, {
             "processed": True,
             "processed_at": firestore.SERVER_TIMESTAMP,
             "status": result.get("status", "failed"),
-            "message_id": result.get("message_id")
-        })
-
-    def _prepare_parameters(self, target: CampaignTarget) -> Dict:
-        """Prepare message template parameters based on campaign type"""
-        params = {
-            "name": target.name
-        }
-        
-        if target.campaign_type == "birthday":
-            params.update({"coupon": target.data.get("coupon", "")})
-        elif target.campaign_type == "reactivation":
-            params.update({"days_inactive": target.data.get("days_since_last_purchase", "")})
-        elif target.campaign_type == "loyalty":
-            params.update({"points": target.data.get("loyalty_points", "")})
-            
-        return params
\ No newline at end of file
+            "message_id": result.get("message_id"),
+            "error_code": result.get("error_code")
+        }, merge=True)
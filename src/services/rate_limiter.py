@@ -0,0 +1,104 @@
+# src/services/rate_limiter.py
+
+from src.config import settings
+from src.utils.logging import get_logger
+from typing import Dict, Optional
+import asyncio
+import time
+
+logger = get_logger(__name__)
+
+class TokenBucket:
+    """Async token bucket with FIFO reservations
+
+    Tokens may go negative: each caller reserves the next free token and
+    sleeps until it refills, so waiters are served in arrival order without
+    polling.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token and return how long to wait until it is available"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self) -> None:
+        """Return a reserved token that was not used"""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+class SendScheduler:
+    """Pace outbound sends per sender number and per Twilio account"""
+
+    def __init__(
+        self,
+        sender_rate: Optional[float] = None,
+        sender_burst: Optional[float] = None,
+        account_rate: Optional[float] = None,
+        account_burst: Optional[float] = None
+    ):
+        self.sender_rate = sender_rate or settings.SENDER_RATE_PER_SECOND
+        self.sender_burst = sender_burst or settings.SENDER_BURST
+        self.account_rate = account_rate or settings.ACCOUNT_RATE_PER_SECOND
+        self.account_burst = account_burst or settings.ACCOUNT_BURST
+        self.senders: Dict[str, TokenBucket] = {}
+        self.accounts: Dict[str, TokenBucket] = {}
+        self.logger = logger
+
+        self.waiting = 0
+        self.acquired = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def acquire(self, account_sid: str, from_number: str) -> float:
+        """Wait until both the sender and account buckets allow a send
+
+        Returns the time spent queued in seconds.
+        """
+        sender = self.senders.get(from_number)
+        if sender is None:
+            rate = settings.SENDER_RATE_OVERRIDES.get(from_number, self.sender_rate)
+            # A lower-tier number should not burst past its own rate
+            sender = self.senders[from_number] = TokenBucket(rate, min(self.sender_burst, rate))
+
+        account = self.accounts.get(account_sid)
+        if account is None:
+            account = self.accounts[account_sid] = TokenBucket(self.account_rate, self.account_burst)
+
+        wait = max(sender.reserve(), account.reserve())
+        if wait > 0:
+            self.waiting += 1
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                sender.refund()
+                account.refund()
+                raise
+            finally:
+                self.waiting -= 1
+            self.delayed += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+        self.acquired += 1
+        return wait
+
+    def stats(self) -> Dict:
+        """Scheduler counters for monitoring"""
+        return {
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "avg_wait_ms": round(self.total_wait / self.acquired * 1000, 2) if self.acquired else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "senders": len(self.senders),
+            "accounts": len(self.accounts)
+        }
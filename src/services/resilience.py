@@ -0,0 +1,194 @@
+# src/services/resilience.py
+
+from src.config import settings
+from src.utils.logging import get_logger
+from src.utils.metrics import CIRCUIT_STATE, SEND_CONCURRENCY_LIMIT
+from collections import deque
+from typing import Deque, Dict, Optional
+import asyncio
+import time
+
+logger = get_logger(__name__)
+
+class AdaptiveLimiter:
+    """AIMD limit on concurrent calls to a downstream service
+
+    The limit grows by one per window of fast successful calls and is
+    halved on overload (429, 5xx, timeouts), at most once per cooldown so a
+    burst of failures from the same window only counts once.
+    """
+
+    def __init__(
+        self,
+        initial: Optional[int] = None,
+        min_limit: Optional[int] = None,
+        max_limit: Optional[int] = None,
+        latency_target: Optional[float] = None,
+        backoff: float = 0.5,
+        cooldown: float = 1.0
+    ):
+        self.min_limit = min_limit or settings.SEND_CONCURRENCY_MIN
+        self.max_limit = max_limit or settings.SEND_CONCURRENCY_MAX
+        self.limit = float(initial or settings.SEND_CONCURRENCY_INITIAL)
+        self.latency_target = latency_target or settings.SEND_LATENCY_TARGET_MS / 1000
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.logger = logger
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+        self._decreases = 0
+        SEND_CONCURRENCY_LIMIT.set(int(self.limit))
+
+    async def acquire(self) -> None:
+        """Wait for a free slot under the current limit"""
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before cancellation
+            if waiter.done() and not waiter.cancelled():
+                self.in_flight -= 1
+                self._wake()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self, latency: Optional[float] = None, overloaded: bool = False) -> None:
+        """Free a slot and adjust the limit from the call's outcome
+
+        ``latency`` is None for slots given back without making a call.
+        """
+        self.in_flight -= 1
+        now = time.monotonic()
+        if latency is None:
+            pass
+        elif overloaded:
+            if now - self._last_decrease >= self.cooldown:
+                self._last_decrease = now
+                self._decreases += 1
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self.logger.warning("send_concurrency_decreased", limit=int(self.limit))
+        elif latency <= self.latency_target:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        SEND_CONCURRENCY_LIMIT.set(int(self.limit))
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def stats(self) -> Dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "decreases": self._decreases
+        }
+
+class CircuitBreaker:
+    """Stop calling a downstream service during sustained failures
+
+    Opens when the failure ratio over the last ``window`` calls reaches
+    ``failure_ratio``, refuses calls for ``reset_timeout`` seconds, then lets
+    a few probes through half-open: one success closes it, one failure
+    reopens it.
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_ratio: Optional[float] = None,
+        min_calls: Optional[int] = None,
+        window: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+        half_open_probes: Optional[int] = None
+    ):
+        self.name = name
+        self.failure_ratio = failure_ratio or settings.CIRCUIT_FAILURE_RATIO
+        self.min_calls = min_calls or settings.CIRCUIT_MIN_CALLS
+        self.reset_timeout = reset_timeout or settings.CIRCUIT_RESET_SECONDS
+        self.half_open_probes = half_open_probes or settings.CIRCUIT_HALF_OPEN_PROBES
+        self.state = self.CLOSED
+        self.logger = logger
+        self._outcomes: Deque[bool] = deque(maxlen=window or settings.CIRCUIT_WINDOW)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._opens = 0
+        CIRCUIT_STATE.set(0, name)
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets probes through"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def ready(self) -> bool:
+        """Whether a call would currently be let through, without reserving it"""
+        if self.state == self.OPEN:
+            return self.retry_after == 0
+        if self.state == self.HALF_OPEN:
+            return self._probes < self.half_open_probes
+        return True
+
+    def allow(self) -> bool:
+        """Reserve permission for one call"""
+        if self.state == self.OPEN and self.retry_after == 0:
+            self._transition(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self._probes >= self.half_open_probes:
+                return False
+            self._probes += 1
+            return True
+        return self.state == self.CLOSED
+
+    def record(self, success: bool) -> None:
+        """Record the outcome of an allowed call"""
+        if self.state == self.HALF_OPEN:
+            self._transition(self.CLOSED if success else self.OPEN)
+            return
+        if self.state == self.OPEN:
+            return
+
+        self._outcomes.append(success)
+        failures = self._outcomes.count(False)
+        if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_ratio:
+            self._transition(self.OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        self.state = state
+        self._probes = 0
+        if state == self.OPEN:
+            self._opened_at = time.monotonic()
+            self._opens += 1
+            self.logger.warning("circuit_opened", circuit=self.name, retry_after=self.reset_timeout)
+        elif state == self.CLOSED:
+            self._outcomes.clear()
+            self.logger.info("circuit_closed", circuit=self.name)
+        CIRCUIT_STATE.set(self.STATE_VALUES[state], self.name)
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "retry_after_seconds": round(self.retry_after, 1),
+            "recent_failure_ratio": round(
+                self._outcomes.count(False) / len(self._outcomes), 3
+            ) if self._outcomes else 0.0,
+            "opens": self._opens
+        }
@@ -0,0 +1,146 @@
+# src/services/send_window.py
+
+from src.models.campaign import CampaignTarget
+from src.config.constants import BRAZIL_TIMEZONE, CampaignType
+from src.config import settings
+from src.services.work_queue import WorkQueue
+from src.utils.helpers import get_timezone
+from src.utils.logging import get_logger
+from datetime import datetime, time as dtime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import zlib
+
+logger = get_logger(__name__)
+
+@lru_cache(maxsize=1024)
+def parse_send_time(send_time: str) -> Optional[dtime]:
+    """Parse an ``HH:MM`` send time, returning None if it is malformed"""
+    try:
+        hour, minute = send_time.split(":")
+        return dtime(int(hour), int(minute))
+    except (AttributeError, ValueError):
+        return None
+
+def window_fraction(key: str) -> float:
+    """Stable position in [0, 1) of a target within its send window"""
+    return zlib.crc32(key.encode()) / 2 ** 32
+
+class SendWindowScheduler:
+    """Hold targets in the work queue until their campaign's send window
+
+    Each campaign sends from its ``send_time`` (America/Sao_Paulo) for
+    SEND_WINDOW_MINUTES, and every target gets a stable offset inside that
+    window so large campaigns drain evenly instead of firing at once. Due
+    times are stored in the queue's indexed ``available_at`` column, which
+    acts as the timer heap: O(log n) insert and pop-min at any depth, and it
+    survives restarts.
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        settings_cache,
+        window_minutes: Optional[int] = None,
+        enabled: Optional[bool] = None
+    ):
+        self.queue = queue
+        self.settings_cache = settings_cache
+        self.window = timedelta(minutes=window_minutes or settings.SEND_WINDOW_MINUTES)
+        self.enabled = settings.SEND_WINDOW_ENABLED if enabled is None else enabled
+        self.timezone = get_timezone(BRAZIL_TIMEZONE)
+        self.logger = logger
+        self._scheduled = 0
+        self._immediate = 0
+
+    def due_at(self, target: CampaignTarget, send_time: str, now: datetime) -> float:
+        """Epoch time at which ``target`` should be sent"""
+        start_time = parse_send_time(send_time)
+        if start_time is None:
+            self.logger.warning(
+                "invalid_send_time",
+                user_id=target.user_id,
+                campaign_type=target.campaign_type,
+                send_time=send_time
+            )
+            return now.timestamp()
+
+        day = now.date()
+        start = self.timezone.localize(datetime.combine(day, start_time))
+        if now >= start + self.window:
+            start = self.timezone.localize(datetime.combine(day + timedelta(days=1), start_time))
+
+        fraction = window_fraction(target.key)
+        if now <= start:
+            return (start + self.window * fraction).timestamp()
+
+        # Window already open: spread over what is left of it
+        remaining = (start + self.window - now).total_seconds()
+        return now.timestamp() + remaining * fraction
+
+    def in_window(self, send_time: str, when: datetime) -> bool:
+        """Whether ``when`` falls inside a send window, including one that opened the day before"""
+        start_time = parse_send_time(send_time)
+        if start_time is None:
+            return True
+        for day in (when.date(), when.date() - timedelta(days=1)):
+            start = self.timezone.localize(datetime.combine(day, start_time))
+            if start <= when < start + self.window:
+                return True
+        return False
+
+    async def retry_delay(self, target: CampaignTarget, delay: float) -> float:
+        """Seconds until a retry of ``target`` may be sent, at least ``delay``
+
+        A retry that would land outside its campaign's send window waits
+        for the target's slot in the next window instead.
+        """
+        if not self.enabled:
+            return delay
+        campaign_settings = await self.settings_cache.get(target.user_id, target.campaign_type)
+        if campaign_settings is None:
+            return delay
+
+        now = datetime.now(self.timezone)
+        retry = now + timedelta(seconds=delay)
+        if self.in_window(campaign_settings.send_time, retry):
+            return delay
+        return self.due_at(target, campaign_settings.send_time, retry) - now.timestamp()
+
+    async def enqueue(self, targets: List[CampaignTarget]) -> int:
+        """Queue targets to become available inside their send window"""
+        if not self.enabled or not targets:
+            return await self.queue.enqueue(targets)
+
+        groups = list({(target.user_id, CampaignType(target.campaign_type)) for target in targets})
+        campaign_settings = await asyncio.gather(*(
+            self.settings_cache.get(user_id, campaign_type)
+            for user_id, campaign_type in groups
+        ))
+        send_times: Dict[Tuple[str, CampaignType], Optional[str]] = {
+            group: found.send_time if found else None
+            for group, found in zip(groups, campaign_settings)
+        }
+
+        now = datetime.now(self.timezone)
+        available_at = []
+        for target in targets:
+            send_time = send_times[(target.user_id, CampaignType(target.campaign_type))]
+            if send_time is None:
+                # Missing settings are reported by the processor
+                available_at.append(now.timestamp())
+                self._immediate += 1
+            else:
+                available_at.append(self.due_at(target, send_time, now))
+                self._scheduled += 1
+
+        return await self.queue.enqueue(targets, available_at=available_at)
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "window_minutes": self.window.total_seconds() / 60,
+            "scheduled": self._scheduled,
+            "immediate": self._immediate
+        }
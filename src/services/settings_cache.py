@@ -0,0 +1,218 @@
+# src/services/settings_cache.py
+
+from src.models.campaign import CampaignSettings
+from src.config.constants import CampaignType
+from src.config import settings
+from src.utils.logging import get_logger
+from google.cloud import firestore
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import time
+
+logger = get_logger(__name__)
+
+CacheKey = Tuple[str, str]
+
+class CampaignSettingsCache:
+    """LRU cache of parsed campaign settings with TTL and live invalidation
+
+    Concurrent misses for the same campaign share a single Firestore read.
+    Cached documents are watched with snapshot listeners so edits evict the
+    entry as soon as Firestore reports them. Each listener runs its own
+    thread, so at most CAMPAIGN_SETTINGS_MAX_WATCHES documents are watched;
+    the rest rely on the TTL.
+    """
+
+    def __init__(
+        self,
+        db,
+        max_size: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        watch: Optional[bool] = None,
+        max_watches: Optional[int] = None
+    ):
+        self.db = db
+        self.max_size = max_size or settings.CAMPAIGN_SETTINGS_CACHE_SIZE
+        self.ttl = ttl_seconds or settings.CAMPAIGN_SETTINGS_CACHE_TTL_SECONDS
+        self.watch = settings.CAMPAIGN_SETTINGS_WATCH if watch is None else watch
+        self.max_watches = settings.CAMPAIGN_SETTINGS_MAX_WATCHES if max_watches is None else max_watches
+        self.logger = logger
+
+        # key -> (expires_at, update_time, settings)
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any, Optional[CampaignSettings]]]" = OrderedDict()
+        self._loading: Dict[CacheKey, asyncio.Future] = {}
+        self._watches: Dict[CacheKey, Any] = {}
+        self._watch_client: Optional[firestore.Client] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closed = False
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.reads = 0
+        self.invalidations = 0
+
+    async def get(self, user_id: str, campaign_type: str) -> Optional[CampaignSettings]:
+        """Get campaign settings, reading Firestore only on a miss"""
+        key = (user_id, CampaignType(campaign_type).value)
+        entry = self._entries.get(key)
+
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+        self.misses += 1
+        self._loop = self._loop or asyncio.get_running_loop()
+
+        future = self._loading.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._read(key))
+            self._loading[key] = future
+            future.add_done_callback(partial(self._loaded, key))
+        else:
+            self.coalesced += 1
+
+        _, campaign_settings = await asyncio.shield(future)
+        return campaign_settings
+
+    def invalidate(self, user_id: str, campaign_type: str) -> None:
+        """Drop cached settings for a campaign"""
+        self._invalidate((user_id, CampaignType(campaign_type).value))
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "reads": self.reads,
+            "invalidations": self.invalidations,
+            "watches": len(self._watches),
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def close(self) -> None:
+        """Stop all snapshot listeners and their client"""
+        self._closed = True
+        for watch in self._watches.values():
+            # None while the listener is still starting; it stops itself
+            if watch is not None:
+                watch.unsubscribe()
+        self._watches.clear()
+        if self._watch_client is not None:
+            self._watch_client.close()
+            self._watch_client = None
+
+    def _document(self, client, key: CacheKey):
+        user_id, campaign_type = key
+        return (
+            client.collection("users")
+            .document(user_id)
+            .collection("campaigns")
+            .document(campaign_type)
+        )
+
+    async def _read(self, key: CacheKey) -> Tuple[Any, Optional[CampaignSettings]]:
+        self.reads += 1
+        doc = await self._document(self.db, key).get()
+        if not doc.exists:
+            return None, None
+
+        user_id, campaign_type = key
+        return doc.update_time, CampaignSettings(**{
+            **doc.to_dict(),
+            "user_id": user_id,
+            "campaign_type": campaign_type
+        })
+
+    def _loaded(self, key: CacheKey, future: asyncio.Future) -> None:
+        # A newer load replaced this one after an invalidation
+        if self._loading.get(key) is not future:
+            return
+        del self._loading[key]
+
+        if future.cancelled() or future.exception() is not None:
+            return
+
+        update_time, campaign_settings = future.result()
+        self._entries[key] = (time.monotonic() + self.ttl, update_time, campaign_settings)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            evicted, _ = self._entries.popitem(last=False)
+            self._stop_watch(evicted)
+
+        if self.watch and key not in self._watches and len(self._watches) < self.max_watches:
+            self._watches[key] = None
+            self._loop.run_in_executor(None, self._start_watch, key)
+
+    def _invalidate(self, key: CacheKey) -> None:
+        self.invalidations += 1
+        self._loading.pop(key, None)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            # Keep the LRU slot, and with it the listener, but force a reload
+            self._entries[key] = (0.0, entry[1], entry[2])
+
+    def _start_watch(self, key: CacheKey) -> None:
+        # Runs in an executor thread: opening a listener blocks on the RPC
+        if self._closed:
+            return
+        try:
+            if self._watch_client is None:
+                self._watch_client = firestore.Client()
+            watch = self._document(self._watch_client, key).on_snapshot(
+                partial(self._on_snapshot, key)
+            )
+        except Exception as e:
+            self.logger.error(
+                "campaign_settings_watch_error",
+                error=str(e),
+                user_id=key[0],
+                campaign_type=key[1]
+            )
+            self._loop.call_soon_threadsafe(self._watches.pop, key, None)
+            return
+
+        self._loop.call_soon_threadsafe(self._watch_started, key, watch)
+
+    def _watch_started(self, key: CacheKey, watch) -> None:
+        if self._closed:
+            # Started while closing; the client may have been created after close
+            watch.unsubscribe()
+            self.close()
+        elif key in self._watches:
+            self._watches[key] = watch
+        else:
+            # Entry was evicted while the listener was starting
+            self._loop.run_in_executor(None, watch.unsubscribe)
+
+    def _stop_watch(self, key: CacheKey) -> None:
+        watch = self._watches.pop(key, None)
+        if watch is not None:
+            self._loop.run_in_executor(None, watch.unsubscribe)
+
+    def _on_snapshot(self, key: CacheKey, docs, changes, read_time) -> None:
+        # Called from the listener thread
+        doc = docs[0] if docs else None
+        update_time = doc.update_time if doc is not None and doc.exists else None
+        self._loop.call_soon_threadsafe(self._changed, key, update_time)
+
+    def _changed(self, key: CacheKey, update_time) -> None:
+        entry = self._entries.get(key)
+        # The first snapshot repeats the state we already loaded
+        if entry is not None and entry[1] == update_time:
+            return
+
+        self._invalidate(key)
+        self.logger.info(
+            "campaign_settings_invalidated",
+            user_id=key[0],
+            campaign_type=key[1]
+        )
@@ -0,0 +1,226 @@
+# src/services/status_aggregator.py
+
+from src.services.firestore_writer import BatchWriter, WriteOp
+from src.services.campaign_stats import CampaignStats
+from src.config import settings
+from src.config.constants import MESSAGE_STATUS_RANK, TERMINAL_FAILURE_STATUSES
+from src.utils.logging import get_logger
+from src.utils.metrics import STATUS_UPDATES_DROPPED
+from google.cloud import firestore
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+import asyncio
+
+logger = get_logger(__name__)
+
+# Statuses that also stamp a matching <status>_at field on the history document
+TIMESTAMPED_STATUSES = {"sent", "delivered", "read"}
+
+def advances(current: Optional[str], status: str) -> bool:
+    """Whether moving from ``current`` to ``status`` is forward progress
+
+    Statuses only move up MESSAGE_STATUS_RANK. Failures are terminal and
+    are accepted until the message is delivered. Unknown statuses are let
+    through since their place in the order is not known.
+    """
+    if current is None:
+        return True
+    if status == current or current in TERMINAL_FAILURE_STATUSES:
+        return False
+    if status in TERMINAL_FAILURE_STATUSES:
+        return MESSAGE_STATUS_RANK.get(current, 0) < MESSAGE_STATUS_RANK["delivered"]
+    if current not in MESSAGE_STATUS_RANK or status not in MESSAGE_STATUS_RANK:
+        return True
+    return MESSAGE_STATUS_RANK[status] > MESSAGE_STATUS_RANK[current]
+
+class StatusAggregator:
+    """Coalesce Twilio status callbacks into batched history updates
+
+    Only the latest status per message SID is kept between flushes, so a
+    burst of queued/sent/delivered callbacks costs a single write. Campaign
+    counters for the new statuses are committed in the same batch.
+
+    The last known status of recent messages is kept in a bounded LRU, and
+    callbacks that are duplicates or move a message backwards (a late
+    "sent" after "read") are dropped without touching Firestore. Messages
+    missing from the cache are written as they arrive.
+
+    Updates from a failed flush are retried with exponential backoff
+    (STATUS_FLUSH_BACKOFF_SECONDS, doubled per failure) and dropped after
+    STATUS_FLUSH_MAX_ATTEMPTS failed writes.
+    """
+
+    def __init__(
+        self,
+        db,
+        writer: BatchWriter,
+        campaign_stats: Optional[CampaignStats] = None,
+        flush_interval_ms: Optional[int] = None,
+        max_entries: Optional[int] = None
+    ):
+        self.db = db
+        self.writer = writer
+        self.campaign_stats = campaign_stats
+        self.flush_interval = (flush_interval_ms or settings.WEBHOOK_FLUSH_INTERVAL_MS) / 1000
+        # Each update can add a counter write, and the batch must stay within max_ops
+        max_ops = writer.max_ops // 2 if campaign_stats is not None else writer.max_ops
+        self.max_entries = min(max_entries or settings.WEBHOOK_FLUSH_MAX_ENTRIES, max_ops)
+        self.logger = logger
+        self._pending: Dict[str, str] = {}
+        self._last: "OrderedDict[str, str]" = OrderedDict()
+        self.cache_size = settings.STATUS_CACHE_SIZE
+        self.max_attempts = settings.STATUS_FLUSH_MAX_ATTEMPTS
+        self.backoff = settings.STATUS_FLUSH_BACKOFF_SECONDS
+        self.max_backoff = settings.STATUS_FLUSH_MAX_BACKOFF_SECONDS
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+        # Updates waiting out a backoff, and failed writes per message
+        self._retrying: Dict[str, str] = {}
+        self._retry_handle: Optional[asyncio.TimerHandle] = None
+        self._failures: Dict[str, int] = {}
+
+        self.received = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def seed(self, message_sid: str, status: str) -> None:
+        """Remember the status a message was sent with"""
+        self._remember(message_sid, status)
+
+    def record(self, message_sid: str, status: str) -> None:
+        """Queue a status update for the next flush, dropping stale ones"""
+        self.received += 1
+        if not advances(self._last.get(message_sid), status):
+            self.dropped += 1
+            return
+
+        self._remember(message_sid, status)
+        self._enqueue(message_sid, status)
+
+    async def flush(self) -> None:
+        """Write pending updates and wait for in-flight flushes"""
+        # Updates waiting out a backoff get one more try
+        self._requeue()
+        self._flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Callback counters for monitoring"""
+        return {
+            "pending": len(self._pending),
+            "retrying": len(self._retrying),
+            "received": self.received,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "coalesced": (
+                self.received - self.written - self.dropped - self.failed
+                - len(self._pending) - len(self._retrying)
+            ),
+            "cached": len(self._last)
+        }
+
+    def _enqueue(self, message_sid: str, status: str) -> None:
+        self._pending[message_sid] = status
+
+        if len(self._pending) >= self.max_entries:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.flush_interval,
+                self._flush
+            )
+
+    def _remember(self, message_sid: str, status: str) -> None:
+        self._last[message_sid] = status
+        self._last.move_to_end(message_sid)
+        while len(self._last) > self.cache_size:
+            self._last.popitem(last=False)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
+
+        updates = self._pending
+        self._pending = {}
+
+        task = asyncio.create_task(self._write(updates))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, updates: Dict[str, str]) -> None:
+        history = self.db.collection("message_history")
+        ops = []
+        for message_sid, status in updates.items():
+            data = {
+                "status": status,
+                "updated_at": firestore.SERVER_TIMESTAMP
+            }
+            if status in TIMESTAMPED_STATUSES:
+                data[f"{status}_at"] = firestore.SERVER_TIMESTAMP
+            ops.append(WriteOp(history.document(message_sid), data, merge=True))
+
+        try:
+            if self.campaign_stats is not None:
+                ops.extend(await self.campaign_stats.transition_ops(updates))
+            await self.writer.commit(ops)
+        except Exception as e:
+            self.logger.error(
+                "status_flush_error",
+                error=str(e),
+                updates=len(updates)
+            )
+            self._retry(updates)
+            return
+
+        for message_sid in updates:
+            self._failures.pop(message_sid, None)
+        if self.campaign_stats is not None:
+            self.campaign_stats.committed(updates)
+        self.written += len(updates)
+
+    def _retry(self, updates: Dict[str, str]) -> None:
+        attempts = 0
+        abandoned = 0
+        for message_sid, status in updates.items():
+            # A newer status replaces this one
+            if message_sid in self._pending or message_sid in self._retrying:
+                continue
+            failures = self._failures.get(message_sid, 0) + 1
+            if failures >= self.max_attempts:
+                self._failures.pop(message_sid, None)
+                abandoned += 1
+                continue
+            self._failures[message_sid] = failures
+            self._retrying[message_sid] = status
+            attempts = max(attempts, failures)
+
+        if abandoned:
+            self.failed += abandoned
+            STATUS_UPDATES_DROPPED.inc(amount=abandoned)
+            self.logger.error(
+                "status_updates_dropped",
+                updates=abandoned,
+                attempts=self.max_attempts
+            )
+
+        if self._retrying and self._retry_handle is None:
+            delay = min(self.backoff * 2 ** (attempts - 1), self.max_backoff)
+            self._retry_handle = asyncio.get_running_loop().call_later(delay, self._requeue)
+
+    def _requeue(self) -> None:
+        if self._retry_handle is not None:
+            self._retry_handle.cancel()
+            self._retry_handle = None
+
+        retrying = self._retrying
+        self._retrying = {}
+        for message_sid, status in retrying.items():
+            if message_sid not in self._pending:
+                self._enqueue(message_sid, status)
@@ -0,0 +1,213 @@
+# src/services/suppression.py
+
+from src.services.firestore_writer import WriteOp
+from src.config.constants import OPT_IN_KEYWORDS, OPT_OUT_KEYWORDS, SUPPRESSION_ERROR_CODES
+from src.config import settings
+from src.utils.helpers import normalize_phone_numbers
+from src.utils.logging import get_logger
+from google.cloud import firestore
+from typing import Any, Dict, Optional, Set
+import asyncio
+import time
+
+logger = get_logger(__name__)
+
+def phone_key(phone: Optional[str]) -> Optional[int]:
+    """Normalized phone number as an integer, or None if it is invalid"""
+    if not phone:
+        return None
+    # Twilio addresses look like whatsapp:+5511999990000
+    normalized = normalize_phone_numbers([phone.rsplit(":", 1)[-1]])[0]
+    return int(normalized) if normalized else None
+
+class SuppressionIndex:
+    """Phone numbers that must not be sent to: opted out or not on WhatsApp
+
+    The index is a set of normalized numbers stored as ints (O(1) lookups,
+    far smaller than the strings) mirroring the ``suppressions`` collection.
+    Sends and STOP replies are often handled by different processes (the
+    web tier records webhooks while dispatcher processes send), so every
+    process keeps its copy current with a snapshot listener on the
+    collection, or with SUPPRESSION_WATCH off re-reads it every
+    SUPPRESSION_REFRESH_SECONDS. Local additions apply at once and are
+    returned as WriteOps so they commit with the batch that records the
+    event that caused them.
+    """
+
+    def __init__(self, db, watch: Optional[bool] = None, refresh_seconds: Optional[float] = None):
+        self.db = db
+        self.watch = settings.SUPPRESSION_WATCH if watch is None else watch
+        self.refresh_seconds = refresh_seconds or settings.SUPPRESSION_REFRESH_SECONDS
+        self.logger = logger
+        self._numbers: Set[int] = set()
+        self._loading: Optional[asyncio.Future] = None
+        self._refresh: Optional[asyncio.Task] = None
+        self._watch = None
+        self._watch_client: Optional[firestore.Client] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._first_snapshot: Optional[asyncio.Future] = None
+        self.loaded = False
+
+        self.hits = 0
+        self.added = 0
+        self.removed = 0
+        self.remote_changes = 0
+
+    async def load(self) -> None:
+        """Load the index and start following changes; concurrent callers share the read"""
+        if self.loaded:
+            return
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._subscribe() if self.watch else self._read())
+        try:
+            await asyncio.shield(self._loading)
+        except Exception:
+            # Let the next caller retry
+            self._loading = None
+            raise
+
+        if not self.watch and self._refresh is None:
+            self._refresh = asyncio.create_task(self._refresh_periodically())
+
+    def close(self) -> None:
+        """Stop following changes"""
+        if self._refresh is not None:
+            self._refresh.cancel()
+            self._refresh = None
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+        if self._watch_client is not None:
+            self._watch_client.close()
+            self._watch_client = None
+
+    def contains(self, phone: str) -> bool:
+        """Whether sends to ``phone`` are suppressed"""
+        key = phone_key(phone)
+        if key is not None and key in self._numbers:
+            self.hits += 1
+            return True
+        return False
+
+    def add(self, phone: str, reason: str, source: str) -> Optional[WriteOp]:
+        """Suppress a number, returning the write that persists it if it is new"""
+        key = phone_key(phone)
+        if key is None or key in self._numbers:
+            return None
+
+        self._numbers.add(key)
+        self.added += 1
+        self.logger.info("phone_suppressed", phone=str(key), reason=reason, source=source)
+        return WriteOp(self._document(key), {
+            "phone": str(key),
+            "reason": reason,
+            "source": source,
+            "created_at": firestore.SERVER_TIMESTAMP
+        })
+
+    def for_error(self, phone: str, error_code) -> Optional[WriteOp]:
+        """Suppress a number if a send error shows it cannot receive messages"""
+        reason = SUPPRESSION_ERROR_CODES.get(error_code)
+        if reason is None:
+            return None
+        return self.add(phone, reason, f"twilio_error_{error_code}")
+
+    async def record_inbound(self, phone: str, text: str) -> bool:
+        """Apply an opt-out or opt-in keyword from an inbound message"""
+        keyword = (text or "").strip().upper()
+        if keyword in OPT_OUT_KEYWORDS:
+            op = self.add(phone, "opted_out", "inbound")
+            if op is not None:
+                await op.ref.set(op.data)
+            return True
+
+        key = phone_key(phone)
+        if keyword in OPT_IN_KEYWORDS and key in self._numbers:
+            self._numbers.discard(key)
+            self.removed += 1
+            self.logger.info("phone_unsuppressed", phone=str(key))
+            await self._document(key).delete()
+            return True
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Index counters for monitoring"""
+        return {
+            "loaded": self.loaded,
+            "watching": self._watch is not None,
+            "size": len(self._numbers),
+            "hits": self.hits,
+            "added": self.added,
+            "removed": self.removed,
+            "remote_changes": self.remote_changes
+        }
+
+    def _document(self, key: int):
+        return self.db.collection("suppressions").document(str(key))
+
+    async def _read(self) -> None:
+        started = time.perf_counter()
+        known = set(self._numbers)
+        numbers = set()
+        # Document IDs are the numbers, so no fields need to be fetched
+        async for doc in self.db.collection("suppressions").select([]).stream():
+            if doc.id.isdigit():
+                numbers.add(int(doc.id))
+
+        # Keep numbers added while the read was in flight
+        self.remote_changes += len(numbers ^ known) if self.loaded else 0
+        self._numbers = numbers | (self._numbers - known)
+        self._loaded(started)
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self._read()
+            except Exception as e:
+                self.logger.warning("suppressions_refresh_error", error=str(e))
+
+    async def _subscribe(self) -> None:
+        started = time.perf_counter()
+        self._loop = asyncio.get_running_loop()
+        self._first_snapshot = self._loop.create_future()
+        # Opening a listener blocks on the RPC
+        await self._loop.run_in_executor(None, self._start_watch)
+        # The first snapshot lists the whole collection
+        await self._first_snapshot
+        self._loaded(started)
+
+    def _start_watch(self) -> None:
+        # Runs in an executor thread
+        if self._watch_client is None:
+            self._watch_client = firestore.Client()
+        self._watch = self._watch_client.collection("suppressions").on_snapshot(self._on_snapshot)
+
+    def _on_snapshot(self, docs, changes, read_time) -> None:
+        # Called from the listener thread
+        added: Set[int] = set()
+        removed: Set[int] = set()
+        for change in changes:
+            if change.document.id.isdigit():
+                key = int(change.document.id)
+                (removed if change.type.name == "REMOVED" else added).add(key)
+        self._loop.call_soon_threadsafe(self._apply, added, removed)
+
+    def _apply(self, added: Set[int], removed: Set[int]) -> None:
+        if self.loaded:
+            self.remote_changes += len(added - self._numbers) + len(removed & self._numbers)
+        self._numbers |= added
+        self._numbers -= removed
+        if not self._first_snapshot.done():
+            self._first_snapshot.set_result(None)
+
+    def _loaded(self, started: float) -> None:
+        if self.loaded:
+            return
+        self.loaded = True
+        self.logger.info(
+            "suppressions_loaded",
+            size=len(self._numbers),
+            watching=self.watch,
+            load_ms=round((time.perf_counter() - started) * 1000, 1)
+        )
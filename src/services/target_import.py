@@ -0,0 +1,156 @@
+# src/services/target_import.py
+
+from src.models.campaign import CampaignTarget
+from src.services.work_queue import WorkQueue
+from src.services.send_window import SendWindowScheduler
+from src.config.constants import ERROR_MESSAGES
+from src.config import settings
+from src.utils.helpers import normalize_phone_numbers
+from src.utils.logging import get_logger
+from pydantic import ValidationError
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+import codecs
+import csv
+import json
+
+logger = get_logger(__name__)
+
+# Only the first rejections are reported so memory stays bounded
+MAX_REPORTED_ERRORS = 100
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[str]]:
+    """Decode a byte stream into batches of complete lines"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    remainder = ""
+    async for chunk in chunks:
+        text = remainder + decoder.decode(chunk)
+        lines = text.split("\n")
+        remainder = lines.pop()
+        if lines:
+            yield lines
+
+    remainder += decoder.decode(b"", final=True)
+    if remainder:
+        yield [remainder]
+
+def iter_csv_records(lines: List[str], pending: List[str]) -> Iterator[str]:
+    """Join physical lines into CSV records, keeping quoted newlines together"""
+    for line in lines:
+        pending.append(line)
+        record = "\n".join(pending)
+        # An odd number of quotes means a quoted field continues on the next line
+        if record.count('"') % 2 == 0:
+            pending.clear()
+            yield record
+
+class TargetImporter:
+    """Stream CSV or NDJSON targets into the work queue in validated chunks"""
+
+    def __init__(
+        self,
+        queue: Union[WorkQueue, SendWindowScheduler],
+        chunk_size: Optional[int] = None
+    ):
+        self.queue = queue
+        self.chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+        self.logger = logger
+
+    async def run(
+        self,
+        chunks: AsyncIterator[bytes],
+        fmt: str,
+        defaults: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Import targets from a byte stream and return a summary"""
+        summary = {"rows": 0, "accepted": 0, "queued": 0, "rejected": 0, "errors": []}
+        rows = self._iter_csv(chunks) if fmt == "csv" else self._iter_ndjson(chunks)
+
+        chunk: List[Dict[str, Any]] = []
+        async for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                await self._import_chunk(chunk, summary, defaults or {})
+                chunk = []
+
+        if chunk:
+            await self._import_chunk(chunk, summary, defaults or {})
+
+        self.logger.info(
+            "targets_imported",
+            format=fmt,
+            rows=summary["rows"],
+            accepted=summary["accepted"],
+            queued=summary["queued"],
+            rejected=summary["rejected"]
+        )
+        return summary
+
+    async def _iter_ndjson(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[Dict[str, Any]]:
+        async for lines in iter_lines(chunks):
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    row = {"_error": f"Invalid JSON: {e}"}
+                yield row if isinstance(row, dict) else {"_error": "Row is not a JSON object"}
+
+    async def _iter_csv(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[Dict[str, Any]]:
+        header: Optional[List[str]] = None
+        fields = set(CampaignTarget.model_fields)
+        pending: List[str] = []
+
+        async for lines in iter_lines(chunks):
+            records = [record for record in iter_csv_records(lines, pending) if record.strip()]
+            for values in csv.reader(records):
+                if header is None:
+                    header = [name.strip() for name in values]
+                    continue
+
+                row: Dict[str, Any] = {"data": {}}
+                for name, value in zip(header, values):
+                    # Columns that are not target fields are campaign data
+                    if name in fields and name != "data":
+                        row[name] = value
+                    else:
+                        row["data"][name] = value
+                yield row
+
+    async def _import_chunk(
+        self,
+        rows: List[Dict[str, Any]],
+        summary: Dict[str, Any],
+        defaults: Dict[str, Any]
+    ) -> None:
+        start = summary["rows"]
+        summary["rows"] += len(rows)
+
+        phones = normalize_phone_numbers(str(row.get("phone", "")) for row in rows)
+
+        targets: List[CampaignTarget] = []
+        for index, (row, phone) in enumerate(zip(rows, phones), start=start + 1):
+            error = row.pop("_error", None)
+            if error is None and phone is None:
+                error = ERROR_MESSAGES["invalid_phone"]
+
+            if error is None:
+                try:
+                    # Defaults only fill columns the row lacks or leaves blank
+                    present = {name: value for name, value in row.items() if value not in ("", None)}
+                    targets.append(CampaignTarget.model_validate({**defaults, **present, "phone": phone}))
+                    continue
+                except ValidationError as e:
+                    error = "; ".join(
+                        f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}"
+                        for err in e.errors()
+                    )
+
+            summary["rejected"] += 1
+            if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+                summary["errors"].append({"row": index, "error": error})
+
+        if targets:
+            summary["accepted"] += len(targets)
+            summary["queued"] += await self.queue.enqueue(targets)
@@ -0,0 +1,207 @@
+# src/services/template_registry.py
+
+from src.models.campaign import CampaignTarget
+from src.models.message import MessageTemplate
+from src.config.constants import (
+    CampaignType,
+    ERROR_MESSAGES,
+    TEMPLATE_PARAMS,
+    TEMPLATE_PARAM_SOURCES,
+)
+from src.config import settings
+from src.utils.logging import get_logger
+from twilio.base.exceptions import TwilioRestException
+from typing import Any, Dict, List, Optional
+import asyncio
+import re
+
+logger = get_logger(__name__)
+
+CONTENT_SID = re.compile(r"HX[0-9a-fA-F]{32}")
+# Variable placeholders in content template text, e.g. {{1}} or {{name}}
+PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+def is_content_sid(value: Optional[str]) -> bool:
+    """Whether ``value`` is a Twilio content template SID"""
+    return bool(value) and CONTENT_SID.fullmatch(value) is not None
+
+class CompiledTemplate:
+    """A Twilio content template with its parameter lookups resolved
+
+    Built on the campaign type's MessageTemplate: ``name`` is the content
+    SID, ``parameters`` maps each template parameter to the target data
+    key it is read from. Sends only carry the SID and the variables; the
+    text is filled in from Twilio by ``TemplateRegistry.load``.
+    """
+
+    def __init__(self, campaign_type: str, template: MessageTemplate):
+        self.campaign_type = campaign_type
+        self.template = template
+        # Parameter -> content variable key; named until load() sees positional ones
+        self.variables = {param: param for param in template.parameters}
+
+    @property
+    def name(self) -> str:
+        return self.template.name
+
+    def parameters(self, target: CampaignTarget) -> Dict[str, Any]:
+        """Build content variables for a target"""
+        params = {}
+        for param, source in self.template.parameters.items():
+            value = target.name if param == "name" else target.data.get(source, "")
+            params[self.variables[param]] = value
+        return params
+
+    def check(self, content) -> None:
+        """Match the template against its Twilio content, raising ValueError on mismatch
+
+        Content variables are either named after the template parameters or
+        numbered in TEMPLATE_PARAMS order, as approved WhatsApp templates are.
+        """
+        bodies = _strings(content.types or {})
+        keys = set((content.variables or {}).keys())
+        for body in bodies:
+            keys.update(PLACEHOLDER.findall(body))
+
+        params = list(self.template.parameters)
+        if keys and all(key.isdigit() for key in keys):
+            variables = {param: str(index) for index, param in enumerate(params, start=1)}
+        else:
+            variables = {param: param for param in params}
+
+        if keys != set(variables.values()):
+            raise ValueError(
+                f"{ERROR_MESSAGES['missing_params']}: template uses {sorted(keys)}, "
+                f"campaign sends {sorted(variables.values())}"
+            )
+        if content.language and content.language != self.template.language_code:
+            raise ValueError(
+                f"Template language {content.language} does not match {self.template.language_code}"
+            )
+
+        self.variables = variables
+        self.template = self.template.model_copy(update={"content": bodies[0] if bodies else ""})
+
+class TemplateRegistry:
+    """Message templates compiled and checked once at startup
+
+    SIDs are checked locally when the registry is built; ``load`` then
+    checks each one against its content template in Twilio.
+    """
+
+    def __init__(self, templates: Optional[Dict[str, str]] = None):
+        templates = templates or settings.MESSAGE_CONTENT_SIDS
+        self.logger = logger
+        self._compiled: Dict[str, CompiledTemplate] = {}
+        self._ignored: set = set()
+
+        errors = []
+        for campaign_type in CampaignType:
+            try:
+                self._compiled[campaign_type.value] = self._compile(campaign_type.value, templates)
+            except ValueError as e:
+                errors.append(f"{campaign_type.value}: {e}")
+
+        if errors:
+            raise ValueError(f"Invalid message templates: {'; '.join(errors)}")
+
+    async def load(self, twilio, timeout: Optional[float] = None) -> None:
+        """Check every template against its Twilio content template
+
+        Unknown SIDs and parameter or language mismatches raise ValueError
+        so a misconfigured deploy fails at startup instead of on each send.
+        Templates that cannot be fetched are logged and left unchecked.
+        """
+        timeout = timeout or settings.STARTUP_PREWARM_TIMEOUT_SECONDS
+        compiled = list(self._compiled.values())
+        contents = await asyncio.gather(
+            *(
+                asyncio.wait_for(twilio.client.content.v1.contents(template.name).fetch_async(), timeout)
+                for template in compiled
+            ),
+            return_exceptions=True
+        )
+
+        errors = []
+        for template, content in zip(compiled, contents):
+            if isinstance(content, TwilioRestException) and content.status == 404:
+                errors.append(f"{template.campaign_type}: {ERROR_MESSAGES['template_not_found']}: {template.name}")
+                continue
+            if isinstance(content, Exception):
+                self.logger.warning(
+                    "template_check_skipped",
+                    campaign_type=template.campaign_type,
+                    template=template.name,
+                    error=str(content) or type(content).__name__
+                )
+                continue
+            try:
+                template.check(content)
+            except ValueError as e:
+                errors.append(f"{template.campaign_type}: {e}")
+
+        if errors:
+            raise ValueError(f"Invalid message templates: {'; '.join(errors)}")
+
+    def get(self, campaign_type: str) -> CompiledTemplate:
+        """Get the compiled template for a campaign type"""
+        compiled = self._compiled.get(CampaignType(campaign_type).value)
+        if compiled is None:
+            raise ValueError(ERROR_MESSAGES["template_not_found"])
+        return compiled
+
+    def render_batch(self, targets: List[CampaignTarget]) -> List[Dict[str, Any]]:
+        """Content variables for each target, in order"""
+        return [self.get(target.campaign_type).parameters(target) for target in targets]
+
+    def content_sid(self, campaign_type: str, override: Optional[str] = None) -> str:
+        """Content SID to send with, honouring a campaign's own template if it is a SID
+
+        Campaign settings may still hold template names from before content
+        templates; those would be rejected by Twilio on every send, so the
+        registry's SID for the campaign type is used instead.
+        """
+        if override and override != self.get(campaign_type).name:
+            if is_content_sid(override):
+                return override
+            if override not in self._ignored:
+                self._ignored.add(override)
+                self.logger.warning(
+                    "campaign_template_ignored",
+                    campaign_type=campaign_type,
+                    template=override,
+                    error=ERROR_MESSAGES["invalid_content_sid"]
+                )
+        return self.get(campaign_type).name
+
+    def _compile(self, campaign_type: str, templates: Dict[str, str]) -> CompiledTemplate:
+        if not templates.get(campaign_type):
+            raise ValueError(ERROR_MESSAGES["template_not_found"])
+        if not is_content_sid(templates[campaign_type]):
+            raise ValueError(f"{ERROR_MESSAGES['invalid_content_sid']}: {templates[campaign_type]!r}")
+        if campaign_type not in TEMPLATE_PARAMS:
+            raise ValueError(ERROR_MESSAGES["invalid_campaign"])
+
+        sources = {}
+        for param in TEMPLATE_PARAMS[campaign_type]:
+            if param == "name":
+                sources[param] = "name"
+                continue
+            if param not in TEMPLATE_PARAM_SOURCES:
+                raise ValueError(f"{ERROR_MESSAGES['missing_params']}: no source for {param}")
+            sources[param] = TEMPLATE_PARAM_SOURCES[param]
+
+        return CompiledTemplate(
+            campaign_type,
+            MessageTemplate(name=templates[campaign_type], content="", parameters=sources)
+        )
+
+def _strings(value: Any) -> List[str]:
+    # Text of a content template's types, e.g. {"twilio/text": {"body": "..."}}
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, list):
+        return [text for item in value for text in _strings(item)]
+    return []
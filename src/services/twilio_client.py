@@ -3,49 +3,129 @@
 from twilio.rest import Client
 from twilio.base.exceptions import TwilioRestException
 from src.config import settings
+from src.config.constants import CIRCUIT_OPEN_ERROR, SEND_UNKNOWN_STATUS, TWILIO_ERROR_CODES
 from src.models.message import Message
+from src.services.http_client import PooledTwilioHttpClient
+from src.services.rate_limiter import SendScheduler
+from src.services.resilience import AdaptiveLimiter, CircuitBreaker
 from src.utils.logging import get_logger
+from src.utils.metrics import IN_FLIGHT, TWILIO_ERRORS
+from src.utils.tracing import mark_error, record_span, set_attributes, stage
 from typing import Dict, Optional
+import httpx
+import json
+import time
 
 logger = get_logger(__name__)
 
+def classify_error(error_code) -> str:
+    """Classify a Twilio error code as rate_limited, permanent, unavailable or transient"""
+    if error_code == CIRCUIT_OPEN_ERROR:
+        return "unavailable"
+    if error_code in TWILIO_ERROR_CODES["rate_limited"]:
+        return "rate_limited"
+    if error_code in TWILIO_ERROR_CODES["permanent"]:
+        return "permanent"
+    if isinstance(error_code, int) and 21000 <= error_code < 22000:
+        return "permanent"
+    return "transient"
+
+def is_overload(error: Exception) -> bool:
+    """Whether a send error means Twilio is throttling or degraded"""
+    if isinstance(error, TwilioRestException):
+        return (
+            error.status == 429
+            or error.status >= 500
+            or classify_error(error.code) == "rate_limited"
+        )
+    return isinstance(error, httpx.TransportError)
+
+def never_sent(error: Exception) -> bool:
+    """Whether a send error shows the request never left for Twilio
+
+    Read and write timeouts or dropped connections can happen after Twilio
+    accepted the message, so only connection and pool failures qualify.
+    """
+    return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+def circuit_open_result(queue_wait_ms: float = 0.0) -> Dict:
+    """Send result for a message refused while the circuit is open"""
+    return {
+        "message_id": None,
+        "status": "failed",
+        "error_code": CIRCUIT_OPEN_ERROR,
+        "error_message": "Twilio circuit breaker is open",
+        "queue_wait_ms": queue_wait_ms
+    }
+
 class TwilioClient:
     def __init__(self):
+        self.http_client = PooledTwilioHttpClient()
         self.client = Client(
             settings.TWILIO_ACCOUNT_SID,
-            settings.TWILIO_AUTH_TOKEN
+            settings.TWILIO_AUTH_TOKEN,
+            http_client=self.http_client
         )
+        self.scheduler = SendScheduler()
+        self.limiter = AdaptiveLimiter()
+        self.breaker = CircuitBreaker("twilio_send")
         self.logger = logger
 
+    async def close(self):
+        """Release pooled HTTP connections"""
+        await self.http_client.close()
+
     async def send_message(self, message: Message) -> Dict:
         """Send WhatsApp message using Twilio"""
+        from_number = message.from_number or settings.TWILIO_FROM_NUMBER
+        content_variables = json.dumps(message.parameters)
+        queued = time.perf_counter()
+        await self.scheduler.acquire(settings.TWILIO_ACCOUNT_SID, from_number)
+        await self.limiter.acquire()
+        queue_wait_ms = round((time.perf_counter() - queued) * 1000, 2)
+        record_span("twilio_queue_wait", queued, from_number=from_number)
+
+        # Checked after queueing so waiters see a circuit that opened meanwhile
+        if not self.breaker.allow():
+            self.limiter.release()
+            return circuit_open_result(queue_wait_ms)
+
+        started = time.perf_counter()
+        overloaded = False
         try:
             self.logger.info(
                 "sending_whatsapp_message",
                 user_id=message.user_id,
                 phone=message.phone_number,
-                template=message.template_name
-            )
-
-            response = self.client.messages.create(
-                from_=f'whatsapp:{message.from_number}',
-                to=f'whatsapp:{message.phone_number}',
                 template=message.template_name,
-                language=message.language_code,
-                components=[{
-                    "type": "body",
-                    "parameters": message.parameters
-                }]
+                queue_wait_ms=queue_wait_ms
             )
 
+            IN_FLIGHT.inc("twilio_send")
+            try:
+                with stage("twilio_send", kind="client", from_number=from_number, template=message.template_name):
+                    response = await self.client.messages.create_async(
+                        from_=f'whatsapp:{from_number}',
+                        to=f'whatsapp:{message.phone_number}',
+                        content_sid=message.template_name,
+                        content_variables=content_variables
+                    )
+                    set_attributes(message_id=response.sid, status=response.status)
+            finally:
+                IN_FLIGHT.dec("twilio_send")
+
             return {
                 "message_id": response.sid,
                 "status": response.status,
                 "error_code": None,
-                "error_message": None
+                "error_message": None,
+                "queue_wait_ms": queue_wait_ms
             }
 
         except TwilioRestException as e:
+            overloaded = is_overload(e)
+            TWILIO_ERRORS.inc(str(e.code))
+            mark_error(f"Twilio error {e.code}")
             self.logger.error(
                 "twilio_send_error",
                 error=str(e),
@@ -56,31 +136,49 @@ class TwilioClient:
                 "message_id": None,
                 "status": "failed",
                 "error_code": e.code,
-                "error_message": str(e)
+                "error_message": str(e),
+                "queue_wait_ms": queue_wait_ms
             }
         except Exception as e:
+            overloaded = is_overload(e)
             self.logger.error(
                 "unexpected_send_error",
                 error=str(e),
                 user_id=message.user_id
             )
-            raise
+            if never_sent(e):
+                raise
+            # Twilio may have created the message, so it must not be sent again
+            mark_error(f"Send outcome unknown: {type(e).__name__}")
+            return {
+                "message_id": None,
+                "status": SEND_UNKNOWN_STATUS,
+                "error_code": None,
+                "error_message": str(e),
+                "queue_wait_ms": queue_wait_ms
+            }
+        finally:
+            self.limiter.release(time.perf_counter() - started, overloaded)
+            self.breaker.record(not overloaded)
 
     async def verify_number(self, phone_number: str) -> Dict:
         """Start WhatsApp number verification process"""
         try:
-            verification = self.client.verify.v2.services(
-                settings.TWILIO_VERIFY_SERVICE_SID
-            ).verifications.create(
-                to=f'whatsapp:{phone_number}',
-                channel='whatsapp'
-            )
+            with stage("twilio_verify", kind="client"):
+                verification = await self.client.verify.v2.services(
+                    settings.TWILIO_VERIFY_SERVICE_SID
+                ).verifications.create_async(
+                    to=f'whatsapp:{phone_number}',
+                    channel='whatsapp'
+                )
             
             return {
+                "sid": verification.sid,
                 "status": verification.status,
                 "valid": True
             }
         except TwilioRestException as e:
+            TWILIO_ERRORS.inc(str(e.code))
             self.logger.error("verification_error", error=str(e))
             return {
                 "status": "failed",
@@ -91,14 +189,16 @@ class TwilioClient:
     async def check_verification(self, phone_number: str, code: str) -> bool:
         """Check verification code"""
         try:
-            verification_check = self.client.verify.v2.services(
-                settings.TWILIO_VERIFY_SERVICE_SID
-            ).verification_checks.create(
-                to=f'whatsapp:{phone_number}',
-                code=code
-            )
+            with stage("twilio_verification_check", kind="client"):
+                verification_check = await self.client.verify.v2.services(
+                    settings.TWILIO_VERIFY_SERVICE_SID
+                ).verification_checks.create_async(
+                    to=f'whatsapp:{phone_number}',
+                    code=code
+                )
             
             return verification_check.status == "approved"
         except TwilioRestException as e:
+            TWILIO_ERRORS.inc(str(e.code))
             self.logger.error("verification_check_error", error=str(e))
             return False
\ No newline at end of file
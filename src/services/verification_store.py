@@ -0,0 +1,223 @@
+# src/services/verification_store.py
+
+from src.services.twilio_client import TwilioClient
+from src.config import settings
+from src.utils.logging import get_logger
+from src.utils.metrics import VERIFICATIONS
+from google.cloud import firestore
+from collections import OrderedDict, deque
+from functools import partial
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+import asyncio
+import time
+
+logger = get_logger(__name__)
+
+PhoneKey = Tuple[str, str]
+
+class VerificationStore:
+    """Business phone verification state in front of the Twilio Verify API
+
+    Verification state lives on users/{user_id}/business_phones/{phone} and
+    is cached in a TTL LRU, so verified numbers are answered without Twilio.
+    Concurrent requests for the same number share one Verify call, repeated
+    starts within the resend interval reuse the pending verification, and
+    attempts per number are capped over a sliding window.
+    """
+
+    def __init__(
+        self,
+        db,
+        twilio: TwilioClient,
+        max_size: Optional[int] = None,
+        ttl_seconds: Optional[float] = None
+    ):
+        self.db = db
+        self.twilio = twilio
+        self.max_size = max_size or settings.VERIFICATION_CACHE_SIZE
+        self.ttl = ttl_seconds or settings.VERIFICATION_CACHE_TTL_SECONDS
+        self.logger = logger
+
+        # key -> (expires_at, state document or None)
+        self._entries: "OrderedDict[PhoneKey, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self._loading: Dict[PhoneKey, asyncio.Future] = {}
+        self._pending: Dict[Tuple, asyncio.Future] = {}
+        # (action, phone number) -> recent attempt times
+        self._attempts: Dict[Tuple[str, str], Deque[float]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.verify_calls = 0
+        self.check_calls = 0
+        self.rate_limited = 0
+
+    async def start(self, user_id: str, phone_number: str) -> Dict[str, Any]:
+        """Send a verification code unless the number is verified or one was just sent"""
+        key = (user_id, phone_number)
+        state = await self._state(key)
+
+        if state and state.get("is_verified"):
+            VERIFICATIONS.inc("start", "already_verified")
+            return {"status": "approved", "valid": True, "already_verified": True}
+
+        if state and state.get("last_sent_at", 0) + settings.VERIFICATION_RESEND_SECONDS > time.time():
+            VERIFICATIONS.inc("start", "reused")
+            return {"status": "pending", "valid": True, "reused": True}
+
+        return await self._coalesce(("start", *key), partial(self._send, key))
+
+    async def check(self, user_id: str, phone_number: str, code: str) -> Dict[str, Any]:
+        """Check a verification code, recording the number as verified on approval"""
+        key = (user_id, phone_number)
+        state = await self._state(key)
+
+        if state and state.get("is_verified"):
+            VERIFICATIONS.inc("check", "already_verified")
+            return {"verified": True}
+
+        return await self._coalesce(("check", *key, code), partial(self._check, key, code))
+
+    def invalidate(self, user_id: str, phone_number: str) -> None:
+        """Drop cached state for a number"""
+        self._entries.pop((user_id, phone_number), None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache and Verify API counters for monitoring"""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "verify_calls": self.verify_calls,
+            "check_calls": self.check_calls,
+            "rate_limited": self.rate_limited
+        }
+
+    def _document(self, key: PhoneKey):
+        user_id, phone_number = key
+        return (
+            self.db.collection("users")
+            .document(user_id)
+            .collection("business_phones")
+            .document(phone_number)
+        )
+
+    async def _state(self, key: PhoneKey) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        future = self._loading.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._read(key))
+            self._loading[key] = future
+            future.add_done_callback(partial(self._loaded, key))
+        return await asyncio.shield(future)
+
+    async def _read(self, key: PhoneKey) -> Optional[Dict[str, Any]]:
+        doc = await self._document(key).get()
+        return doc.to_dict() if doc.exists else None
+
+    def _loaded(self, key: PhoneKey, future: asyncio.Future) -> None:
+        if self._loading.get(key) is future:
+            del self._loading[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        # A write may have cached newer state while the read was in flight
+        if key not in self._entries:
+            self._remember(key, future.result())
+
+    def _remember(self, key: PhoneKey, state: Optional[Dict[str, Any]]) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, state)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def _coalesce(self, key: Tuple, call: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.ensure_future(call())
+            self._pending[key] = future
+            future.add_done_callback(lambda done: self._pending.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    def _allow(self, action: str, phone_number: str) -> Optional[float]:
+        """Count an attempt, returning seconds to wait if the number is over its limit"""
+        now = time.monotonic()
+        window = settings.VERIFICATION_ATTEMPT_WINDOW_SECONDS
+        attempts = self._attempts.setdefault((action, phone_number), deque())
+        while attempts and attempts[0] <= now - window:
+            attempts.popleft()
+
+        if len(attempts) >= settings.VERIFICATION_MAX_ATTEMPTS:
+            self.rate_limited += 1
+            return attempts[0] + window - now
+
+        attempts.append(now)
+        # Drop idle numbers so the map does not grow without bound
+        if len(self._attempts) > self.max_size:
+            for stale in [k for k, v in self._attempts.items() if v and v[-1] <= now - window]:
+                del self._attempts[stale]
+        return None
+
+    async def _send(self, key: PhoneKey) -> Dict[str, Any]:
+        user_id, phone_number = key
+        retry_after = self._allow("start", phone_number)
+        if retry_after is not None:
+            VERIFICATIONS.inc("start", "rate_limited")
+            return {"status": "rate_limited", "valid": False, "retry_after": round(retry_after, 1)}
+
+        self.verify_calls += 1
+        result = await self.twilio.verify_number(phone_number)
+        VERIFICATIONS.inc("start", result["status"])
+        if not result["valid"]:
+            return result
+
+        state = {
+            "user_id": user_id,
+            "phone_number": phone_number,
+            "is_verified": False,
+            "twilio_sid": result.get("sid"),
+            "last_sent_at": time.time()
+        }
+        self._remember(key, state)
+        await self._document(key).set({
+            **state,
+            "updated_at": firestore.SERVER_TIMESTAMP
+        }, merge=True)
+        return result
+
+    async def _check(self, key: PhoneKey, code: str) -> Dict[str, Any]:
+        user_id, phone_number = key
+        retry_after = self._allow("check", phone_number)
+        if retry_after is not None:
+            VERIFICATIONS.inc("check", "rate_limited")
+            return {"verified": False, "status": "rate_limited", "retry_after": round(retry_after, 1)}
+
+        self.check_calls += 1
+        approved = await self.twilio.check_verification(phone_number, code)
+        VERIFICATIONS.inc("check", "approved" if approved else "rejected")
+        if not approved:
+            return {"verified": False}
+
+        state = {
+            **(self._entries.get(key, (0.0, None))[1] or {}),
+            "user_id": user_id,
+            "phone_number": phone_number,
+            "is_verified": True
+        }
+        self._remember(key, state)
+        self._attempts.pop(("start", phone_number), None)
+        self._attempts.pop(("check", phone_number), None)
+        await self._document(key).set({
+            **state,
+            "updated_at": firestore.SERVER_TIMESTAMP
+        }, merge=True)
+        self.logger.info("business_phone_verified", user_id=user_id, phone=phone_number)
+        return {"verified": True}
@@ -0,0 +1,537 @@
+# src/services/work_queue.py
+
+from src.models.campaign import CampaignTarget
+from src.config.constants import CAMPAIGN_PRIORITY, QUEUE_CONFIG, RETRY_BACKOFF_SECONDS, CampaignType
+from src.config import settings
+from src.services.twilio_client import classify_error
+from src.services.fair_queue import FairScheduler
+from src.utils.logging import get_logger
+from src.utils.tracing import extract_context, inject_context, span
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+import asyncio
+import random
+import sqlite3
+import threading
+import time
+import zlib
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_key TEXT NOT NULL UNIQUE,
+    user_id TEXT NOT NULL,
+    shard INTEGER NOT NULL DEFAULT 0,
+    priority INTEGER NOT NULL DEFAULT 0,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    enqueued_at REAL NOT NULL,
+    last_error TEXT,
+    trace_context TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_available_at ON jobs (available_at);
+CREATE TABLE IF NOT EXISTS dead_letters (
+    id INTEGER PRIMARY KEY,
+    job_key TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    error_class TEXT NOT NULL,
+    last_error TEXT,
+    enqueued_at REAL NOT NULL,
+    failed_at REAL NOT NULL
+);
+"""
+
+def tenant_shard(user_id: str) -> int:
+    """Stable hash of a tenant, taken modulo the shard count by dispatchers"""
+    return zlib.crc32(user_id.encode())
+
+@dataclass
+class Job:
+    id: int
+    job_key: str
+    user_id: str
+    payload: str
+    attempts: int
+    enqueued_at: float
+    trace_context: Optional[str] = None
+
+class WorkQueue:
+    """Persistent SQLite (WAL) queue of campaign targets
+
+    Claimed jobs are leased by pushing ``available_at`` forward, so work held
+    by a crashed process becomes visible again once the lease expires.
+    With ``shard=(index, count)`` only jobs of tenants hashing to ``index``
+    are claimed, so several dispatcher processes can share one database.
+    ``work_available`` is set when this process enqueues due jobs; jobs
+    enqueued by other processes are found by polling.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        lease_seconds: Optional[float] = None,
+        shard: Optional[Tuple[int, int]] = None
+    ):
+        self.path = path or settings.QUEUE_DB_PATH
+        self.lease_seconds = lease_seconds or settings.QUEUE_LEASE_SECONDS
+        self.shard = shard
+        self.logger = logger
+        self.work_available = asyncio.Event()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            isolation_level=None,
+            timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+
+    async def enqueue(
+        self,
+        targets: List[CampaignTarget],
+        delay: float = 0,
+        available_at: Optional[List[float]] = None
+    ) -> int:
+        """Persist targets for processing, ignoring ones already queued
+
+        ``available_at`` optionally gives each target its own epoch due time.
+        """
+        now = time.time()
+        # The enqueuing request's trace continues when the job is processed
+        trace_context = inject_context()
+        if available_at is None:
+            available_at = [now + delay] * len(targets)
+        rows = [
+            (
+                target.key,
+                target.user_id,
+                tenant_shard(target.user_id),
+                CAMPAIGN_PRIORITY.get(CampaignType(target.campaign_type).value, 0),
+                target.model_dump_json(),
+                due,
+                now,
+                trace_context
+            )
+            for target, due in zip(targets, available_at)
+        ]
+        count = await asyncio.to_thread(self._execute_many, """
+            INSERT OR IGNORE INTO jobs (
+                job_key, user_id, shard, priority, payload, available_at, enqueued_at, trace_context
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        if count and min(available_at) <= now:
+            self.work_available.set()
+        return count
+
+    async def ready_by_tenant(self, limit: int) -> Dict[str, Tuple[int, float]]:
+        """Due jobs per tenant in this shard, capped at ``limit``, with the oldest due time
+
+        Tenants are walked through the index one at a time and each count
+        stops at ``limit``, so the cost follows the number of tenants rather
+        than the size of the backlog.
+        """
+        return await asyncio.to_thread(self._ready_by_tenant, time.time(), limit)
+
+    async def tenant_depth(self, user_id: str, limit: int) -> int:
+        """Jobs queued for a tenant, due or not, counting at most ``limit``"""
+        rows = await asyncio.to_thread(self._fetch, """
+            SELECT COUNT(*) FROM (SELECT 1 FROM jobs WHERE user_id = ? LIMIT ?)
+        """, (user_id, limit))
+        return rows[0][0]
+
+    async def tenant_counts(self, user_ids: List[str]) -> Dict[str, Tuple[int, int]]:
+        """Due and total queued jobs per tenant, uncapped, for monitoring"""
+        if not user_ids:
+            return {}
+        rows = await asyncio.to_thread(self._fetch, f"""
+            SELECT user_id, COALESCE(SUM(available_at <= ?), 0), COUNT(*) FROM jobs
+            WHERE user_id IN ({", ".join("?" * len(user_ids))})
+            GROUP BY user_id
+        """, (time.time(), *user_ids))
+        return {user_id: (ready, queued) for user_id, ready, queued in rows}
+
+    async def claim_tenants(self, plan: Dict[str, int]) -> List[Job]:
+        """Lease up to ``plan[user_id]`` due jobs of each tenant, highest priority first"""
+        if not plan:
+            return []
+        rows = await asyncio.to_thread(self._claim_tenants, plan)
+        return [Job(*row) for row in rows]
+
+    async def ack(self, job: Job) -> None:
+        """Remove a completed job"""
+        await asyncio.to_thread(self._execute, "DELETE FROM jobs WHERE id = ?", (job.id,))
+
+    async def retry(
+        self,
+        job: Job,
+        delay: float,
+        error: Optional[str] = None,
+        refund_attempt: bool = False
+    ) -> None:
+        """Make a job visible again after ``delay`` seconds
+
+        ``refund_attempt`` gives back the attempt taken by the claim, for
+        jobs that were deferred without being tried.
+        """
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE jobs SET available_at = ?, last_error = ?, attempts = attempts - ? WHERE id = ?",
+            (time.time() + delay, error, int(refund_attempt), job.id)
+        )
+
+    async def dead_letter(self, job: Job, error_class: str, error: Optional[str] = None) -> None:
+        """Move a job that will not be retried to the dead-letter table"""
+        await asyncio.to_thread(self._dead_letter, job, error_class, error)
+
+    async def stats(self) -> Dict[str, Any]:
+        """Queue depth and age for monitoring"""
+        return await asyncio.to_thread(self._stats)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _migrate(self) -> None:
+        # Queues created by older versions lack the shard, priority and trace
+        # columns and the per-tenant indexes
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "shard" not in columns:
+                self._conn.create_function("tenant_shard", 1, tenant_shard, deterministic=True)
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN shard INTEGER NOT NULL DEFAULT 0")
+                self._conn.execute("UPDATE jobs SET shard = tenant_shard(user_id)")
+            if "priority" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN priority INTEGER NOT NULL DEFAULT 0")
+            if "trace_context" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN trace_context TEXT")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_tenant_ready ON jobs (user_id, priority, available_at)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_tenant_due ON jobs (user_id, available_at)"
+            )
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _execute(self, sql: str, params=()) -> int:
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    def _execute_many(self, sql: str, rows) -> int:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                count = self._conn.executemany(sql, rows).rowcount
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return count
+
+    def _fetch(self, sql: str, params=()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _ready_by_tenant(self, now: float, limit: int) -> Dict[str, Tuple[int, float]]:
+        index, count = self.shard or (0, 1)
+        ready = {}
+        with self._lock:
+            tenants = self._conn.execute("""
+                WITH RECURSIVE tenants(user_id) AS (
+                    SELECT MIN(user_id) FROM jobs
+                    UNION ALL
+                    SELECT (SELECT MIN(user_id) FROM jobs WHERE user_id > tenants.user_id)
+                    FROM tenants WHERE tenants.user_id IS NOT NULL
+                )
+                SELECT user_id FROM tenants WHERE user_id IS NOT NULL
+            """).fetchall()
+            for (user_id,) in tenants:
+                if tenant_shard(user_id) % count != index:
+                    continue
+                due, oldest = self._conn.execute("""
+                    SELECT COUNT(*), MIN(available_at) FROM (
+                        SELECT available_at FROM jobs
+                        WHERE user_id = ? AND available_at <= ?
+                        ORDER BY available_at LIMIT ?
+                    )
+                """, (user_id, now, limit)).fetchone()
+                if due:
+                    ready[user_id] = (due, oldest)
+        return ready
+
+    def _claim_tenants(self, plan: Dict[str, int]) -> list:
+        now = time.time()
+        rows = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for user_id, limit in plan.items():
+                    rows.extend(self._conn.execute("""
+                        UPDATE jobs SET available_at = ?, attempts = attempts + 1
+                        WHERE id IN (
+                            SELECT id FROM jobs WHERE user_id = ? AND available_at <= ?
+                            ORDER BY priority, available_at LIMIT ?
+                        )
+                        RETURNING id, job_key, user_id, payload, attempts, enqueued_at, trace_context
+                    """, (now + self.lease_seconds, user_id, now, limit)).fetchall())
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return rows
+
+    def _dead_letter(self, job: Job, error_class: str, error: Optional[str]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("""
+                    INSERT INTO dead_letters (
+                        job_key, user_id, payload, attempts, error_class,
+                        last_error, enqueued_at, failed_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    job.job_key, job.user_id, job.payload, job.attempts,
+                    error_class, error, job.enqueued_at, time.time()
+                ))
+                self._conn.execute("DELETE FROM jobs WHERE id = ?", (job.id,))
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            depth, ready, oldest = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(available_at <= ?), 0), MIN(enqueued_at) FROM jobs",
+                (now,)
+            ).fetchone()
+            dead_letters = self._conn.execute("SELECT COUNT(*) FROM dead_letters").fetchone()[0]
+
+        return {
+            "depth": depth,
+            "ready": ready,
+            "oldest_age_seconds": round(now - oldest, 3) if oldest else 0.0,
+            "dead_letters": dead_letters
+        }
+
+class QueueWorker:
+    """Drain the work queue in batches with bounded concurrency
+
+    Each batch is split across tenants by a FairScheduler, so one tenant's
+    backlog cannot hold up everyone else's due messages.
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        processor,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        send_window=None
+    ):
+        self.queue = queue
+        self.processor = processor
+        # Retries are held to the campaign's send window when given
+        self.send_window = send_window
+        self.concurrency = concurrency or settings.QUEUE_WORKERS
+        self.batch_size = batch_size or QUEUE_CONFIG["max_batch_size"]
+        self.max_attempts = QUEUE_CONFIG["retry_attempts"]
+        self.poll_interval = settings.QUEUE_POLL_INTERVAL_SECONDS
+        self.fairness = FairScheduler()
+        self.logger = logger
+        self._stopping = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop claiming jobs and wait for in-flight ones to finish"""
+        self._stopping.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    async def _run(self) -> None:
+        # Refill in batches once at least half of a batch worth of slots is free
+        low_water = max(1, min(self.batch_size, self.concurrency) // 2)
+
+        while not self._stopping.is_set():
+            # Leave jobs queued while sends are being refused
+            if not self.processor.twilio.breaker.ready():
+                await self._wait_for_slot(self.poll_interval)
+                continue
+
+            capacity = self.concurrency - len(self._in_flight)
+            if capacity < low_water:
+                await self._wait_for_slot(None)
+                continue
+
+            # Cleared before looking so jobs enqueued meanwhile wake the next wait
+            self.queue.work_available.clear()
+            try:
+                # A tenant never gets more than a batch, so deeper counts are not needed
+                ready = await self.queue.ready_by_tenant(self.batch_size)
+                plan = self.fairness.plan(ready, min(capacity, self.batch_size))
+                jobs = await self.queue.claim_tenants(plan)
+            except Exception as e:
+                self.logger.error("queue_claim_error", error=str(e))
+                jobs = []
+
+            if not jobs:
+                await self._wait_for_slot(self.poll_interval, wake_on_enqueue=True)
+                continue
+
+            for job, target, parameters in self._prepare(jobs):
+                task = asyncio.create_task(self._process(job, target, parameters))
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def _wait_for_slot(self, timeout: Optional[float], wake_on_enqueue: bool = False) -> None:
+        """Wait for a job to finish, the worker to stop or ``timeout``
+
+        With ``wake_on_enqueue`` a local enqueue of due jobs ends the wait
+        too, so new work does not sit until the next poll.
+        """
+        waiters = [asyncio.ensure_future(self._stopping.wait())]
+        if wake_on_enqueue:
+            waiters.append(asyncio.ensure_future(self.queue.work_available.wait()))
+        try:
+            await asyncio.wait(
+                [*self._in_flight, *waiters],
+                timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    def _prepare(self, jobs: List[Job]) -> List[Tuple[Job, Optional[CampaignTarget], Optional[Dict]]]:
+        """Decode a claimed batch and render its template parameters in one pass
+
+        Jobs that fail to decode, or a batch that fails to render, are left
+        for _handle to decode and render one by one.
+        """
+        targets: Dict[str, CampaignTarget] = {}
+        for job in jobs:
+            try:
+                targets[job.job_key] = CampaignTarget.model_validate_json(job.payload)
+            except Exception as e:
+                self.logger.error("job_decode_error", error=str(e), job_key=job.job_key)
+
+        try:
+            rendered = dict(zip(targets, self.processor.render(list(targets.values()))))
+        except Exception as e:
+            self.logger.error("batch_render_error", error=str(e), jobs=len(targets))
+            rendered = {}
+
+        return [(job, targets.get(job.job_key), rendered.get(job.job_key)) for job in jobs]
+
+    async def _process(
+        self,
+        job: Job,
+        target: Optional[CampaignTarget] = None,
+        parameters: Optional[Dict] = None
+    ) -> None:
+        with span(
+            "queue_job",
+            parent=extract_context(job.trace_context),
+            kind="consumer",
+            job_key=job.job_key,
+            attempts=job.attempts
+        ):
+            await self._handle(job, target, parameters)
+
+    async def _handle(
+        self,
+        job: Job,
+        target: Optional[CampaignTarget] = None,
+        parameters: Optional[Dict] = None
+    ) -> None:
+        error = None
+        try:
+            target = target or CampaignTarget.model_validate_json(job.payload)
+            result = await self.processor.process_target(
+                target,
+                attempt_count=job.attempts,
+                parameters=parameters
+            )
+        except Exception as e:
+            result = None
+            error = str(e)
+
+        try:
+            if result is not None and result.get("status") != "failed":
+                await self.queue.ack(job)
+                return
+
+            if result is not None:
+                error_class = classify_error(result.get("error_code"))
+                error = result.get("error_message")
+            else:
+                error_class = "transient"
+
+            if error_class == "unavailable":
+                # Deferred without being sent, so the attempt is given back
+                delay = await self._retry_delay(target, self._backoff(error_class, 1))
+                await self.queue.retry(job, delay, error, refund_attempt=True)
+                return
+
+            if error_class == "permanent" or job.attempts >= self.max_attempts:
+                await self.queue.dead_letter(job, error_class, error)
+                self.logger.error(
+                    "job_dead_lettered",
+                    job_key=job.job_key,
+                    attempts=job.attempts,
+                    error_class=error_class,
+                    error=error
+                )
+                return
+
+            delay = await self._retry_delay(target, self._backoff(error_class, job.attempts))
+            await self.queue.retry(job, delay, error)
+            self.logger.info(
+                "job_retry_scheduled",
+                job_key=job.job_key,
+                attempts=job.attempts,
+                error_class=error_class,
+                delay_seconds=round(delay, 1)
+            )
+        except Exception as e:
+            # The lease expires and the job is retried if this fails
+            self.logger.error("queue_update_error", error=str(e), job_key=job.job_key)
+
+    async def _retry_delay(self, target: Optional[CampaignTarget], delay: float) -> float:
+        if self.send_window is None or target is None:
+            return delay
+        try:
+            return await self.send_window.retry_delay(target, delay)
+        except Exception as e:
+            self.logger.error("retry_window_error", error=str(e), target_id=target.id)
+            return delay
+
+    def _backoff(self, error_class: str, attempts: int) -> float:
+        base = RETRY_BACKOFF_SECONDS.get(error_class, QUEUE_CONFIG["backoff_seconds"])
+        delay = base * 2 ** (attempts - 1)
+        return delay * random.uniform(0.9, 1.1)
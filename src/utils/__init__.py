@@ -1,5 +1,12 @@
 # src/utils/__init__.py
 
 from .logging import setup_logging, get_logger, RequestContextMiddleware
+from .metrics import MetricsMiddleware, REGISTRY
 
-__all__ = ["setup_logging", "get_logger", "RequestContextMiddleware"]
\ No newline at end of file
+__all__ = [
+    "setup_logging",
+    "get_logger",
+    "RequestContextMiddleware",
+    "MetricsMiddleware",
+    "REGISTRY"
+]
\ No newline at end of file
@@ -1,18 +1,28 @@
 # src/utils/helpers.py
 
-from datetime import datetime
+from datetime import datetime, tzinfo
+from functools import lru_cache
+from src.config.constants import BRAZIL_TIMEZONE
 import pytz
-from typing import Optional
+import re
+from typing import Iterable, List, Optional
+
+_NON_DIGITS = re.compile(r"\D")
+
+@lru_cache(maxsize=None)
+def get_timezone(name: str = BRAZIL_TIMEZONE) -> tzinfo:
+    """Get a timezone, loading its zoneinfo data only once"""
+    return pytz.timezone(name)
 
 def get_brazil_time() -> datetime:
     """Get current time in Brazil timezone"""
-    brazil_tz = pytz.timezone("America/Sao_Paulo")
-    return datetime.now(brazil_tz)
+    return datetime.now(get_timezone(BRAZIL_TIMEZONE))
 
-def format_phone_number(phone: str) -> str:
-    """Format phone number to WhatsApp format"""
+@lru_cache(maxsize=65536)
+def _normalize_phone(phone: str) -> Optional[str]:
+    """Apply WhatsApp formatting rules, returning None if the number is invalid"""
     # Remove non-numeric characters
-    cleaned = ''.join(filter(str.isdigit, phone))
+    cleaned = _NON_DIGITS.sub("", phone)
     
     # Add country code if needed
     if len(cleaned) == 11:  # Brazilian number with DDD
@@ -22,7 +32,21 @@ def format_phone_number(phone: str) -> str:
     elif len(cleaned) >= 12:  # Already has country code
         return cleaned
     
-    raise ValueError(f"Invalid phone number format: {phone}")
+    return None
+
+def format_phone_number(phone: str) -> str:
+    """Format phone number to WhatsApp format"""
+    formatted = _normalize_phone(phone)
+    if formatted is None:
+        raise ValueError(f"Invalid phone number format: {phone}")
+    return formatted
+
+def normalize_phone_numbers(phones: Iterable[str]) -> List[Optional[str]]:
+    """Format a batch of phone numbers, with None for invalid ones
+
+    Repeated numbers are served from a memoized cache.
+    """
+    return [_normalize_phone(phone) for phone in phones]
 
 def parse_template_vars(template: str, variables: dict) -> str:
     """Parse template variables into string"""
@@ -1,30 +1,105 @@
 # src/utils/logging.py
 
 import structlog
+import atexit
 import logging
+import logging.handlers
+import queue
+import random
 import sys
-from typing import Optional
+from typing import Dict, Optional
 
-def setup_logging(log_level: Optional[str] = None) -> None:
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# Levels that are always logged, whatever the sampling rate
+UNSAMPLED_LEVELS = {"warning", "warn", "error", "exception", "critical", "fatal"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def _orjson_dumps(event_dict, **kwargs) -> str:
+    return orjson.dumps(event_dict, option=orjson.OPT_NON_STR_KEYS, **kwargs).decode()
+
+def sample_events(rates: Dict[str, float]):
+    """Build a processor that keeps only a fraction of selected events
+
+    Warnings and errors are never dropped.
+    """
+    def processor(logger, method_name, event_dict):
+        rate = rates.get(event_dict.get("event"))
+        if rate is None or rate >= 1 or method_name in UNSAMPLED_LEVELS:
+            return event_dict
+        if random.random() >= rate:
+            raise structlog.DropEvent
+        return event_dict
+
+    return processor
+
+def _stop_listener() -> None:
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+# Flush queued records on interpreter exit
+atexit.register(_stop_listener)
+
+def _configure_handlers(level: int, async_emit: bool) -> None:
+    global _listener
+
+    _stop_listener()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    handler: logging.Handler = stream_handler
+    if async_emit:
+        # Records are written to stdout by a background thread
+        handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        _listener = logging.handlers.QueueListener(handler.queue, stream_handler)
+        _listener.start()
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+def setup_logging(
+    log_level: Optional[str] = None,
+    fast_json: bool = False,
+    async_emit: bool = False,
+    sample_rates: Optional[Dict[str, float]] = None
+) -> None:
     """Configure structured logging for the application"""
     
     # Set log level
     level = getattr(logging, log_level or "INFO")
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=level,
-    )
+    _configure_handlers(level, async_emit)
+
+    # Per-request client logs would otherwise fire on every Twilio send
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    processors = [structlog.stdlib.filter_by_level]
+    if sample_rates:
+        processors.append(sample_events(sample_rates))
+
+    if fast_json and orjson is not None:
+        renderer = structlog.processors.JSONRenderer(serializer=_orjson_dumps)
+    else:
+        renderer = structlog.processors.JSONRenderer()
 
     # Configure structlog
     structlog.configure(
-        processors=[
-            structlog.stdlib.filter_by_level,
+        processors=processors + [
             structlog.contextvars.merge_contextvars,
             structlog.processors.TimeStamper(fmt="iso"),
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
-            structlog.processors.JSONRenderer()
+            renderer
         ],
         wrapper_class=structlog.stdlib.BoundLogger,
         logger_factory=structlog.stdlib.LoggerFactory(),
@@ -50,11 +125,14 @@ class RequestContextMiddleware:
         method = scope.get("method", "")
         path = scope.get("path", "")
         
+        # ASGI headers are a list of (name, value) byte pairs
+        headers = dict(scope.get("headers") or [])
+
         # Bind context
         with structlog.contextvars.bound_contextvars(
             http_method=method,
             path=path,
-            request_id=scope.get("headers", {}).get("x-request-id", [""])[0].decode()
+            request_id=headers.get(b"x-request-id", b"").decode()
         ):
             try:
                 response = await self.app(scope, receive, send)
@@ -0,0 +1,256 @@
+# src/utils/metrics.py
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+import time
+
+# Metric updates run on the event loop thread, so plain dict and list
+# operations are safe without locks
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metric(ABC):
+    """Named metric rendered with its HELP and TYPE lines"""
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Sample lines in the Prometheus text format"""
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.samples()
+        ]
+
+class Counter(Metric):
+    """Monotonically increasing count per label set"""
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        super().__init__(name, description, labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1.0) -> None:
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {value}"
+            for key, value in self._values.items()
+        ]
+
+class Gauge(Metric):
+    """Current value per label set"""
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        super().__init__(name, description, labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def set(self, value: float, *label_values) -> None:
+        self._values[label_values] = value
+
+    def inc(self, *label_values, amount: float = 1.0) -> None:
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def dec(self, *label_values, amount: float = 1.0) -> None:
+        self._values[label_values] = self._values.get(label_values, 0.0) - amount
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {value}"
+            for key, value in self._values.items()
+        ]
+
+class Histogram(Metric):
+    """Bucketed observations per label set"""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._values: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        entry = self._values.get(label_values)
+        if entry is None:
+            entry = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def time(self, *label_values) -> "Timer":
+        """Context manager observing the elapsed time of its block"""
+        return Timer(self, label_values)
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labels, key, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class Timer:
+    __slots__ = ("histogram", "label_values", "start")
+
+    def __init__(self, histogram: Histogram, label_values: Tuple):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self) -> "Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.histogram.observe(time.perf_counter() - self.start, *self.label_values)
+
+class MetricsRegistry:
+    """Collection of metrics rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ("method", "route", "status")
+))
+REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled"
+))
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    "message_stage_duration_seconds",
+    "Latency of each message processing stage",
+    ("stage",)
+))
+MESSAGES = REGISTRY.register(Counter(
+    "messages_processed_total",
+    "Processed campaign targets by resulting message status",
+    ("status",)
+))
+TWILIO_ERRORS = REGISTRY.register(Counter(
+    "twilio_errors_total",
+    "Twilio API errors by error code",
+    ("error_code",)
+))
+IN_FLIGHT = REGISTRY.register(Gauge(
+    "in_flight",
+    "Operations currently in progress",
+    ("component",)
+))
+SEND_CONCURRENCY_LIMIT = REGISTRY.register(Gauge(
+    "twilio_send_concurrency_limit",
+    "Current adaptive limit on concurrent Twilio sends"
+))
+CIRCUIT_STATE = REGISTRY.register(Gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+    ("circuit",)
+))
+VERIFICATIONS = REGISTRY.register(Counter(
+    "phone_verifications_total",
+    "Business phone verification requests by action and outcome",
+    ("action", "outcome")
+))
+STATUS_UPDATES_DROPPED = REGISTRY.register(Counter(
+    "status_updates_dropped_total",
+    "Status callbacks abandoned after repeated history write failures"
+))
+QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "work_queue_depth",
+    "Jobs in the durable work queue",
+    ("state",)
+))
+# Per-tenant detail is in /stats; a tenant label would grow without bound
+TENANTS_WAITING = REGISTRY.register(Gauge(
+    "tenant_queue_waiting",
+    "Tenants with due jobs waiting in the work queue"
+))
+TENANT_QUEUE_WAIT = REGISTRY.register(Gauge(
+    "tenant_queue_max_wait_seconds",
+    "Longest time the oldest due job of any tenant has waited"
+))
+QUEUE_OLDEST_AGE = REGISTRY.register(Gauge(
+    "work_queue_oldest_age_seconds",
+    "Age of the oldest job in the work queue"
+))
+
+class MetricsMiddleware:
+    """Middleware recording request latency per route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # Use the route template so path parameters do not explode cardinality
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start,
+                scope.get("method", ""),
+                route,
+                str(status)
+            )
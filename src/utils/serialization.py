@@ -0,0 +1,40 @@
+# src/utils/serialization.py
+
+from fastapi.responses import JSONResponse
+from typing import Any, Dict
+from urllib.parse import parse_qsl
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+FORM_CONTENT_TYPE = "application/x-www-form-urlencoded"
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, or the stdlib when it is missing"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return super().render(content)
+
+def loads(body: bytes) -> Any:
+    """Decode a JSON request body"""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+def parse_form(body: bytes) -> Dict[str, str]:
+    """Decode a form-encoded body such as a Twilio status callback"""
+    return dict(parse_qsl(body.decode("utf-8"), keep_blank_values=True))
+
+def parse_callback(body: bytes, content_type: str) -> Dict[str, Any]:
+    """Decode a webhook body, form-encoded as Twilio sends it or JSON"""
+    if content_type.split(";", 1)[0].strip() == FORM_CONTENT_TYPE:
+        return parse_form(body)
+    payload = loads(body)
+    if not isinstance(payload, dict):
+        raise ValueError("Webhook payload must be an object")
+    return payload
@@ -0,0 +1,175 @@
+# src/utils/tracing.py
+
+from src.utils.metrics import STAGE_LATENCY
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+import json
+import structlog
+import time
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:  # pragma: no cover - opentelemetry is optional
+    trace = None
+
+_provider = None
+_tracer = None
+
+def setup_tracing(
+    exporter: str = "none",
+    sample_ratio: float = 1.0,
+    service_name: str = "vmhub-whatsapp",
+    otlp_endpoint: Optional[str] = None
+) -> bool:
+    """Configure OpenTelemetry tracing, returning False if it stays disabled
+
+    ``exporter`` is "console" to print spans, "otlp" to send them to a
+    collector (OTEL_EXPORTER_OTLP_ENDPOINT or ``otlp_endpoint``, e.g. a
+    local Jaeger), or "none". Root spans are sampled at ``sample_ratio``;
+    spans with an incoming parent follow its sampling decision.
+    """
+    global _provider, _tracer
+
+    if trace is None or exporter == "none":
+        return False
+
+    if exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        span_exporter = OTLPSpanExporter(endpoint=otlp_endpoint) if otlp_endpoint else OTLPSpanExporter()
+    else:
+        span_exporter = ConsoleSpanExporter()
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=ParentBased(TraceIdRatioBased(sample_ratio))
+    )
+    # Spans are exported from a background thread, off the event loop
+    _provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    _tracer = _provider.get_tracer("vmhub_whatsapp")
+    return True
+
+def shutdown_tracing() -> None:
+    """Export buffered spans"""
+    global _provider, _tracer
+
+    if _provider is not None:
+        _provider.shutdown()
+    _provider = None
+    _tracer = None
+
+@contextmanager
+def span(name: str, parent: Optional[Dict[str, str]] = None, kind: str = "internal", **attributes) -> Iterator[Any]:
+    """Open a span, a no-op when tracing is disabled
+
+    ``parent`` is a carrier of W3C trace headers to continue a trace from.
+    """
+    if _tracer is None:
+        yield None
+        return
+
+    context = propagate.extract(parent) if parent else None
+    with _tracer.start_as_current_span(
+        name,
+        context=context,
+        kind=getattr(SpanKind, kind.upper()),
+        attributes={key: value for key, value in attributes.items() if value is not None}
+    ) as current:
+        yield current
+
+@contextmanager
+def stage(name: str, **attributes) -> Iterator[Any]:
+    """Time a processing stage in the stage histogram and as a child span"""
+    started = time.perf_counter()
+    try:
+        with span(name, **attributes) as current:
+            yield current
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - started, name)
+
+def record_span(name: str, started: float, **attributes) -> None:
+    """Record an already finished stage, given its perf_counter start"""
+    elapsed = time.perf_counter() - started
+    STAGE_LATENCY.observe(elapsed, name)
+    if _tracer is None:
+        return
+    end = time.time_ns()
+    _tracer.start_span(
+        name,
+        start_time=end - int(elapsed * 1e9),
+        attributes={key: value for key, value in attributes.items() if value is not None}
+    ).end(end_time=end)
+
+def set_attributes(**attributes) -> None:
+    """Add attributes to the current span"""
+    if _tracer is None:
+        return
+    current = trace.get_current_span()
+    for key, value in attributes.items():
+        if value is not None:
+            current.set_attribute(key, value)
+
+def mark_error(error: str) -> None:
+    """Flag the current span as failed"""
+    if _tracer is not None:
+        trace.get_current_span().set_status(Status(StatusCode.ERROR, error))
+
+def inject_context() -> Optional[str]:
+    """Current trace context as JSON W3C headers, to carry across the work queue"""
+    if _tracer is None:
+        return None
+    carrier: Dict[str, str] = {}
+    propagate.inject(carrier)
+    return json.dumps(carrier) if carrier else None
+
+def extract_context(value: Optional[str]) -> Optional[Dict[str, str]]:
+    """Carrier stored by ``inject_context``"""
+    return json.loads(value) if value else None
+
+class TracingMiddleware:
+    """Server span per request, continuing traceparent from incoming headers"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _tracer is None:
+            return await self.app(scope, receive, send)
+
+        carrier = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in scope.get("headers") or []
+        }
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        method = scope.get("method", "")
+        with span(
+            f"{method} {scope.get('path', '')}",
+            parent=carrier,
+            kind="server",
+            **{"http.method": method, "http.target": scope.get("path", "")}
+        ) as current:
+            trace_id = format(current.get_span_context().trace_id, "032x")
+            # Log lines of the request carry its trace id
+            with structlog.contextvars.bound_contextvars(trace_id=trace_id):
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    # Name by route template so span names stay low-cardinality
+                    route = getattr(scope.get("route"), "path", None)
+                    if route:
+                        current.update_name(f"{method} {route}")
+                        current.set_attribute("http.route", route)
+                    current.set_attribute("http.status_code", status)
+                    if status >= 500:
+                        current.set_status(Status(StatusCode.ERROR))
@@ -0,0 +1,33 @@
+# test/conftest.py
+
+from pathlib import Path
+import json
+import os
+import pytest
+import sys
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# Settings are built when src is imported; keep tests independent of a .env
+os.environ.setdefault("PROJECT_ID", "test")
+os.environ.setdefault("TWILIO_ACCOUNT_SID", "ACtest")
+os.environ.setdefault("TWILIO_AUTH_TOKEN", "test")
+os.environ.setdefault("TWILIO_FROM_NUMBER", "+15550000000")
+os.environ.setdefault("CAMPAIGN_SETTINGS_WATCH", "false")
+os.environ.setdefault("SUPPRESSION_WATCH", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("MESSAGE_CONTENT_SIDS", json.dumps({
+    campaign_type: "HX" + format(index, "032x")
+    for index, campaign_type in enumerate(("birthday", "welcome", "reactivation", "loyalty"), start=1)
+}))
+
+@pytest.fixture
+def db():
+    """In-memory Firestore client with a store of its own"""
+    from benchmarks.fake_firestore import FakeAsyncClient, FakeStore
+
+    client = FakeAsyncClient()
+    client.store = FakeStore()
+    return client
@@ -0,0 +1,54 @@
+# test/test_batch_results.py
+
+import asyncio
+
+from src.models.campaign import CampaignTarget
+from src.services.batch_results import BatchResults
+from src.services.message_processor import MessageProcessor
+
+def make_target(target_id: str) -> CampaignTarget:
+    return CampaignTarget(
+        id=target_id,
+        user_id="tenant-1",
+        campaign_type="birthday",
+        customer_id=f"customer-{target_id}",
+        name="Cliente",
+        phone="5511999990000",
+        data={}
+    )
+
+def test_results_follow_the_send_outcomes(db):
+    async def scenario():
+        processor = MessageProcessor(db=db)
+        results = BatchResults(db)
+        targets = [make_target("t1"), make_target("t2"), make_target("t3")]
+        rejected = [{"index": 3, "target_id": "t4", "errors": ["phone: Field required"]}]
+        batch_id = await results.record(targets, rejected, ["t0"])
+
+        before = await results.get(batch_id)
+
+        await processor.writer.commit([
+            processor._target_status_write(targets[0], {"status": "queued", "message_id": "SM1", "error_code": None}),
+            processor._target_status_write(targets[1], {"status": "failed", "message_id": None, "error_code": 63016}),
+        ])
+        after = await results.get(batch_id)
+        await processor.close()
+        return before, after
+
+    before, after = asyncio.run(scenario())
+
+    assert not before["complete"]
+    assert before["counts"] == {"pending": 3}
+    assert before["rejected"] == 1
+    assert before["duplicates"] == ["t0"]
+
+    assert not after["complete"]
+    assert after["counts"] == {"queued": 1, "failed": 1, "pending": 1}
+    assert after["results"] == [
+        {"target_id": "t1", "status": "queued", "message_id": "SM1", "error_code": None},
+        {"target_id": "t2", "status": "failed", "message_id": None, "error_code": 63016},
+        {"target_id": "t3", "status": "pending", "message_id": None, "error_code": None},
+    ]
+
+def test_unknown_batch_has_no_results(db):
+    assert asyncio.run(BatchResults(db).get("missing")) is None
@@ -0,0 +1,75 @@
+# test/test_campaign_run.py
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from src.services.campaign_run import CampaignRunner
+
+class RecordingLogger:
+    def __init__(self):
+        self.events = []
+
+    def __getattr__(self, level):
+        return lambda event, **fields: self.events.append((level, event))
+
+def make_runner(db, monkeypatch):
+    runner = CampaignRunner(db, scheduler=None, queue=None)
+    started = []
+
+    async def run(key, checkpoint):
+        started.append(key)
+
+    monkeypatch.setattr(runner, "_run", run)
+    return runner, started
+
+def write_checkpoint(db, status: str, age: timedelta):
+    asyncio.run(db.collection("campaign_runs").document("tenant-1:birthday").set({
+        "cursor": "target-9",
+        "pages": 1,
+        "queued": 10,
+        "rejected": 0,
+        "status": status,
+        "updated_at": datetime.now(timezone.utc) - age
+    }))
+
+def start(runner, restart=False):
+    async def scenario():
+        checkpoint = await runner.start("tenant-1", "birthday", restart=restart)
+        await asyncio.gather(*runner._runs.values())
+        return checkpoint
+    return asyncio.run(scenario())
+
+def test_live_run_on_another_instance_is_left_alone(db, monkeypatch):
+    runner, started = make_runner(db, monkeypatch)
+    write_checkpoint(db, "running", timedelta(seconds=10))
+
+    assert start(runner)["cursor"] == "target-9"
+    assert start(runner, restart=True)["cursor"] == "target-9"
+    assert started == []
+
+def test_stale_running_checkpoint_is_resumed(db, monkeypatch):
+    runner, started = make_runner(db, monkeypatch)
+    write_checkpoint(db, "running", timedelta(hours=1))
+
+    checkpoint = start(runner)
+    assert checkpoint["cursor"] == "target-9"
+    assert started == [("tenant-1", "birthday")]
+
+def test_failed_checkpoint_write_is_logged(db, monkeypatch):
+    runner = CampaignRunner(db, scheduler=None, queue=None)
+    runner.logger = RecordingLogger()
+
+    async def failing_pages(*args):
+        raise RuntimeError("query failed")
+        yield
+
+    async def failing_checkpoint(key, checkpoint):
+        raise RuntimeError("write failed")
+
+    monkeypatch.setattr(runner, "iter_pending", failing_pages)
+    monkeypatch.setattr(runner, "_checkpoint", failing_checkpoint)
+    checkpoint = {"cursor": None, "pages": 0, "queued": 0, "rejected": 0}
+    asyncio.run(runner._run(("tenant-1", "birthday"), checkpoint))
+
+    assert ("error", "campaign_run_checkpoint_error") in runner.logger.events
+    assert checkpoint["status"] == "failed"
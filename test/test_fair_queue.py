@@ -0,0 +1,43 @@
+# test/test_fair_queue.py
+
+from src.services.fair_queue import FairScheduler
+
+def ready(**counts):
+    return {user_id: (count, 0.0) for user_id, count in counts.items()}
+
+def test_small_tenant_is_not_starved_by_large_backlog():
+    scheduler = FairScheduler(weights={}, default_weight=1)
+    plan = scheduler.plan(ready(large=50000, small=3), capacity=10)
+    assert plan == {"large": 7, "small": 3}
+
+def test_claims_follow_tenant_weights():
+    scheduler = FairScheduler(weights={"premium": 3}, default_weight=1)
+    plan = scheduler.plan(ready(premium=100, basic=100), capacity=8)
+    assert plan == {"premium": 6, "basic": 2}
+
+def test_rotation_continues_across_claims():
+    scheduler = FairScheduler(weights={}, default_weight=1)
+    first = scheduler.plan(ready(a=10, b=10), capacity=1)
+    second = scheduler.plan(ready(a=10, b=10), capacity=1)
+    assert first == {"a": 1}
+    assert second == {"b": 1}
+
+def test_plan_never_exceeds_ready_jobs():
+    scheduler = FairScheduler(weights={}, default_weight=1)
+    assert scheduler.plan(ready(a=2, b=1), capacity=100) == {"a": 2, "b": 1}
+    assert scheduler.plan({}, capacity=100) == {}
+
+def test_idle_tenant_leaves_the_rotation():
+    scheduler = FairScheduler(weights={}, default_weight=1)
+    scheduler.plan(ready(a=5, b=5), capacity=4)
+    scheduler.plan(ready(b=5), capacity=2)
+    tenants = scheduler.stats()["tenants"]
+    assert list(tenants) == ["b"]
+    assert tenants["b"]["claimed"] == 4
+
+def test_stats_report_uncapped_depths():
+    scheduler = FairScheduler(weights={}, default_weight=1)
+    # Planning only sees counts capped at a batch
+    scheduler.plan(ready(large=100), capacity=10)
+    tenant = scheduler.stats({"large": (50000, 60000)})["tenants"]["large"]
+    assert (tenant["ready"], tenant["queued"]) == (50000, 60000)
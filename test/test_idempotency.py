@@ -0,0 +1,76 @@
+# test/test_idempotency.py
+
+import asyncio
+
+import httpx
+
+from src.models.campaign import CampaignTarget
+from src.services.idempotency import IdempotencyGuard
+from src.services.twilio_client import never_sent
+
+def make_target(target_id: str = "target-1") -> CampaignTarget:
+    return CampaignTarget(
+        id=target_id,
+        user_id="tenant-1",
+        campaign_type="birthday",
+        customer_id="customer-1",
+        name="Cliente",
+        phone="5511999990000",
+        data={}
+    )
+
+def test_target_is_claimed_once(db):
+    async def scenario():
+        guard = IdempotencyGuard(db)
+        assert await guard.claim(make_target())
+        assert guard.seen(make_target())
+        assert not await guard.claim(make_target())
+        assert await guard.claim(make_target("target-2"))
+        return guard.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["claims"] == 2
+    assert stats["duplicates"] == 1
+
+def test_claim_document_rejects_other_processes(db):
+    async def scenario():
+        assert await IdempotencyGuard(db).claim(make_target())
+        # A second process has nothing cached and loses on the claim document
+        other = IdempotencyGuard(db)
+        return await other.claim(make_target()), other.stats()
+
+    claimed, stats = asyncio.run(scenario())
+    assert not claimed
+    assert stats["duplicates"] == 1
+
+def test_released_target_can_be_claimed_again(db):
+    async def scenario():
+        guard = IdempotencyGuard(db)
+        await guard.claim(make_target())
+        await guard.release(make_target())
+        assert not guard.seen(make_target())
+        assert await IdempotencyGuard(db).claim(make_target())
+
+    asyncio.run(scenario())
+    assert any(path.startswith("target_claims/") for path in db.store.documents)
+
+def test_recent_claims_are_bounded(db):
+    async def scenario():
+        guard = IdempotencyGuard(db, max_size=2)
+        for index in range(3):
+            await guard.claim(make_target(f"target-{index}"))
+        return guard
+
+    guard = asyncio.run(scenario())
+    assert guard.stats()["size"] == 2
+    assert not guard.seen(make_target("target-0"))
+    assert guard.seen(make_target("target-2"))
+
+def test_only_connection_failures_count_as_never_sent():
+    request = httpx.Request("POST", "https://api.twilio.com")
+    assert never_sent(httpx.ConnectError("refused", request=request))
+    assert never_sent(httpx.ConnectTimeout("timeout", request=request))
+    assert never_sent(httpx.PoolTimeout("pool", request=request))
+    # The request may have reached Twilio, so the claim must be kept
+    assert not never_sent(httpx.ReadTimeout("timeout", request=request))
+    assert not never_sent(RuntimeError("boom"))
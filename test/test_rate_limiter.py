@@ -0,0 +1,80 @@
+# test/test_rate_limiter.py
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import rate_limiter
+from src.services.rate_limiter import SendScheduler, TokenBucket
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen monotonic clock, advanced by hand"""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record scheduler sleeps instead of waiting them out"""
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", sleep)
+    return sleeps
+
+def test_bucket_serves_its_burst_then_paces_at_its_rate(clock):
+    bucket = TokenBucket(rate=10, burst=2)
+    assert [bucket.reserve() for _ in range(4)] == pytest.approx([0.0, 0.0, 0.1, 0.2])
+
+def test_bucket_refills_up_to_its_burst(clock):
+    bucket = TokenBucket(rate=10, burst=2)
+    bucket.reserve()
+    bucket.reserve()
+    clock.now += 60
+    assert [bucket.reserve() for _ in range(3)] == pytest.approx([0.0, 0.0, 0.1])
+
+def test_refund_returns_a_reserved_token(clock):
+    bucket = TokenBucket(rate=10, burst=1)
+    bucket.reserve()
+    assert bucket.reserve() == pytest.approx(0.1)
+    bucket.refund()
+    assert bucket.reserve() == pytest.approx(0.1)
+
+def test_scheduler_waits_for_the_slower_bucket(clock, sleeps):
+    scheduler = SendScheduler(sender_rate=5, sender_burst=1, account_rate=100, account_burst=100)
+
+    async def scenario():
+        return [await scheduler.acquire("AC1", "+5511000000000") for _ in range(3)]
+
+    assert asyncio.run(scenario()) == pytest.approx([0.0, 0.2, 0.4])
+    assert sleeps == pytest.approx([0.2, 0.4])
+    assert scheduler.stats()["delayed"] == 2
+
+def test_senders_are_paced_independently_within_the_account(clock, sleeps):
+    scheduler = SendScheduler(sender_rate=1, sender_burst=1, account_rate=100, account_burst=100)
+
+    async def scenario():
+        return [await scheduler.acquire("AC1", f"+551100000000{index}") for index in range(3)]
+
+    assert asyncio.run(scenario()) == [0.0, 0.0, 0.0]
+    assert scheduler.stats()["senders"] == 3
+
+def test_cancelled_wait_refunds_both_buckets(clock):
+    scheduler = SendScheduler(sender_rate=1, sender_burst=1, account_rate=1, account_burst=1)
+
+    async def scenario():
+        await scheduler.acquire("AC1", "+5511000000000")
+        waiting = asyncio.create_task(scheduler.acquire("AC1", "+5511000000000"))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+    asyncio.run(scenario())
+    assert scheduler.senders["+5511000000000"].tokens == pytest.approx(0.0)
+    assert scheduler.accounts["AC1"].tokens == pytest.approx(0.0)
+    assert scheduler.stats()["waiting"] == 0
@@ -0,0 +1,128 @@
+# test/test_resilience.py
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import resilience
+from src.services.resilience import AdaptiveLimiter, CircuitBreaker
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen monotonic clock, advanced by hand"""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(resilience, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+def make_limiter(**overrides) -> AdaptiveLimiter:
+    options = dict(initial=8, min_limit=1, max_limit=16, latency_target=0.5, cooldown=1.0)
+    options.update(overrides)
+    return AdaptiveLimiter(**options)
+
+def test_fast_calls_grow_the_limit_by_about_one_per_window(clock):
+    limiter = make_limiter()
+
+    async def scenario():
+        # Each fast call adds 1/limit, so a window of 8 adds just under one
+        for _ in range(9):
+            await limiter.acquire()
+            limiter.release(0.1)
+
+    asyncio.run(scenario())
+    assert limiter.stats()["limit"] == 9
+
+def test_overload_halves_the_limit_once_per_cooldown(clock):
+    limiter = make_limiter()
+
+    async def scenario():
+        for _ in range(3):
+            await limiter.acquire()
+        for _ in range(3):
+            limiter.release(0.1, overloaded=True)
+        after_burst = limiter.stats()["limit"]
+
+        clock.now += 1.0
+        await limiter.acquire()
+        limiter.release(0.1, overloaded=True)
+        return after_burst, limiter.stats()
+
+    after_burst, stats = asyncio.run(scenario())
+    assert after_burst == 4
+    assert stats["limit"] == 2
+    assert stats["decreases"] == 2
+
+def test_limit_never_drops_below_the_minimum(clock):
+    limiter = make_limiter(initial=2, min_limit=2)
+
+    async def scenario():
+        await limiter.acquire()
+        limiter.release(0.1, overloaded=True)
+
+    asyncio.run(scenario())
+    assert limiter.stats()["limit"] == 2
+
+def test_waiters_get_slots_in_order(clock):
+    limiter = make_limiter(initial=1)
+
+    async def scenario():
+        order = []
+        await limiter.acquire()
+
+        async def call(name):
+            await limiter.acquire()
+            order.append(name)
+            limiter.release(None)
+
+        waiting = [asyncio.create_task(call(name)) for name in ("first", "second")]
+        await asyncio.sleep(0)
+        assert limiter.stats()["waiting"] == 2
+        limiter.release(None)
+        await asyncio.gather(*waiting)
+        return order
+
+    assert asyncio.run(scenario()) == ["first", "second"]
+    assert limiter.stats()["in_flight"] == 0
+
+def make_breaker() -> CircuitBreaker:
+    return CircuitBreaker("test", failure_ratio=0.5, min_calls=4, window=10, reset_timeout=30, half_open_probes=1)
+
+def test_breaker_opens_at_the_failure_ratio(clock):
+    breaker = make_breaker()
+    for success in (True, True, False):
+        breaker.record(success)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record(False)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.ready()
+    assert not breaker.allow()
+    assert breaker.retry_after == 30
+
+def test_breaker_probes_half_open_and_closes_on_success(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False)
+
+    clock.now += 30
+    assert breaker.ready()
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one probe is let through at a time
+    assert not breaker.allow()
+
+    breaker.record(True)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()["recent_failure_ratio"] == 0.0
+
+def test_failed_probe_reopens_the_breaker(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False)
+
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.retry_after == 30
+    assert breaker.stats()["opens"] == 2
@@ -0,0 +1,49 @@
+# test/test_send_window.py
+
+import asyncio
+from datetime import datetime, timedelta
+
+from src.config.constants import BRAZIL_TIMEZONE
+from src.models.campaign import CampaignSettings, CampaignTarget
+from src.services.send_window import SendWindowScheduler
+from src.utils.helpers import get_timezone
+
+def make_target() -> CampaignTarget:
+    return CampaignTarget(
+        id="target-1",
+        user_id="tenant-1",
+        campaign_type="birthday",
+        customer_id="customer-1",
+        name="Cliente",
+        phone="5511999990000",
+        data={"coupon": "BDAY10"}
+    )
+
+class StubSettingsCache:
+    def __init__(self, send_time):
+        self.send_time = send_time
+
+    async def get(self, user_id, campaign_type):
+        if self.send_time is None:
+            return None
+        return CampaignSettings(user_id=user_id, campaign_type=campaign_type, send_time=self.send_time)
+
+def opened_minutes_ago(minutes: int) -> str:
+    """Send time of a window that opened ``minutes`` ago"""
+    return (datetime.now(get_timezone(BRAZIL_TIMEZONE)) - timedelta(minutes=minutes)).strftime("%H:%M")
+
+def retry_delay(send_time, delay, enabled=True):
+    scheduler = SendWindowScheduler(None, StubSettingsCache(send_time), window_minutes=60, enabled=enabled)
+    return asyncio.run(scheduler.retry_delay(make_target(), delay))
+
+def test_retry_inside_the_window_keeps_its_backoff():
+    assert retry_delay(opened_minutes_ago(10), 60) == 60
+
+def test_retry_past_the_window_waits_for_the_next_one():
+    # The window closes in about 50 minutes; the next opens in about 23h50
+    delay = retry_delay(opened_minutes_ago(10), 3600)
+    assert 23 * 3600 <= delay <= 25 * 3600
+
+def test_retry_is_not_clamped_without_a_window():
+    assert retry_delay(None, 3600) == 3600
+    assert retry_delay(opened_minutes_ago(10), 3600, enabled=False) == 3600
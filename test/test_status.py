@@ -0,0 +1,127 @@
+# test/test_status.py
+
+from datetime import date
+import asyncio
+
+import pytest
+
+from src.models.message import Message
+from src.services.campaign_stats import CampaignStats, status_path
+from src.services.firestore_writer import BatchWriter
+from src.services.status_aggregator import StatusAggregator, advances
+
+DAY = "2026-01-05"
+
+@pytest.mark.parametrize("current, status, expected", [
+    (None, "queued", True),
+    ("queued", "sent", True),
+    ("sent", "read", True),
+    ("read", "delivered", False),
+    ("sent", "sent", False),
+    ("sent", "failed", True),
+    ("delivered", "undelivered", False),
+    ("failed", "delivered", False),
+    ("sent", "partially_delivered", True),
+])
+def test_status_only_moves_forward(current, status, expected):
+    assert advances(current, status) is expected
+
+@pytest.mark.parametrize("previous, status, expected", [
+    ("queued", "sent", ["sent"]),
+    ("queued", "read", ["sent", "delivered", "read"]),
+    ("sent", "read", ["delivered", "read"]),
+    (None, "delivered", ["sent", "delivered"]),
+    ("queued", "failed", ["failed"]),
+])
+def test_status_path_includes_skipped_milestones(previous, status, expected):
+    assert status_path(previous, status) == expected
+
+def make_message() -> Message:
+    return Message(
+        user_id="tenant-1",
+        campaign_type="birthday",
+        target_id="target-1",
+        phone_number="5511999990000",
+        template_name="birthday_message",
+        parameters={}
+    )
+
+async def send(stats: CampaignStats, writer: BatchWriter, sid: str, status: str = "queued") -> None:
+    await writer.commit(stats.send_ops(make_message(), {"message_id": sid, "status": status}, DAY))
+
+async def totals(stats: CampaignStats):
+    day = date.fromisoformat(DAY)
+    return (await stats.get("tenant-1", "birthday", day, day))["totals"]
+
+def test_callbacks_count_each_status_once(db):
+    async def scenario():
+        writer = BatchWriter(db, flush_interval_ms=1)
+        stats = CampaignStats(db, shards=2)
+        aggregator = StatusAggregator(db, writer, stats, flush_interval_ms=1)
+        await send(stats, writer, "SM1")
+        await send(stats, writer, "SM2")
+        aggregator.seed("SM1", "queued")
+        aggregator.seed("SM2", "queued")
+
+        # Coalesced into a single read, which also passed sent and delivered
+        for status in ("sent", "delivered", "read"):
+            aggregator.record("SM1", status)
+        aggregator.record("SM2", "sent")
+        await aggregator.flush()
+
+        # Late and repeated callbacks change nothing
+        aggregator.record("SM1", "delivered")
+        aggregator.record("SM2", "sent")
+        aggregator.record("SM2", "failed")
+        await aggregator.flush()
+        return await totals(stats), aggregator.stats()
+
+    counts, stats = asyncio.run(scenario())
+    assert counts == {"attempted": 2, "queued": 2, "sent": 2, "delivered": 1, "read": 1, "failed": 1}
+    assert stats["dropped"] == 2
+    assert db.store.documents["message_history/SM1"]["status"] == "read"
+    assert "read_at" in db.store.documents["message_history/SM1"]
+    assert db.store.documents["message_history/SM2"]["status"] == "failed"
+
+def test_callbacks_for_unknown_messages_are_written(db):
+    async def scenario():
+        writer = BatchWriter(db, flush_interval_ms=1)
+        aggregator = StatusAggregator(db, writer, flush_interval_ms=1)
+        aggregator.record("SM9", "delivered")
+        await aggregator.flush()
+        return aggregator.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["written"] == 1
+    assert db.store.documents["message_history/SM9"]["status"] == "delivered"
+
+class FailingWriter:
+    max_ops = 500
+
+    def __init__(self):
+        self.attempts = 0
+
+    async def commit(self, ops):
+        self.attempts += 1
+        raise RuntimeError("unavailable")
+
+def test_failed_flushes_are_retried_then_dropped(db):
+    async def scenario():
+        writer = FailingWriter()
+        aggregator = StatusAggregator(db, writer, flush_interval_ms=1)
+        aggregator.max_attempts = 3
+        aggregator.record("SM1", "delivered")
+
+        await aggregator.flush()
+        retrying = aggregator.stats()["retrying"]
+        # Each flush gives updates waiting out their backoff another try
+        await aggregator.flush()
+        await aggregator.flush()
+        return writer.attempts, retrying, aggregator.stats()
+
+    attempts, retrying, stats = asyncio.run(scenario())
+    assert attempts == 3
+    assert retrying == 1
+    assert stats["failed"] == 1
+    assert stats["retrying"] == 0
+    assert stats["pending"] == 0
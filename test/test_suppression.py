@@ -0,0 +1,52 @@
+# test/test_suppression.py
+
+import asyncio
+
+from src.services.suppression import SuppressionIndex
+
+PHONE = "whatsapp:+5511999990000"
+
+def test_added_number_is_suppressed_once(db):
+    index = SuppressionIndex(db, watch=False)
+    op = index.add(PHONE, "opted_out", "test")
+    assert op is not None
+    assert op.data["reason"] == "opted_out"
+    assert op.ref.path == "suppressions/5511999990000"
+    assert index.contains("11999990000")
+    assert index.add(PHONE, "opted_out", "test") is None
+    assert index.stats()["added"] == 1
+
+def test_invalid_numbers_are_ignored(db):
+    index = SuppressionIndex(db, watch=False)
+    assert index.add("123", "opted_out", "test") is None
+    assert not index.contains("123")
+
+def test_stop_and_start_replies_update_the_collection(db):
+    async def scenario():
+        index = SuppressionIndex(db, watch=False)
+        assert await index.record_inbound(PHONE, " stop ")
+        assert index.contains(PHONE)
+        assert "suppressions/5511999990000" in db.store.documents
+
+        assert await index.record_inbound(PHONE, "START")
+        assert not index.contains(PHONE)
+        assert "suppressions/5511999990000" not in db.store.documents
+
+        assert not await index.record_inbound(PHONE, "hello")
+        return index.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["added"] == 1
+    assert stats["removed"] == 1
+
+def test_load_reads_numbers_suppressed_elsewhere(db):
+    async def scenario():
+        await SuppressionIndex(db, watch=False).record_inbound(PHONE, "STOP")
+        index = SuppressionIndex(db, watch=False)
+        await index.load()
+        try:
+            return index.loaded, index.contains(PHONE)
+        finally:
+            index.close()
+
+    assert asyncio.run(scenario()) == (True, True)
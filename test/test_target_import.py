@@ -0,0 +1,60 @@
+# test/test_target_import.py
+
+import asyncio
+
+from src.services.target_import import TargetImporter
+
+CSV = (
+    "id,user_id,campaign_type,customer_id,name,phone,coupon\n"
+    "t1,,,c1,Ana,11999990000,BDAY10\n"
+    "t2,tenant-2,welcome,c2,\"Bia, Jr\",(11) 99999-0001,\n"
+    "t3,,,c3,Caio,123,\n"
+)
+
+class FakeQueue:
+    def __init__(self):
+        self.targets = []
+
+    async def enqueue(self, targets):
+        self.targets.extend(targets)
+        return len(targets)
+
+async def chunked(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+def run_import(body: str, defaults=None, chunk_size: int = 2):
+    queue = FakeQueue()
+    importer = TargetImporter(queue, chunk_size=chunk_size)
+    summary = asyncio.run(importer.run(chunked(body.encode(), 7), "csv", defaults))
+    return queue, summary
+
+def test_defaults_fill_blank_columns_only():
+    queue, summary = run_import(CSV, {"user_id": "tenant-1", "campaign_type": "birthday"})
+
+    assert summary["rows"] == 3
+    assert summary["queued"] == 2
+    first, second = queue.targets
+    assert (first.user_id, first.campaign_type) == ("tenant-1", "birthday")
+    assert (second.user_id, second.campaign_type) == ("tenant-2", "welcome")
+
+def test_rows_are_normalized_and_extra_columns_become_data():
+    queue, _ = run_import(CSV, {"user_id": "tenant-1", "campaign_type": "birthday"})
+
+    first, second = queue.targets
+    assert first.phone == "5511999990000"
+    assert first.data == {"coupon": "BDAY10"}
+    assert second.name == "Bia, Jr"
+    assert second.phone == "5511999990001"
+
+def test_invalid_rows_are_reported_by_line():
+    _, summary = run_import(CSV, {"user_id": "tenant-1", "campaign_type": "birthday"})
+
+    assert summary["rejected"] == 1
+    assert [error["row"] for error in summary["errors"]] == [3]
+
+def test_missing_required_fields_without_defaults_are_rejected():
+    queue, summary = run_import(CSV)
+
+    assert [target.id for target in queue.targets] == ["t2"]
+    assert summary["rejected"] == 2
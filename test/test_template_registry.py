@@ -0,0 +1,110 @@
+# test/test_template_registry.py
+
+from types import SimpleNamespace
+import asyncio
+
+import pytest
+from twilio.base.exceptions import TwilioRestException
+
+from src.models.campaign import CampaignTarget
+from src.services.template_registry import TemplateRegistry, is_content_sid
+
+SIDS = {
+    campaign_type: "HX" + format(index, "032x")
+    for index, campaign_type in enumerate(("birthday", "welcome", "reactivation", "loyalty"), start=1)
+}
+
+def test_content_sids_are_recognized():
+    assert is_content_sid(SIDS["birthday"])
+    assert not is_content_sid("birthday_template")
+    assert not is_content_sid("HX123")
+    assert not is_content_sid(None)
+
+def test_template_names_are_refused_at_startup():
+    with pytest.raises(ValueError, match="birthday"):
+        TemplateRegistry({**SIDS, "birthday": "birthday_template"})
+
+def test_every_campaign_type_needs_a_template():
+    templates = dict(SIDS)
+    del templates["loyalty"]
+    with pytest.raises(ValueError, match="loyalty"):
+        TemplateRegistry(templates)
+
+def test_campaign_template_is_used_only_if_it_is_a_content_sid():
+    registry = TemplateRegistry(SIDS)
+    other = "HX" + "f" * 32
+    assert registry.content_sid("birthday") == SIDS["birthday"]
+    assert registry.content_sid("birthday", other) == other
+    assert registry.content_sid("birthday", "birthday_template") == SIDS["birthday"]
+
+class FakeContent:
+    """Answers content fetches like the Twilio Content API"""
+
+    def __init__(self, contents):
+        self.contents = contents
+        self.content = SimpleNamespace(v1=SimpleNamespace(contents=self.fetch))
+
+    def fetch(self, sid):
+        async def fetch_async():
+            if sid not in self.contents:
+                raise TwilioRestException(404, f"/Content/{sid}", "not found")
+            return self.contents[sid]
+        return SimpleNamespace(fetch_async=fetch_async)
+
+def content(body: str, language: str = "pt_BR"):
+    return SimpleNamespace(language=language, variables={}, types={"twilio/text": {"body": body}})
+
+def load(registry, contents):
+    asyncio.run(registry.load(SimpleNamespace(client=FakeContent(contents))))
+
+BODIES = {
+    "birthday": "Parabéns {{1}}! Use o cupom {{2}}",
+    "welcome": "Bem-vindo {{1}}",
+    "reactivation": "{{1}}, faz {{2}} dias",
+    "loyalty": "{{1}}, você tem {{2}} pontos",
+}
+
+def make_target(**data) -> CampaignTarget:
+    return CampaignTarget(
+        id="target-1",
+        user_id="tenant-1",
+        campaign_type="birthday",
+        customer_id="customer-1",
+        name="Cliente",
+        phone="5511999990000",
+        data=data
+    )
+
+def test_positional_templates_render_in_parameter_order():
+    registry = TemplateRegistry(SIDS)
+    load(registry, {SIDS[kind]: content(body) for kind, body in BODIES.items()})
+
+    assert registry.get("birthday").template.content == BODIES["birthday"]
+    assert registry.render_batch([make_target(coupon="BDAY10")]) == [{"1": "Cliente", "2": "BDAY10"}]
+
+def test_named_templates_render_by_name():
+    registry = TemplateRegistry(SIDS)
+    bodies = {**BODIES, "birthday": "Parabéns {{name}}! Use o cupom {{coupon}}"}
+    load(registry, {SIDS[kind]: content(body) for kind, body in bodies.items()})
+
+    assert registry.render_batch([make_target(coupon="BDAY10")]) == [{"name": "Cliente", "coupon": "BDAY10"}]
+
+def test_parameter_mismatch_is_refused():
+    registry = TemplateRegistry(SIDS)
+    bodies = {**BODIES, "welcome": "Bem-vindo {{1}}, cupom {{2}}"}
+    with pytest.raises(ValueError, match="welcome"):
+        load(registry, {SIDS[kind]: content(body) for kind, body in bodies.items()})
+
+def test_language_mismatch_is_refused():
+    registry = TemplateRegistry(SIDS)
+    contents = {SIDS[kind]: content(body) for kind, body in BODIES.items()}
+    contents[SIDS["loyalty"]] = content(BODIES["loyalty"], language="en")
+    with pytest.raises(ValueError, match="loyalty"):
+        load(registry, contents)
+
+def test_unknown_content_sid_is_refused():
+    registry = TemplateRegistry(SIDS)
+    contents = {SIDS[kind]: content(body) for kind, body in BODIES.items()}
+    del contents[SIDS["reactivation"]]
+    with pytest.raises(ValueError, match="reactivation"):
+        load(registry, contents)
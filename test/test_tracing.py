@@ -0,0 +1,112 @@
+# test/test_tracing.py
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import SpanKind
+
+from src.models.campaign import CampaignTarget
+from src.models.message import Message
+from src.services.twilio_client import TwilioClient
+from src.services.work_queue import QueueWorker, WorkQueue
+from src.utils import tracing
+from src.utils.tracing import TracingMiddleware, span
+
+@pytest.fixture
+def exporter(monkeypatch):
+    """Record finished spans in memory instead of exporting them"""
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(tracing, "_provider", provider)
+    monkeypatch.setattr(tracing, "_tracer", provider.get_tracer("test"))
+    yield exporter
+    provider.shutdown()
+
+class SendingProcessor:
+    """Stands in for MessageProcessor, sending each target through a real TwilioClient"""
+
+    def __init__(self, twilio: TwilioClient):
+        self.twilio = twilio
+
+    def render(self, targets):
+        return [{"name": target.name} for target in targets]
+
+    async def process_target(self, target: CampaignTarget, attempt_count: int = 1, parameters=None):
+        with span("process_target", target_id=target.id):
+            return await self.twilio.send_message(Message(
+                user_id=target.user_id,
+                campaign_type=target.campaign_type,
+                target_id=target.id,
+                phone_number=target.phone,
+                template_name="HXtest",
+                parameters=parameters or {"name": target.name}
+            ))
+
+def make_target() -> CampaignTarget:
+    return CampaignTarget(
+        id="target-1",
+        user_id="tenant-1",
+        campaign_type="birthday",
+        customer_id="customer-1",
+        name="Cliente",
+        phone="5511999990000",
+        data={"coupon": "BDAY10"}
+    )
+
+def test_trace_continues_from_ingress_through_queue_to_twilio(exporter, tmp_path):
+    async def scenario():
+        queue = WorkQueue(path=str(tmp_path / "queue.db"))
+        twilio = TwilioClient()
+
+        async def create_async(**kwargs):
+            return SimpleNamespace(sid="SMtest", status="queued")
+
+        twilio.client = SimpleNamespace(messages=SimpleNamespace(create_async=create_async))
+
+        async def app(scope, receive, send):
+            await queue.enqueue([make_target()])
+            await send({"type": "http.response.start", "status": 202, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            pass
+
+        scope = {"type": "http", "method": "POST", "path": "/process-targets", "headers": []}
+        await TracingMiddleware(app)(scope, receive, send)
+
+        # The worker runs outside the request, so only the job row links them
+        jobs = await queue.claim_tenants({"tenant-1": 1})
+        assert len(jobs) == 1 and jobs[0].trace_context
+        await QueueWorker(queue, SendingProcessor(twilio))._process(jobs[0])
+
+        await twilio.close()
+        queue.close()
+
+    asyncio.run(scenario())
+
+    spans = {finished.name: finished for finished in exporter.get_finished_spans()}
+    ingress = spans["POST /process-targets"]
+    job = spans["queue_job"]
+    process = spans["process_target"]
+    send = spans["twilio_send"]
+
+    assert ingress.parent is None
+    assert ingress.kind == SpanKind.SERVER
+    assert {job.context.trace_id, process.context.trace_id, send.context.trace_id} == {ingress.context.trace_id}
+    assert job.kind == SpanKind.CONSUMER
+    assert job.parent.span_id == ingress.context.span_id
+    assert process.parent.span_id == job.context.span_id
+    assert send.kind == SpanKind.CLIENT
+    assert send.parent.span_id == process.context.span_id
+    assert send.attributes["message_id"] == "SMtest"
@@ -0,0 +1,73 @@
+# test/test_webhook.py
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from twilio.request_validator import RequestValidator
+
+from src.config import settings
+from src.main import app, get_services
+from src.services.firestore_writer import BatchWriter
+from src.services.suppression import SuppressionIndex
+
+URL = "http://testserver/webhook"
+PHONE = "whatsapp:+5511999990000"
+
+class RecordedUpdates:
+    def __init__(self):
+        self.updates = []
+
+    def record(self, message_sid, status):
+        self.updates.append((message_sid, status))
+
+@pytest.fixture
+def services(db):
+    processor = SimpleNamespace(
+        status_updates=RecordedUpdates(),
+        suppression=SuppressionIndex(db, watch=False),
+        writer=BatchWriter(db, flush_interval_ms=1)
+    )
+    services = SimpleNamespace(processor=processor)
+    app.dependency_overrides[get_services] = lambda: services
+    yield services
+    app.dependency_overrides.clear()
+
+def post(form, signature=None):
+    headers = {"X-Twilio-Signature": signature} if signature else {}
+    return TestClient(app).post("/webhook", data=form, headers=headers)
+
+def sign(form):
+    return RequestValidator(settings.TWILIO_AUTH_TOKEN).compute_signature(URL, form)
+
+def test_signed_status_callback_is_recorded(services):
+    form = {"MessageSid": "SM1", "MessageStatus": "delivered"}
+    response = post(form, sign(form))
+    assert response.status_code == 200
+    assert services.processor.status_updates.updates == [("SM1", "delivered")]
+
+def test_unsigned_callbacks_are_refused(services):
+    response = post({"MessageSid": "SM1", "MessageStatus": "delivered"})
+    assert response.status_code == 403
+    assert services.processor.status_updates.updates == []
+
+def test_forged_opt_in_cannot_resubscribe(services, db):
+    suppression = services.processor.suppression
+    suppression._numbers.add(5511999990000)
+
+    form = {"From": PHONE, "Body": "START"}
+    response = post(form, sign({**form, "Body": "STOP"}))
+    assert response.status_code == 403
+    assert suppression.contains(PHONE)
+
+def test_signed_opt_out_suppresses_the_number(services, db):
+    form = {"From": PHONE, "Body": "STOP"}
+    assert post(form, sign(form)).status_code == 200
+    assert services.processor.suppression.contains(PHONE)
+    assert "suppressions/5511999990000" in db.store.documents
+
+@pytest.mark.parametrize("body", [b"[1, 2]", b"{not json"])
+def test_malformed_json_body_is_a_client_error(services, body):
+    response = TestClient(app).post("/webhook", content=body, headers={"Content-Type": "application/json"})
+    assert response.status_code == 400
+    assert services.processor.status_updates.updates == []
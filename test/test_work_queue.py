@@ -0,0 +1,137 @@
+# test/test_work_queue.py
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.config.constants import QUEUE_CONFIG
+from src.models.campaign import CampaignTarget
+from src.services.work_queue import QueueWorker, WorkQueue
+
+def make_target(target_id: str = "target-1") -> CampaignTarget:
+    return CampaignTarget(
+        id=target_id,
+        user_id="tenant-1",
+        campaign_type="birthday",
+        customer_id="customer-1",
+        name="Cliente",
+        phone="5511999990000",
+        data={"coupon": "BDAY10"}
+    )
+
+def failed(error_code):
+    return {"message_id": None, "status": "failed", "error_code": error_code, "error_message": "failed"}
+
+class StubProcessor:
+    """Answers every target with a fixed result"""
+
+    def __init__(self, result=None):
+        self.result = result or {"message_id": "SM1", "status": "queued", "error_code": None}
+        self.processed = []
+        self.twilio = SimpleNamespace(breaker=SimpleNamespace(ready=lambda: True))
+
+    def render(self, targets):
+        return [{"name": target.name} for target in targets]
+
+    async def process_target(self, target, attempt_count=1, parameters=None):
+        self.processed.append(target.id)
+        return self.result
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue(path=str(tmp_path / "queue.db"), lease_seconds=60)
+    yield queue
+    queue.close()
+
+def available_at(queue: WorkQueue, job_id: int) -> float:
+    return queue._fetch("SELECT available_at FROM jobs WHERE id = ?", (job_id,))[0][0]
+
+def test_transient_failure_backs_off_exponentially(queue):
+    async def scenario():
+        await queue.enqueue([make_target()])
+        worker = QueueWorker(queue, StubProcessor(failed(20500)))
+
+        delays = []
+        for attempt in (1, 2):
+            # Make the retried job due again without waiting out its backoff
+            queue._execute("UPDATE jobs SET available_at = 0")
+            [job] = await queue.claim_tenants({"tenant-1": 1})
+            assert job.attempts == attempt
+            before = time.time()
+            await worker._handle(job)
+            delays.append(available_at(queue, job.id) - before)
+        return delays
+
+    first, second = asyncio.run(scenario())
+    base = QUEUE_CONFIG["backoff_seconds"]
+    assert base * 0.9 - 1 <= first <= base * 1.1 + 1
+    assert base * 1.8 - 1 <= second <= base * 2.2 + 1
+
+def test_permanent_failure_is_dead_lettered(queue):
+    async def scenario():
+        await queue.enqueue([make_target()])
+        [job] = await queue.claim_tenants({"tenant-1": 1})
+        await QueueWorker(queue, StubProcessor(failed(21211)))._handle(job)
+        return await queue.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["depth"] == 0
+    assert stats["dead_letters"] == 1
+
+def test_job_is_dead_lettered_after_the_last_attempt(queue):
+    async def scenario():
+        await queue.enqueue([make_target()])
+        worker = QueueWorker(queue, StubProcessor(failed(20500)))
+        for _ in range(QUEUE_CONFIG["retry_attempts"]):
+            queue._execute("UPDATE jobs SET available_at = 0")
+            [job] = await queue.claim_tenants({"tenant-1": 1})
+            await worker._handle(job)
+        return await queue.stats(), queue._fetch("SELECT attempts, error_class FROM dead_letters")
+
+    stats, dead_letters = asyncio.run(scenario())
+    assert stats["depth"] == 0
+    assert dead_letters == [(QUEUE_CONFIG["retry_attempts"], "transient")]
+
+def test_leased_job_is_hidden_until_the_lease_expires(queue):
+    async def scenario():
+        await queue.enqueue([make_target()])
+        [job] = await queue.claim_tenants({"tenant-1": 1})
+        while_leased = await queue.claim_tenants({"tenant-1": 1})
+
+        # A crashed worker never acks; expire its lease
+        queue._execute("UPDATE jobs SET available_at = ? WHERE id = ?", (time.time() - 1, job.id))
+        reclaimed = await queue.claim_tenants({"tenant-1": 1})
+        return job, while_leased, reclaimed
+
+    job, while_leased, reclaimed = asyncio.run(scenario())
+    assert while_leased == []
+    assert [(again.id, again.attempts) for again in reclaimed] == [(job.id, 2)]
+
+def test_enqueue_wakes_an_idle_worker(queue):
+    async def scenario():
+        processor = StubProcessor()
+        worker = QueueWorker(queue, processor, concurrency=1, batch_size=1)
+        # Long enough that only the enqueue can wake the worker in time
+        worker.poll_interval = 30
+        worker.start()
+        await asyncio.sleep(0.05)
+
+        await queue.enqueue([make_target()])
+        for _ in range(100):
+            if processor.processed:
+                break
+            await asyncio.sleep(0.01)
+        await worker.stop()
+        return processor.processed
+
+    assert asyncio.run(scenario()) == ["target-1"]
+
+def test_tenant_counts_are_not_capped(queue):
+    async def scenario():
+        await queue.enqueue([make_target(f"due-{index}") for index in range(5)])
+        await queue.enqueue([make_target("later")], delay=3600)
+        return await queue.tenant_counts(["tenant-1", "tenant-2"])
+
+    assert asyncio.run(scenario()) == {"tenant-1": (5, 6)}